@@ -14,29 +14,71 @@ Usage:
     python threecx_supabase_processor.py --backfill         # Full backfill from April 2025
     python threecx_supabase_processor.py --status           # Show coverage status
     python threecx_supabase_processor.py --load-csv file.csv # Load a manual CSV export
+    python threecx_supabase_processor.py --load-csv file.csv --stream # Stream a large export
+    python threecx_supabase_processor.py --load-csv file.csv --copy   # COPY via SUPABASE_DB_URL
+    python threecx_supabase_processor.py --partial-fetch      # Download only the CSV attachments
+    python threecx_supabase_processor.py --incremental-sync   # Only search mail newer than the last run
+    python threecx_supabase_processor.py --holidays holidays.txt  # Extra closures for gap detection
+    python threecx_supabase_processor.py --refresh-rollups  # Rebuild reporting rollups for all loaded days
+    python threecx_supabase_processor.py --load-csv file.csv --mirror  # Also keep a local SQLite copy
+    python threecx_supabase_processor.py --tail today.csv --tail-interval 300  # Intra-day: load appended rows
+    python threecx_supabase_processor.py --daemon --incremental-sync --watch-dir drop/  # Long-running loader
+    python threecx_supabase_processor.py --report daily_summary --since 2025-10-01  # Report from the local copy
+    python threecx_supabase_processor.py --query "SELECT extension, COUNT(*) FROM call_records GROUP BY 1"
     python threecx_supabase_processor.py --show-ddl         # Print Supabase DDL
+    python threecx_supabase_processor.py --show-partition-migration  # SQL to partition call_records by month
 """
 
 import os
 import re
 import csv
+import io
 import json
+import binascii
+import hashlib
+import bisect
+import functools
+import gc
+import gzip
+import heapq
+import tempfile
+import sqlite3
 import argparse
 import logging
 import imaplib
+import signal
 import email
 import email.utils
 from email.header import decode_header
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional, Set, Tuple, Any
+from typing import List, Dict, Optional, Set, Tuple, Any, Iterable, Iterator, Callable
 from pathlib import Path
+from itertools import chain, islice
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import queue
+import threading
+import time
 import requests
 from io import StringIO
+from typing import TextIO
 
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import pytz
 
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # Columnar engine falls back to the stdlib
+    np = None
+    pd = None
+
+try:
+    import psycopg2
+except ImportError:  # Only needed for the direct-Postgres COPY loader
+    psycopg2 = None
+
 load_dotenv()
 
 # Configure logging
@@ -51,6 +93,53 @@ TZ = pytz.timezone(os.getenv("APP_TIMEZONE", "America/New_York"))
 # Sept 12, 2025 is when 3CX switched from URL downloads to email attachments
 BACKFILL_START_DATE = date(2025, 9, 12)
 ATTACHMENT_FORMAT_START = date(2025, 9, 12)  # When attachments started
+UPSERT_BATCH_SIZE = 500
+CALL_RECORDS_CONFLICT = "call_time,call_id,from_field,to_field"
+PARTITIONED_CONFLICT = CALL_RECORDS_CONFLICT + ",call_date"  # Partition key must be part of the unique key
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))  # Monthly partitions created past today
+PARTITION_RPC_RETRIES = 3  # Attempts after the first before a load is aborted
+DEAD_LETTER_FILE = os.getenv("DEAD_LETTER_FILE", "call_records_dead_letter.jsonl")
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")  # Direct Postgres connection string (COPY loader)
+BATCH_BYTE_BUDGET = int(os.getenv("BATCH_BYTE_BUDGET", str(1024 * 1024)))
+BATCH_TARGET_LATENCY = float(os.getenv("BATCH_TARGET_LATENCY", "2.0"))
+FIELD_CACHE_SIZE = int(os.getenv("FIELD_CACHE_SIZE", "4096"))
+PARSE_CHUNK_ROWS = 20000  # Rows per work item in parallel parse mode
+IMAP_FETCH_BATCH = int(os.getenv("IMAP_FETCH_BATCH", "500"))  # Messages per FETCH command (1 = one per message)
+ATTACHMENT_CHUNK_BYTES = int(os.getenv("ATTACHMENT_CHUNK_BYTES", str(1024 * 1024)))  # Partial BODY[n] fetch size
+MAILBOX_SYNC_FILE = os.getenv("MAILBOX_SYNC_FILE", "mailbox_sync_state.json")
+ATTACHMENT_CACHE_MAX_MB = int(os.getenv("ATTACHMENT_CACHE_MAX_MB", "512"))
+ATTACHMENT_CACHE_MAX_DAYS = int(os.getenv("ATTACHMENT_CACHE_MAX_DAYS", "90"))
+REPORT_COVERAGE_FILE = os.getenv("REPORT_COVERAGE_FILE", "report_coverage.json")
+REPORT_WINDOW_DAYS = 30  # Days of calls assumed in a report whose coverage has not been learned yet
+LOADED_INDEX_FILE = os.getenv("LOADED_INDEX_FILE", "loaded_dates_index.json")
+LOCAL_MIRROR_FILE = os.getenv("LOCAL_MIRROR_FILE", "call_records.sqlite3")
+TAIL_STATE_FILE = os.getenv("TAIL_STATE_FILE", "tail_state.json")
+TAIL_FINGERPRINT_BYTES = 256  # Bytes before a file's checkpoint that must be unchanged to resume there
+DAEMON_MAIL_INTERVAL = float(os.getenv("DAEMON_MAIL_INTERVAL", "60"))  # Seconds between mailbox checks
+DAEMON_WATCH_INTERVAL = float(os.getenv("DAEMON_WATCH_INTERVAL", "5"))  # Seconds between drop folder polls
+DAEMON_MAX_BACKOFF = 300  # Longest wait after repeated failures in daemon mode
+TRACKER_PAGE_SIZE = 1000  # PostgREST max-rows default
+ROLLUP_REFRESH_DAYS = 31  # Dates per refresh_call_rollups() call
+HOLIDAY_FILE = os.getenv("HOLIDAY_FILE", "holidays.txt")  # One YYYY-MM-DD per line; "+YYYY-MM-DD" = open that day
+STATUS_HOLIDAY_YEARS = 5  # --status skips holidays this many years back when finding missing days
+BUSINESS_HOLIDAYS = os.getenv(
+    "BUSINESS_HOLIDAYS", "new_year,memorial_day,independence_day,labor_day,thanksgiving,christmas"
+)
+
+# Precompiled field patterns (shared by CallRecordParser and FastCallRecordParser)
+EXTENSION_RE = re.compile(r'\((\d{3})\)')
+NAME_RE = re.compile(r'^([^(]+)')
+WHITESPACE_RE = re.compile(r'\s+')
+NON_DIGIT_RE = re.compile(r'\D')
+PHONE_IN_PARENS_RE = re.compile(r'\((\d{10})\)')
+# Call times already in datetime.isoformat() form, e.g. 2025-11-14T13:45:12+00:00
+CANONICAL_CALL_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\+00:00)?')
+CANONICAL_CALL_TIME_LINE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\+00:00)?$', re.M)
+# IMAP responses: "<seq> (BODY[...] {n}" prefix of a FETCH literal, and the Date header inside it
+FETCH_SEQ_RE = re.compile(rb'^(\d+) \(')
+UID_ITEM_RE = re.compile(rb'UID (\d+)')
+DATE_HEADER_RE = re.compile(r'Date:\s*(.+)')
+MESSAGE_ID_HEADER_RE = re.compile(r'^Message-ID:\s*(<[^>]+>)', re.I | re.M)
 
 
 class CallRecordParser:
@@ -74,7 +163,7 @@ class CallRecordParser:
         """Extract 3-digit extension from fields like 'Orlando, Julissa (117)'."""
         if not val:
             return None
-        match = re.search(r'\((\d{3})\)', str(val))
+        match = EXTENSION_RE.search(str(val))
         return match.group(1) if match else None
     
     @staticmethod
@@ -82,9 +171,9 @@ class CallRecordParser:
         """Extract name portion from 'Name (ext)' format."""
         if not val:
             return None
-        match = re.match(r'^([^(]+)', str(val))
+        match = NAME_RE.match(str(val))
         name = match.group(1).strip() if match else str(val).strip()
-        name = re.sub(r'\s+', ' ', name)
+        name = WHITESPACE_RE.sub(' ', name)
         return name if name else None
     
     @staticmethod
@@ -92,19 +181,24 @@ class CallRecordParser:
         """Extract 10-digit phone from various formats."""
         if not val:
             return None
-        digits = re.sub(r'\D', '', str(val))
+        digits = NON_DIGIT_RE.sub('', str(val))
         if len(digits) == 11 and digits.startswith('1'):
             return digits[1:]
         elif len(digits) == 10:
             return digits
-        match = re.search(r'\((\d{10})\)', str(val))
+        match = PHONE_IN_PARENS_RE.search(str(val))
         if match:
             return match.group(1)
         return None
     
     @staticmethod
-    def parse_row(row: Dict[str, Any], source_file: str = None) -> Optional[Dict[str, Any]]:
-        """Parse a single CSV row into a structured record."""
+    def parse_row(row: Dict[str, Any], source_file: str = None, decoder: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Parse a single CSV row into a structured record.
+        decoder supplies extract_extension/extract_name/clean_phone
+        (e.g. a FieldDecoderCache); defaults to CallRecordParser itself.
+        """
+        decoder = decoder or CallRecordParser
         try:
             call_time_str = row.get('Call Time', '')
             if not call_time_str or call_time_str == 'Totals':
@@ -127,18 +221,18 @@ class CallRecordParser:
             caller_id_raw = None
             
             if direction == 'Outbound':
-                extension = CallRecordParser.extract_extension(from_field)
-                employee_name = CallRecordParser.extract_name(from_field)
-                phone_number = CallRecordParser.clean_phone(to_field)
+                extension = decoder.extract_extension(from_field)
+                employee_name = decoder.extract_name(from_field)
+                phone_number = decoder.clean_phone(to_field)
                 caller_id_raw = from_field
             elif direction == 'Inbound':
-                extension = CallRecordParser.extract_extension(to_field)
-                employee_name = CallRecordParser.extract_name(to_field)
-                phone_number = CallRecordParser.clean_phone(from_field)
+                extension = decoder.extract_extension(to_field)
+                employee_name = decoder.extract_name(to_field)
+                phone_number = decoder.clean_phone(from_field)
                 caller_id_raw = from_field
             elif direction == 'Internal':
-                extension = CallRecordParser.extract_extension(from_field)
-                employee_name = CallRecordParser.extract_name(from_field)
+                extension = decoder.extract_extension(from_field)
+                employee_name = decoder.extract_name(from_field)
                 caller_id_raw = from_field
             
             ringing_seconds = CallRecordParser.time_to_seconds(row.get('Ringing', ''))
@@ -173,31 +267,832 @@ class CallRecordParser:
             return None
 
 
+class FieldDecoderCache:
+    """
+    Bounded LRU caches in front of the CallRecordParser field decoders.
+    From/To values repeat constantly in an export, so most rows are served
+    without running a regex. maxsize=0 disables caching.
+    """
+    
+    def __init__(self, maxsize: int = FIELD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.worker_totals = {'hits': 0, 'misses': 0}  # Reported back by parse workers
+        if maxsize > 0:
+            cache = functools.lru_cache(maxsize=maxsize)
+            self.extract_extension = cache(CallRecordParser.extract_extension)
+            self.extract_name = cache(CallRecordParser.extract_name)
+            self.clean_phone = cache(CallRecordParser.clean_phone)
+        else:
+            self.extract_extension = CallRecordParser.extract_extension
+            self.extract_name = CallRecordParser.extract_name
+            self.clean_phone = CallRecordParser.clean_phone
+    
+    def stats(self) -> Dict[str, int]:
+        """Combined hit/miss/size counters across the three decoders."""
+        totals = {'hits': self.worker_totals['hits'], 'misses': self.worker_totals['misses'], 'size': 0}
+        if self.maxsize > 0:
+            for fn in (self.extract_extension, self.extract_name, self.clean_phone):
+                info = fn.cache_info()
+                totals['hits'] += info.hits
+                totals['misses'] += info.misses
+                totals['size'] += info.currsize
+        return totals
+    
+    def add_worker_stats(self, hits: int, misses: int):
+        self.worker_totals['hits'] += hits
+        self.worker_totals['misses'] += misses
+    
+    def summary(self) -> str:
+        if self.maxsize <= 0:
+            return "disabled"
+        stats = self.stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = (stats['hits'] / lookups * 100) if lookups else 0
+        return (f"{stats['hits']:,} hits, {stats['misses']:,} misses ({hit_rate:.1f}% hit rate), "
+                f"{stats['size']:,} entries (max {self.maxsize:,} per field)")
+
+
+class CallRecord:
+    """
+    Compact call record produced by FastCallRecordParser.
+    Supports record['field'] access like the dict records, and is only
+    converted to a dict when it is uploaded.
+    """
+    
+    __slots__ = (
+        'call_time', 'call_id', 'call_date', 'direction', 'status', 'extension',
+        'employee_name', 'phone_number', 'caller_id_raw', 'ringing_seconds',
+        'talking_seconds', 'cost', 'from_field', 'to_field',
+        'call_activity_details', 'source_file'
+    )
+    
+    def __init__(self, call_time, call_id, call_date, direction, status, extension,
+                 employee_name, phone_number, caller_id_raw, ringing_seconds,
+                 talking_seconds, cost, from_field, to_field, call_activity_details,
+                 source_file):
+        self.call_time = call_time
+        self.call_id = call_id
+        self.call_date = call_date
+        self.direction = direction
+        self.status = status
+        self.extension = extension
+        self.employee_name = employee_name
+        self.phone_number = phone_number
+        self.caller_id_raw = caller_id_raw
+        self.ringing_seconds = ringing_seconds
+        self.talking_seconds = talking_seconds
+        self.cost = cost
+        self.from_field = from_field
+        self.to_field = to_field
+        self.call_activity_details = call_activity_details
+        self.source_file = source_file
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'linked':
+            return self.phone_number
+        return getattr(self, key)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the same dict (and key order) as CallRecordParser.parse_row."""
+        return {
+            'call_time': self.call_time,
+            'call_id': self.call_id,
+            'call_date': self.call_date,
+            'direction': self.direction,
+            'status': self.status,
+            'extension': self.extension,
+            'employee_name': self.employee_name,
+            'phone_number': self.phone_number,
+            'linked': self.phone_number,  # Clean 10-digit number for customer matching
+            'caller_id_raw': self.caller_id_raw,
+            'ringing_seconds': self.ringing_seconds,
+            'talking_seconds': self.talking_seconds,
+            'cost': self.cost,
+            'from_field': self.from_field,
+            'to_field': self.to_field,
+            'call_activity_details': self.call_activity_details,
+            'source_file': self.source_file
+        }
+
+
+def records_as_dicts(records: List[Any]) -> List[Dict[str, Any]]:
+    """Convert CallRecord objects to upload dicts, passing plain dicts through."""
+    return [r.to_dict() if isinstance(r, CallRecord) else r for r in records]
+
+
+# Columns compared by the pre-upload diff (source_file is provenance, not content)
+DIFF_COLUMNS = (
+    'call_date', 'direction', 'status', 'extension', 'employee_name', 'phone_number',
+    'linked', 'caller_id_raw', 'ringing_seconds', 'talking_seconds', 'cost',
+    'call_activity_details'
+)
+
+
+def group_by_date(records: Iterable[Any]) -> Dict[date, List[Any]]:
+    """
+    Records partitioned by native call date in one pass. Records are bucketed
+    on their call_date string and each distinct day is converted to a date
+    once, instead of re-parsing the string of every record.
+    """
+    groups: Dict[str, List[Any]] = {}
+    for record in records:
+        call_date = record['call_date']
+        group = groups.get(call_date)
+        if group is None:
+            group = groups[call_date] = []
+        group.append(record)
+    return {date.fromisoformat(call_date): group for call_date, group in groups.items()}
+
+
+def unique_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Records with repeated call_time / call_id / from / to keys dropped, first
+    one kept. One upsert statement cannot touch the same row twice, so every
+    batch must be free of duplicate keys.
+    """
+    unique = {}
+    for record in records:
+        key = (record['call_time'], record['call_id'], record['from_field'], record['to_field'])
+        if key not in unique:
+            unique[key] = record
+    return list(unique.values()) if len(unique) < len(records) else records
+
+
+def add_months(d: date, months: int) -> date:
+    """First day of the month `months` after d's month."""
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(d: date) -> str:
+    """Monthly call_records partition holding call_date d (see ensure_call_records_partitions)."""
+    return f"call_records_y{d.year:04d}m{d.month:02d}"
+
+
+def group_by_month(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Record dicts bucketed by the 'YYYY-MM' of their call_date, i.e. by call_records partition."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record['call_date'][:7], []).append(record)
+    return groups
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """
+    call_records' unique key as text, matching call_record_hashes() in the DDL:
+    UTC call time to the second, then call_id / from_field / to_field.
+    """
+    call_time = record['call_time']
+    if call_time.endswith('+00:00'):
+        call_time = call_time[:19]
+    else:
+        call_time = datetime.fromisoformat(call_time).astimezone(pytz.UTC).strftime('%Y-%m-%dT%H:%M:%S')
+    return '|'.join((call_time, record.get('call_id') or '', record.get('from_field') or '',
+                     record.get('to_field') or ''))
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Content hash of DIFF_COLUMNS, matching call_record_hashes() in the DDL."""
+    values = []
+    for column in DIFF_COLUMNS:
+        value = record.get(column)
+        if value is None:
+            values.append('')
+        elif column == 'cost':
+            values.append(f"{value:.4f}")
+        else:
+            values.append(str(value))
+    return hashlib.md5('|'.join(values).encode('utf-8')).hexdigest()[:16]
+
+
+class FastCallRecordParser:
+    """
+    High-throughput variant of CallRecordParser.parse_row.
+    Works on csv.reader value lists by column index instead of DictReader dicts,
+    skips the datetime round-trip for call times that are already canonical,
+    and returns compact CallRecord objects. Output matches parse_row exactly.
+    """
+    
+    def __init__(self, header: List[str], decoder: Any = None):
+        self.decoder = decoder or CallRecordParser
+        # Later duplicate column names win, as with csv.DictReader
+        index = {name: i for i, name in enumerate(header)}
+        self.header = header
+        self.width = len(header)
+        self.i_time = index.get('Call Time')
+        self.i_id = index.get('Call ID')
+        self.i_direction = index.get('Direction')
+        self.i_status = index.get('Status')
+        self.i_from = index.get('From')
+        self.i_to = index.get('To')
+        self.i_ringing = index.get('Ringing')
+        self.i_talking = index.get('Talking')
+        self.i_cost = index.get('Cost')
+        self.i_details = index.get('Call Activity Details')
+        self.complete = None not in (
+            self.i_time, self.i_id, self.i_direction, self.i_status, self.i_from,
+            self.i_to, self.i_ringing, self.i_talking, self.i_cost, self.i_details
+        )
+        self._valid_dates: Dict[str, bool] = {}
+        self._durations: Dict[str, int] = {}
+    
+    def _seconds(self, time_str: str) -> int:
+        """time_to_seconds with a small lookup table (durations repeat constantly)."""
+        seconds = self._durations.get(time_str)
+        if seconds is None:
+            seconds = CallRecordParser.time_to_seconds(time_str)
+            if len(self._durations) < 65536:
+                self._durations[time_str] = seconds
+        return seconds
+    
+    def _as_dict_row(self, values: List[str]) -> Dict[str, Any]:
+        """Rebuild the row exactly as csv.DictReader would have produced it."""
+        row = dict(zip(self.header, values))
+        if len(values) > self.width:
+            row[None] = values[self.width:]
+        else:
+            for key in self.header[len(values):]:
+                row[key] = None
+        return row
+    
+    def _canonical_call_time(self, call_time_str: str) -> Optional[str]:
+        """Return call_time_str if parse_row would reproduce it unchanged, else None."""
+        match = CANONICAL_CALL_TIME_RE.fullmatch(call_time_str)
+        if not match:
+            return None
+        day = match.group(1)
+        valid = self._valid_dates.get(day)
+        if valid is None:
+            try:
+                date.fromisoformat(day)
+                valid = True
+            except ValueError:
+                valid = False
+            self._valid_dates[day] = valid
+        return call_time_str if valid else None
+    
+    def parse(self, values: List[str], source_file: str = None) -> Optional[CallRecord]:
+        """Parse a csv.reader row into a CallRecord."""
+        if not self.complete or len(values) < self.width:
+            return self._parse_fallback(values, source_file)
+        try:
+            call_time_str = values[self.i_time]
+            if not call_time_str or call_time_str == 'Totals':
+                return None
+            
+            if 'Z' in call_time_str:
+                call_time_str = call_time_str.replace('Z', '+00:00')
+            call_time = self._canonical_call_time(call_time_str)
+            if call_time is not None:
+                call_date = call_time[:10]
+            else:
+                try:
+                    parsed_time = datetime.fromisoformat(call_time_str)
+                except ValueError:
+                    logger.warning(f"Could not parse call time: {values[self.i_time]}")
+                    return None
+                call_time = parsed_time.isoformat()
+                call_date = parsed_time.date().isoformat()
+            
+            direction = values[self.i_direction].strip()
+            from_field = values[self.i_from].strip()
+            to_field = values[self.i_to].strip()
+            
+            extension = None
+            employee_name = None
+            phone_number = None
+            caller_id_raw = None
+            decoder = self.decoder
+            
+            if direction == 'Outbound':
+                extension = decoder.extract_extension(from_field)
+                employee_name = decoder.extract_name(from_field)
+                phone_number = decoder.clean_phone(to_field)
+                caller_id_raw = from_field
+            elif direction == 'Inbound':
+                extension = decoder.extract_extension(to_field)
+                employee_name = decoder.extract_name(to_field)
+                phone_number = decoder.clean_phone(from_field)
+                caller_id_raw = from_field
+            elif direction == 'Internal':
+                extension = decoder.extract_extension(from_field)
+                employee_name = decoder.extract_name(from_field)
+                caller_id_raw = from_field
+            
+            try:
+                cost = float(values[self.i_cost] or 0)
+            except (ValueError, TypeError):
+                cost = 0.0
+            
+            return CallRecord(
+                call_time,
+                values[self.i_id],
+                call_date,
+                direction,
+                values[self.i_status].strip(),
+                extension,
+                employee_name,
+                phone_number,
+                caller_id_raw,
+                self._seconds(values[self.i_ringing]),
+                self._seconds(values[self.i_talking]),
+                cost,
+                from_field,
+                to_field,
+                values[self.i_details],
+                source_file
+            )
+        except Exception as e:
+            logger.warning(f"Error parsing row: {e}")
+            return None
+    
+    def _parse_fallback(self, values: List[str], source_file: str = None) -> Optional[CallRecord]:
+        """Ragged rows and unusual headers go through parse_row for identical results."""
+        parsed = CallRecordParser.parse_row(self._as_dict_row(values), source_file, self.decoder)
+        if parsed is None:
+            return None
+        del parsed['linked']
+        return CallRecord(**parsed)
+
+
+class ColumnarCallParser:
+    """
+    Column-at-a-time parse engine for bulk backfills.
+    Rows are transposed into column arrays and each transform (stripping,
+    extension/name/phone decoding, HH:MM:SS conversion, cost parsing) runs
+    once per distinct value and is then broadcast over the column. Uses
+    pandas/numpy when installed and plain lists otherwise. Records are
+    identical to parse_row's, including the de-duplication order.
+    """
+    
+    def __init__(self, decoder: Any = None, use_pandas: Optional[bool] = None):
+        self.decoder = decoder or CallRecordParser
+        self.use_pandas = (pd is not None) if use_pandas is None else (use_pandas and pd is not None)
+        self.dupe_count = 0
+    
+    def _map_unique(self, column: List[Any], fn) -> List[Any]:
+        """Apply fn once per distinct value and broadcast the result over the column."""
+        if self.use_pandas:
+            codes, uniques = pd.factorize(np.asarray(column, dtype=object), use_na_sentinel=False)
+            mapped = np.empty(len(uniques), dtype=object)
+            mapped[:] = [fn(u) for u in uniques]
+            return mapped[codes].tolist()
+        lookup = {v: fn(v) for v in set(column)}
+        return list(map(lookup.__getitem__, column))
+    
+    @staticmethod
+    def _parse_call_time(call_time_str: str) -> Optional[Tuple[str, str]]:
+        """Return (call_time, call_date) as parse_row formats them, or None to drop the row."""
+        if not call_time_str or call_time_str == 'Totals':
+            return None
+        try:
+            call_time = datetime.fromisoformat(call_time_str.replace('Z', '+00:00'))
+        except ValueError:
+            logger.warning(f"Could not parse call time: {call_time_str}")
+            return None
+        return call_time.isoformat(), call_time.date().isoformat()
+    
+    def _parse_call_times(self, column: List[str]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """
+        Vectorized call time handling: the Z -> +00:00 rewrite and the check for
+        values already in isoformat() form run as single regex passes over the
+        joined column. Only the remaining values go through datetime.
+        """
+        joined = '\n'.join(column)
+        if joined.count('\n') != len(column) - 1:  # Newline inside a value
+            parsed = self._map_unique(column, self._parse_call_time)
+            return ([p[0] if p else None for p in parsed],
+                    [p[1] if p else None for p in parsed])
+        
+        joined = joined.replace('Z', '+00:00')
+        canonical = set(CANONICAL_CALL_TIME_LINE_RE.findall(joined))
+        for day in {t[:10] for t in canonical}:
+            try:
+                date.fromisoformat(day)
+            except ValueError:
+                canonical = {t for t in canonical if t[:10] != day}
+        
+        call_times = [t if t in canonical else None for t in joined.split('\n')]
+        call_dates = [t[:10] if t else None for t in call_times]
+        if len(canonical) < len(column):
+            for i, call_time in enumerate(call_times):
+                if call_time is None:
+                    parsed = self._parse_call_time(column[i])
+                    if parsed:
+                        call_times[i], call_dates[i] = parsed
+        return call_times, call_dates
+    
+    @staticmethod
+    def _parse_cost(val: str) -> float:
+        try:
+            return float(val or 0)
+        except (ValueError, TypeError):
+            return 0.0
+    
+    def parse_rows(self, rows: Iterable[List[str]], source_file: str = None) -> List[Dict[str, Any]]:
+        """
+        Parse csv.reader rows (header first) into de-duplicated record dicts.
+        Sets self.dupe_count to the number of duplicate rows removed.
+        """
+        # Millions of acyclic lists/strings would otherwise trigger repeated
+        # full GC passes over the growing column arrays
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._parse_rows(rows, source_file)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
+    def _parse_rows(self, rows: Iterable[List[str]], source_file: str = None) -> List[Dict[str, Any]]:
+        rows = iter(rows)
+        header = next(rows, None)
+        self.dupe_count = 0
+        if header is None:
+            return []
+        
+        fast_parser = FastCallRecordParser(header, self.decoder)
+        width = len(header)
+        full_rows: List[List[str]] = []
+        other_rows: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+        for values in rows:
+            if not values:
+                continue  # csv.DictReader skips blank rows too
+            if fast_parser.complete and len(values) >= width:
+                full_rows.append(values)
+            else:
+                # Ragged rows go through parse_row, keeping their position
+                parsed = fast_parser._parse_fallback(values, source_file)
+                other_rows.append((len(full_rows) + len(other_rows), parsed.to_dict() if parsed else None))
+        
+        if not full_rows:
+            records = []
+        else:
+            records = self._parse_columns(fast_parser, full_rows, source_file, dedup=not other_rows)
+            if not other_rows:
+                return records
+        del full_rows
+        
+        for position, record in other_rows:
+            records.insert(position, record)
+        
+        unique_records = []
+        seen = set()
+        for record in records:
+            if record:
+                dedup_key = (record['call_time'], record['call_id'], record['from_field'], record['to_field'])
+                if dedup_key not in seen:
+                    seen.add(dedup_key)
+                    unique_records.append(record)
+                else:
+                    self.dupe_count += 1
+        return unique_records
+    
+    def _parse_columns(self, fast_parser: FastCallRecordParser, full_rows: List[List[str]],
+                       source_file: str, dedup: bool) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run the column transforms. With dedup, returns the unique valid records;
+        otherwise one record (or None for a dropped row) per input row.
+        """
+        columns = list(zip(*full_rows))
+        decoder = self.decoder
+        
+        call_times, call_dates = self._parse_call_times(columns[fast_parser.i_time])
+        directions = self._map_unique(columns[fast_parser.i_direction], str.strip)
+        statuses = self._map_unique(columns[fast_parser.i_status], str.strip)
+        froms = self._map_unique(columns[fast_parser.i_from], str.strip)
+        tos = self._map_unique(columns[fast_parser.i_to], str.strip)
+        ringing = self._map_unique(columns[fast_parser.i_ringing], CallRecordParser.time_to_seconds)
+        talking = self._map_unique(columns[fast_parser.i_talking], CallRecordParser.time_to_seconds)
+        costs = self._map_unique(columns[fast_parser.i_cost], self._parse_cost)
+        call_ids = columns[fast_parser.i_id]
+        details = columns[fast_parser.i_details]
+        del columns
+        
+        # The employee side of the call is From for outbound/internal and To for
+        # inbound; the customer side is the other one (none for internal calls)
+        if self.use_pandas:
+            dir_arr = np.asarray(directions, dtype=object)
+            from_arr = np.asarray(froms, dtype=object)
+            to_arr = np.asarray(tos, dtype=object)
+            inbound = dir_arr == 'Inbound'
+            outbound = dir_arr == 'Outbound'
+            known = inbound | outbound | (dir_arr == 'Internal')
+            party = np.where(inbound, to_arr, np.where(known, from_arr, '')).tolist()
+            remote = np.where(inbound, from_arr, np.where(outbound, to_arr, '')).tolist()
+            caller_ids = np.where(known, from_arr, None).tolist()
+        else:
+            party = [t if d == 'Inbound' else (f if d in ('Outbound', 'Internal') else '')
+                     for d, f, t in zip(directions, froms, tos)]
+            remote = [f if d == 'Inbound' else (t if d == 'Outbound' else '')
+                      for d, f, t in zip(directions, froms, tos)]
+            caller_ids = [f if d in ('Outbound', 'Inbound', 'Internal') else None
+                          for d, f in zip(directions, froms)]
+        
+        extensions = self._map_unique(party, decoder.extract_extension)
+        names = self._map_unique(party, decoder.extract_name)
+        phones = self._map_unique(remote, decoder.clean_phone)
+        
+        columns = (call_times, call_ids, call_dates, directions, statuses, extensions, names,
+                   phones, caller_ids, ringing, talking, costs, froms, tos, details)
+        keep = self._first_occurrences(call_times, call_ids, froms, tos) if dedup else None
+        if keep is not None:
+            columns = [[value for value, kept in zip(column, keep) if kept] for column in columns]
+        
+        return [
+            {
+                'call_time': call_time,
+                'call_id': call_id,
+                'call_date': call_date,
+                'direction': direction,
+                'status': status,
+                'extension': extension,
+                'employee_name': name,
+                'phone_number': phone,
+                'linked': phone,  # Clean 10-digit number for customer matching
+                'caller_id_raw': caller_id,
+                'ringing_seconds': ring,
+                'talking_seconds': talk,
+                'cost': cost,
+                'from_field': from_field,
+                'to_field': to_field,
+                'call_activity_details': detail,
+                'source_file': source_file
+            } if call_time else None
+            for call_time, call_id, call_date, direction, status, extension, name, phone,
+                caller_id, ring, talk, cost, from_field, to_field, detail in zip(*columns)
+        ]
+    
+    def _first_occurrences(self, call_times: List[Optional[str]], call_ids: Iterable[str],
+                           froms: List[str], tos: List[str]) -> Optional[List[bool]]:
+        """
+        Mask keeping the first row per dedup key and dropping unparseable rows.
+        Returns None when every row is kept.
+        """
+        keys = list(zip(call_times, call_ids, froms, tos))
+        dropped = call_times.count(None)
+        if not dropped and len(dict.fromkeys(keys)) == len(keys):
+            return None
+        keep = []
+        seen = set()
+        for key in keys:
+            if key[0] is None:
+                keep.append(False)
+            elif key in seen:
+                keep.append(False)
+                self.dupe_count += 1
+            else:
+                seen.add(key)
+                keep.append(True)
+        return keep
+
+
+# Per-process state for parallel parse workers (see ThreeCXProcessor._iter_rows_parallel)
+_worker_decoder: Optional[FieldDecoderCache] = None
+
+
+def _init_parse_worker(field_cache_size: int):
+    global _worker_decoder
+    _worker_decoder = FieldDecoderCache(field_cache_size)
+
+
+def _parse_row_chunk(header: List[str], rows: List[List[str]], source_file: str,
+                     fast: bool) -> Tuple[List[Any], int, int]:
+    """
+    Worker: parse one row-aligned chunk of csv.reader rows.
+    Returns (parsed records in row order, cache hits, cache misses).
+    """
+    decoder = _worker_decoder or FieldDecoderCache(0)
+    before = decoder.stats()
+    row_parser = FastCallRecordParser(header, decoder)
+    if fast:
+        parsed = [row_parser.parse(values, source_file) for values in rows]
+    else:
+        parse_row = CallRecordParser.parse_row
+        as_dict = row_parser._as_dict_row
+        parsed = [parse_row(as_dict(values), source_file, decoder) for values in rows]
+    after = decoder.stats()
+    return ([p for p in parsed if p],
+            after['hits'] - before['hits'],
+            after['misses'] - before['misses'])
+
+
+class AdaptiveBatcher:
+    """
+    Chooses upsert batch sizes. Fixed mode always cuts UPSERT_BATCH_SIZE rows.
+    Adaptive mode also caps each batch at a payload byte budget, grows the
+    row count while requests finish well inside the target latency, and
+    halves it after a slow request, a timeout or a 413 (payload too large).
+    A 413 also lowers the byte budget below the rejected payload size.
+    Sizes and throughput are kept for tuning (see stats()).
+    """
+    
+    def __init__(self, adaptive: bool = False, initial_size: int = UPSERT_BATCH_SIZE,
+                 byte_budget: int = BATCH_BYTE_BUDGET, target_latency: float = BATCH_TARGET_LATENCY,
+                 min_size: int = 25, max_size: int = 5000):
+        self.adaptive = adaptive
+        self.size = initial_size
+        self.byte_budget = byte_budget
+        self.target_latency = target_latency
+        self.min_size = min_size
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.grows = 0
+        self.shrinks = 0
+        self.size_counts: Dict[int, int] = {}
+        self.history: deque = deque(maxlen=1000)  # (rows, bytes, seconds, ok) per request
+    
+    @staticmethod
+    def estimate_bytes(record: Dict[str, Any]) -> int:
+        """Approximate JSON size of a record: its string values plus fixed overhead."""
+        return 320 + sum(len(v) for v in record.values() if isinstance(v, str))
+    
+    def split(self, records: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Cut records into batches, re-reading the current size at every cut."""
+        start = 0
+        while start < len(records):
+            size = self.size
+            if not self.adaptive:
+                end = start + size
+            else:
+                end = start
+                payload = 0
+                limit = min(len(records), start + size)
+                while end < limit:
+                    payload += self.estimate_bytes(records[end])
+                    if payload > self.byte_budget and end > start:
+                        break
+                    end += 1
+            yield records[start:end]
+            start = end
+    
+    @staticmethod
+    def _is_payload_too_large(error: Exception) -> bool:
+        text = f"{error}".lower()
+        return '413' in text or 'too large' in text
+    
+    @staticmethod
+    def _is_overload(error: Exception) -> bool:
+        """Timeouts and 413s mean the batch was too big, not that a row is bad."""
+        text = f"{type(error).__name__} {error}".lower()
+        return '413' in text or 'too large' in text or 'timeout' in text or 'timed out' in text
+    
+    def record(self, batch: List[Dict[str, Any]], seconds: float, error: Exception = None):
+        """Feed back the outcome of one upsert request."""
+        rows = len(batch)
+        nbytes = sum(self.estimate_bytes(r) for r in batch) if self.adaptive else 0
+        with self.lock:
+            self.batches += 1
+            self.history.append((rows, nbytes, round(seconds, 4), error is None))
+            if error is None:
+                self.rows += rows
+                self.bytes += nbytes
+                self.seconds += seconds
+                self.size_counts[rows] = self.size_counts.get(rows, 0) + 1
+            if not self.adaptive:
+                return
+            
+            if error is not None and self._is_payload_too_large(error) and nbytes:
+                # The server's body limit is below our budget: learn it
+                self.byte_budget = min(self.byte_budget, max(4096, int(nbytes * 0.8)))
+            if (error is not None and self._is_overload(error)) or seconds > self.target_latency:
+                new_size = max(self.min_size, min(self.size, rows) // 2)
+                if new_size < self.size:
+                    self.size = new_size
+                    self.shrinks += 1
+                    logger.info(f"Batch size reduced to {self.size} rows")
+            elif (error is None and rows >= self.size and seconds < self.target_latency / 2
+                    and nbytes < self.byte_budget):
+                new_size = min(self.max_size, int(self.size * 1.25) + 1)
+                if new_size > self.size:
+                    self.size = new_size
+                    self.grows += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'adaptive': self.adaptive,
+                'current_size': self.size,
+                'byte_budget': self.byte_budget,
+                'target_latency': self.target_latency,
+                'requests': self.batches,
+                'rows': self.rows,
+                'bytes': self.bytes,
+                'seconds': round(self.seconds, 3),
+                'rows_per_sec': round(self.rows / self.seconds, 1) if self.seconds else 0,
+                'bytes_per_sec': round(self.bytes / self.seconds, 1) if self.seconds else 0,
+                'grows': self.grows,
+                'shrinks': self.shrinks,
+                'size_counts': {str(k): v for k, v in sorted(self.size_counts.items())},
+                'history': list(self.history)
+            }
+    
+    def summary(self) -> str:
+        stats = self.stats()
+        mode = 'adaptive' if self.adaptive else 'fixed'
+        return (f"{mode}, {stats['requests']} requests, current size {stats['current_size']} rows, "
+                f"{stats['grows']} grows / {stats['shrinks']} shrinks, "
+                f"{stats['rows_per_sec']:,.0f} rows/sec of request time")
+    
+    def export(self, path: str):
+        """Write stats() as JSON for tuning."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats(), f, indent=2)
+
+
 class SupabaseCallStore:
     """Handles all Supabase operations for call records."""
     
-    def __init__(self):
+    def __init__(self, dead_letter_path: str = DEAD_LETTER_FILE, batcher: AdaptiveBatcher = None,
+                 copy_dsn: str = None):
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         if not url or not key:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
         self.client: Client = create_client(url, key)
+        self.batcher = batcher or AdaptiveBatcher()
+        # Optional direct-Postgres bulk path; REST upserts are used otherwise
+        self.copy_loader = PostgresCopyLoader(copy_dsn) if copy_dsn is not None else None
+        self.dead_letter_path = dead_letter_path
+        self.dead_lettered = 0
+        self.extra_requests = 0  # Requests spent isolating bad rows in failed batches
+        self._failure_lock = threading.Lock()
+        # call_records layout, detected by the first ensure_partitions() (None = not known yet)
+        self.partitioned: Optional[bool] = None
+        self._partition_months: Optional[Tuple[date, date]] = None  # Months known to have a partition
+        self._partition_lock = threading.Lock()
     
-    def get_loaded_dates(self) -> Set[date]:
-        """Get all dates that have been loaded into Supabase."""
+    def get_loaded_since(self, since: Optional[str]) -> Optional[List[Tuple[date, str, Optional[int]]]]:
+        """
+        (load_date, loaded_at, record_count) of tracker rows with loaded_at at or after since
+        (every row when since is None), paged past the PostgREST row limit.
+        None if the tracker could not be read.
+        """
+        rows = []
         try:
-            result = self.client.table("call_load_tracker").select("load_date").execute()
-            dates = set()
-            for row in result.data or []:
-                try:
-                    d = datetime.fromisoformat(row['load_date']).date()
-                    dates.add(d)
-                except (ValueError, KeyError):
-                    pass
-            return dates
+            offset = 0
+            while True:
+                query = self.client.table("call_load_tracker").select("load_date,loaded_at,record_count")
+                if since:
+                    query = query.gte("loaded_at", since)
+                page = query.order("load_date").range(offset, offset + TRACKER_PAGE_SIZE - 1).execute().data or []
+                for row in page:
+                    try:
+                        rows.append((datetime.fromisoformat(row['load_date']).date(), row.get('loaded_at'),
+                                     row.get('record_count')))
+                    except (ValueError, KeyError):
+                        pass
+                if len(page) < TRACKER_PAGE_SIZE:
+                    return rows
+                offset += TRACKER_PAGE_SIZE
         except Exception as e:
             logger.warning(f"Could not fetch loaded dates: {e}")
-            return set()
+            return None
+    
+    def count_loaded_dates(self) -> Optional[int]:
+        """Number of tracker rows (one per loaded date), without fetching them."""
+        try:
+            return self.client.table("call_load_tracker").select("load_date", count="exact").limit(1).execute().count
+        except Exception as e:
+            logger.warning(f"Could not count loaded dates: {e}")
+            return None
+    
+    def get_record_hashes(self, dates: Iterable[date]) -> Optional[Dict[str, str]]:
+        """
+        Key -> content hash of every row already stored for the given dates, in
+        one call_record_hashes() RPC. None if the lookup fails (e.g. the function
+        has not been created yet), meaning nothing can be skipped.
+        """
+        try:
+            result = self.client.rpc(
+                "call_record_hashes", {'p_dates': sorted(d.isoformat() for d in dates)}
+            ).execute()
+        except Exception as e:
+            logger.warning(f"Could not fetch existing record hashes, uploading everything: {e}")
+            return None
+        return result.data if isinstance(result.data, dict) else None
+    
+    def refresh_rollups(self, dates: Iterable[date]) -> int:
+        """
+        Recompute the reporting rollups for the given dates with the
+        refresh_call_rollups() RPC, ROLLUP_REFRESH_DAYS dates per call.
+        Returns the number of dates refreshed.
+        """
+        dates = sorted(dates)
+        refreshed = 0
+        for start in range(0, len(dates), ROLLUP_REFRESH_DAYS):
+            chunk = dates[start:start + ROLLUP_REFRESH_DAYS]
+            try:
+                self.client.rpc("refresh_call_rollups", {'p_dates': [d.isoformat() for d in chunk]}).execute()
+            except Exception as e:
+                logger.warning(f"Could not refresh reporting rollups for {chunk[0]} to {chunk[-1]}: {e}")
+                continue
+            refreshed += len(chunk)
+        return refreshed
     
     def mark_date_loaded(self, load_date: date, record_count: int, source: str):
         """Mark a date as loaded in the tracker."""
@@ -211,38 +1106,179 @@ class SupabaseCallStore:
         except Exception as e:
             logger.error(f"Failed to mark date {load_date} as loaded: {e}")
     
-    def insert_records(self, records: List[Dict[str, Any]]) -> int:
-        """Insert call records into Supabase."""
-        if not records:
+    def ensure_partitions(self, call_dates: Iterable[Any]) -> bool:
+        """
+        Make sure call_records has a partition for the month of every call date
+        (dates or ISO strings) before rows for it are written, creating them
+        through PARTITION_MONTHS_AHEAD months past today with one
+        ensure_call_records_partitions() call. Months already covered this run
+        cost no request. The first call also detects the layout: the function
+        returns -1 for an unpartitioned call_records, and a database without the
+        function is treated the same way. Returns whether call_records is partitioned.
+        Any other failure is retried with backoff and then raised: upserting with
+        the wrong conflict target, or into a month with no partition, would fail
+        every row, so the load is aborted and its days stay unmarked instead.
+        """
+        call_dates = [d if isinstance(d, date) else date.fromisoformat(d) for d in call_dates]
+        if not call_dates or self.partitioned is False:
+            return bool(self.partitioned)
+        first, last = min(call_dates).replace(day=1), max(call_dates).replace(day=1)
+        with self._partition_lock:
+            known = self._partition_months
+            if self.partitioned is False or (known and known[0] <= first and last <= known[1]):
+                return bool(self.partitioned)
+            start = min(first, known[0]) if known else first
+            end = max(last, add_months(date.today(), PARTITION_MONTHS_AHEAD), known[1] if known else last)
+            for attempt in range(PARTITION_RPC_RETRIES + 1):
+                try:
+                    result = self.client.rpc("ensure_call_records_partitions", {
+                        'p_from': start.isoformat(), 'p_to': end.isoformat()
+                    }).execute()
+                    break
+                except Exception as e:
+                    if getattr(e, 'code', None) == 'PGRST202':  # Function not found: pre-partitioning schema
+                        logger.info("ensure_call_records_partitions() not found; call_records is not partitioned")
+                        self.partitioned = False
+                        return False
+                    if attempt == PARTITION_RPC_RETRIES:
+                        raise RuntimeError(f"Could not create call_records partitions for "
+                                           f"{start:%Y-%m} to {end:%Y-%m}: {e}") from e
+                    logger.warning(f"ensure_call_records_partitions() failed, retrying: {e}")
+                    time.sleep(0.5 * (2 ** attempt))
+            if result.data == -1:
+                self.partitioned = False
+                return False
+            if result.data:
+                logger.info(f"Created {result.data} call_records partition(s) for {start:%Y-%m} to {end:%Y-%m}")
+            self.partitioned = True
+            self._partition_months = (start, end)
+            return True
+    
+    def upsert_batch(self, batch: List[Dict[str, Any]]):
+        """Upsert one batch of record dicts in a single request. Raises on failure."""
+        started = time.perf_counter()
+        try:
+            self.client.table("call_records").upsert(
+                batch,
+                on_conflict=PARTITIONED_CONFLICT if self.partitioned else CALL_RECORDS_CONFLICT
+            ).execute()
+        except Exception as e:
+            self.batcher.record(batch, time.perf_counter() - started, e)
+            raise
+        self.batcher.record(batch, time.perf_counter() - started)
+    
+    def insert_batch(self, batch: List[Dict[str, Any]], error: Exception = None) -> int:
+        """
+        Upsert one batch. If it fails, bisect: retry each half and recurse into
+        the halves that fail, so a single bad row is isolated in about
+        log2(batch size) requests. Rows that fail on their own are written to
+        the dead-letter file. error is the failure of an upload already
+        attempted by the caller.
+        """
+        if error is None:
+            try:
+                self.upsert_batch(batch)
+                return len(batch)
+            except Exception as e:
+                error = e
+        
+        logger.error(f"Error inserting batch of {len(batch)}: {error}")
+        return self._bisect_batch(batch, error)
+    
+    def _bisect_batch(self, batch: List[Dict[str, Any]], error: Exception) -> int:
+        if len(batch) == 1:
+            self._dead_letter(batch[0], error)
             return 0
         
         inserted = 0
-        batch_size = 500
-        
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            with self._failure_lock:
+                self.extra_requests += 1
             try:
-                self.client.table("call_records").upsert(
-                    batch,
-                    on_conflict="call_time,call_id,from_field,to_field"
-                ).execute()
-                inserted += len(batch)
+                self.upsert_batch(half)
+                inserted += len(half)
             except Exception as e:
-                logger.error(f"Error inserting batch: {e}")
-                for record in batch:
-                    try:
-                        self.client.table("call_records").upsert(
-                            record,
-                            on_conflict="call_time,call_id,from_field,to_field"
-                        ).execute()
-                        inserted += 1
-                    except Exception:
-                        pass
+                inserted += self._bisect_batch(half, e)
+        return inserted
+    
+    def _dead_letter(self, record: Dict[str, Any], error: Exception):
+        """Append a record that could not be stored, with the error, to the dead-letter file."""
+        entry = {
+            'failed_at': datetime.utcnow().isoformat(),
+            'error': str(error),
+            'record': record
+        }
+        with self._failure_lock:
+            self.dead_lettered += 1
+            try:
+                with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, default=str) + '\n')
+            except OSError as e:
+                logger.error(f"Could not write dead-letter file {self.dead_letter_path}: {e}")
+        logger.warning(f"Dead-lettered call {record.get('call_time')} / {record.get('call_id')}: {error}")
+    
+    def failure_summary(self) -> str:
+        if not self.dead_lettered and not self.extra_requests:
+            return "no failed batches"
+        return (f"{self.dead_lettered} rows dead-lettered to {self.dead_letter_path}, "
+                f"{self.extra_requests} extra requests spent bisecting failed batches")
+    
+    def insert_records(self, records: List[Dict[str, Any]]) -> int:
+        """Insert call records (dicts or CallRecord objects) into Supabase."""
+        if not records:
+            return 0
+        
+        records = records_as_dicts(records)
+        # With a partitioned table, batches stay within one month so each request writes one partition
+        if self.ensure_partitions({r['call_date'] for r in records}):
+            groups = group_by_month(records).values()
+        else:
+            groups = [records]
+        
+        inserted = 0
+        for group in groups:
+            for batch in self.batcher.split(group):
+                inserted += self.insert_batch(batch)
         
         return inserted
     
-    def get_date_stats(self) -> Dict[str, Any]:
-        """Get statistics about loaded data."""
+    def get_status(self, start: date = None, end: date = None,
+                   closed: Iterable[date] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Coverage status from the call_data_status() RPC in one request:
+        min/max call_date, total_records, days_loaded, empty_days,
+        first/last_loaded, and 'missing' as (first, last, business days) runs
+        between start (default: first tracked day) and end (default: today).
+        None if the RPC fails (e.g. the function has not been created yet).
+        """
+        params = {'p_closed_dates': sorted(d.isoformat() for d in closed)}
+        if start:
+            params['p_start'] = start.isoformat()
+        if end:
+            params['p_end'] = end.isoformat()
+        try:
+            result = self.client.rpc("call_data_status", params).execute()
+        except Exception as e:
+            logger.warning(f"Could not fetch status from call_data_status(): {e}")
+            return None
+        status = result.data if isinstance(result.data, dict) else None
+        if status is None:
+            return None
+        for key in ('first_loaded', 'last_loaded'):
+            status[key] = date.fromisoformat(status[key]) if status.get(key) else None
+        status['missing'] = [(date.fromisoformat(first), date.fromisoformat(last), days)
+                             for first, last, days in status.get('missing') or []]
+        return status
+    
+    def get_date_stats(self, use_rpc: bool = True) -> Dict[str, Any]:
+        """
+        Get statistics about loaded data: one call_data_status() RPC, else
+        (or with use_rpc=False) separate min, max and count requests.
+        """
+        status = self.get_status(end=date.today()) if use_rpc else None
+        if status is not None:
+            return {key: status[key] for key in ('min_date', 'max_date', 'total_records', 'days_loaded')}
         try:
             result = self.client.table("call_records").select(
                 "call_date"
@@ -259,27 +1295,1291 @@ class SupabaseCallStore:
             ).execute()
             total_count = result.count or 0
             
-            loaded_dates = self.get_loaded_dates()
-            
             return {
                 'min_date': min_date,
                 'max_date': max_date,
                 'total_records': total_count,
-                'days_loaded': len(loaded_dates)
+                'days_loaded': self.count_loaded_dates() or 0
             }
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             return {}
 
 
+def _copy_field(value: Any) -> str:
+    """One COPY csv field: strings quoted (so '' stays ''), None bare (NULL)."""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+class _CsvRecordStream:
+    """
+    Read-only file object producing COPY csv text from an iterable of records,
+    so COPY ... FROM STDIN can stream records without materialising them.
+    """
+    
+    def __init__(self, records: Iterable[Any], columns: Tuple[str, ...], on_record=None):
+        self.records = iter(records)
+        self.columns = columns
+        self.on_record = on_record
+        self.pending = ''
+        self.rows = 0
+    
+    def read(self, size: int = -1) -> str:
+        lines = [self.pending]
+        buffered = len(self.pending)
+        while size < 0 or buffered < size:
+            record = next(self.records, None)
+            if record is None:
+                break
+            if isinstance(record, CallRecord):
+                record = record.to_dict()
+            if self.on_record:
+                self.on_record(record)
+            line = ','.join([_copy_field(record.get(c)) for c in self.columns]) + '\n'
+            lines.append(line)
+            buffered += len(line)
+            self.rows += 1
+        text = ''.join(lines)
+        if size < 0 or len(text) <= size:
+            self.pending = ''
+            return text
+        self.pending = text[size:]
+        return text[:size]
+    
+    readline = read
+
+
+class PostgresCopyLoader:
+    """
+    Bulk loader over a direct Postgres connection, for historical backfills.
+    Records are streamed with COPY ... FROM STDIN into a temporary staging
+    table, merged into call_records with one INSERT ... ON CONFLICT DO UPDATE,
+    and call_load_tracker is updated in the same transaction. When call_records
+    is partitioned by month, missing partitions are created first and each
+    month's rows are merged straight into its partition.
+    """
+    
+    COLUMNS = (
+        'call_time', 'call_id', 'call_date', 'direction', 'status', 'extension',
+        'employee_name', 'phone_number', 'linked', 'caller_id_raw', 'ringing_seconds',
+        'talking_seconds', 'cost', 'from_field', 'to_field', 'call_activity_details',
+        'source_file'
+    )
+    
+    def __init__(self, dsn: str):
+        if psycopg2 is None:
+            raise ValueError("The COPY loader needs psycopg2 (pip install psycopg2-binary)")
+        if not dsn:
+            raise ValueError("Missing SUPABASE_DB_URL for the COPY loader")
+        self.dsn = dsn
+        self.conn = psycopg2.connect(dsn)
+        with self.conn, self.conn.cursor() as cur:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                        "WHERE partrelid = to_regclass('call_records'))")
+            self.partitioned = cur.fetchone()[0]
+        self.rows = 0
+        self.seconds = 0.0
+    
+    def _merge_sql(self, table: str = 'call_records', conflict: str = CALL_RECORDS_CONFLICT,
+                   where: str = '') -> str:
+        columns = ', '.join(self.COLUMNS)
+        key = conflict.replace(',', ', ')
+        updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in self.COLUMNS if c not in key.split(', '))
+        # DISTINCT ON guards against two rows for the same key in one load
+        # (e.g. one instant written with two different UTC offsets); ordering by
+        # the staging ordinal keeps the first one copied, as the REST path does
+        return (f"INSERT INTO {table} ({columns}) "
+                f"SELECT DISTINCT ON ({key}) {columns} FROM call_records_staging {where}"
+                f"ORDER BY {key}, ordinal "
+                f"ON CONFLICT ({key}) DO UPDATE SET {updates}")
+    
+    def _merge_partitions(self, cur) -> int:
+        """Create the partitions the staged rows need, then merge each month into its own partition."""
+        cur.execute("SELECT DISTINCT date_trunc('month', call_date)::date FROM call_records_staging ORDER BY 1")
+        months = [row[0] for row in cur.fetchall()]
+        if not months:
+            return 0
+        cur.execute("SELECT ensure_call_records_partitions(%s, %s)",
+                    (months[0], max(months[-1], add_months(date.today(), PARTITION_MONTHS_AHEAD))))
+        merged = 0
+        for month in months:
+            cur.execute(self._merge_sql(partition_name(month), PARTITIONED_CONFLICT,
+                                        "WHERE call_date >= %s AND call_date < %s "),
+                        (month, add_months(month, 1)))
+            merged += cur.rowcount
+        return merged
+    
+    def load(self, records: Iterable[Any], source: str,
+             counts: Optional[Dict[date, int]] = None) -> Tuple[int, Dict[date, int]]:
+        """
+        Load records (any iterable; consumed lazily) in one transaction and mark
+        every date seen as loaded. counts overrides the per-date record counts
+        written to the tracker. Returns (rows merged, records per date). A
+        failure rolls the whole transaction back and is raised, so nothing is
+        marked loaded and the caller cannot mistake it for an empty load.
+        """
+        seen_counts: Dict[str, int] = {}
+        
+        def count(record: Dict[str, Any]):
+            seen_counts[record['call_date']] = seen_counts.get(record['call_date'], 0) + 1
+        
+        stream = _CsvRecordStream(records, self.COLUMNS, on_record=count)
+        started = time.perf_counter()
+        try:
+            with self.conn:
+                with self.conn.cursor() as cur:
+                    cur.execute(
+                        f"CREATE TEMP TABLE call_records_staging ON COMMIT DROP AS "
+                        f"SELECT {', '.join(self.COLUMNS)} FROM call_records WITH NO DATA"
+                    )
+                    # Numbered in the order COPY writes the rows
+                    cur.execute("ALTER TABLE call_records_staging ADD COLUMN ordinal BIGSERIAL")
+                    cur.copy_expert(
+                        f"COPY call_records_staging ({', '.join(self.COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                        stream
+                    )
+                    if self.partitioned:
+                        merged = self._merge_partitions(cur)
+                    else:
+                        cur.execute(self._merge_sql())
+                        merged = cur.rowcount
+                    
+                    day_counts = counts or {date.fromisoformat(d): n for d, n in seen_counts.items()}
+                    if day_counts:
+                        cur.executemany(
+                            "INSERT INTO call_load_tracker (load_date, record_count, source, loaded_at) "
+                            "VALUES (%s, %s, %s, NOW()) "
+                            "ON CONFLICT (load_date) DO UPDATE SET record_count = EXCLUDED.record_count, "
+                            "source = EXCLUDED.source, loaded_at = EXCLUDED.loaded_at",
+                            [(d, n, source) for d, n in sorted(day_counts.items())]
+                        )
+        except Exception:
+            logger.exception(f"COPY load of {source} failed, transaction rolled back")
+            raise
+        
+        elapsed = time.perf_counter() - started
+        self.rows += merged
+        self.seconds += elapsed
+        rate = merged / elapsed if elapsed else 0
+        logger.info(f"  COPY loaded {merged:,} rows for {len(day_counts)} day(s) in {elapsed:.2f}s "
+                    f"({rate:,.0f} rows/sec)")
+        return merged, day_counts
+    
+    def summary(self) -> str:
+        rate = self.rows / self.seconds if self.seconds else 0
+        return f"COPY {self.rows:,} rows in {self.seconds:.2f}s ({rate:,.0f} rows/sec)"
+    
+    def close(self):
+        self.conn.close()
+
+
+class UploadPipeline:
+    """
+    Concurrent upsert pipeline in front of SupabaseCallStore.
+    Batches are uploaded on a thread pool with at most max_in_flight requests
+    outstanding; submit() blocks when the window is full (backpressure).
+    Each batch is retried with exponential backoff before falling back to
+    the store's per-record handling. Records are submitted in groups (one
+    per call date) and when_done() callbacks only fire once every batch of
+    the group has been fully stored.
+    """
+    
+    def __init__(self, store: 'SupabaseCallStore', workers: int = 4, max_in_flight: int = None,
+                 retries: int = 3, backoff: float = 0.5):
+        self.store = store
+        self.retries = retries
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload')
+        self.window = threading.BoundedSemaphore(max_in_flight or workers * 2)
+        self.lock = threading.Lock()
+        self.pending: Dict[Any, int] = {}
+        self.failed_groups: Set[Any] = set()
+        self.callbacks: Dict[Any, Any] = {}
+        self.inserted = 0
+        self.batches = 0
+        self.retried = 0
+    
+    def submit(self, records: List[Any], group: Any = None):
+        """Queue records for upload under group, in batches sized by the store's batcher."""
+        records = records_as_dicts(records)
+        self.store.ensure_partitions({r['call_date'] for r in records})
+        for batch in self.store.batcher.split(records):
+            self.window.acquire()
+            with self.lock:
+                self.pending[group] = self.pending.get(group, 0) + 1
+                self.batches += 1
+            try:
+                self.executor.submit(self._upload, batch, group)
+            except Exception:
+                self.window.release()
+                raise
+    
+    def when_done(self, group: Any, callback):
+        """Run callback() once all batches submitted for group have succeeded."""
+        with self.lock:
+            if self.pending.get(group, 0) > 0:
+                self.callbacks[group] = callback
+                return
+            failed = group in self.failed_groups
+        if not failed:
+            callback()
+    
+    def _upload(self, batch: List[Dict[str, Any]], group: Any):
+        try:
+            inserted = self._upload_with_retry(batch)
+        except Exception as e:  # Never leave a group pending
+            logger.error(f"Upload worker error: {e}")
+            inserted = 0
+        finally:
+            self.window.release()
+        
+        callback = None
+        with self.lock:
+            self.inserted += inserted
+            if inserted < len(batch):
+                self.failed_groups.add(group)
+            self.pending[group] -= 1
+            if self.pending[group] == 0 and group not in self.failed_groups:
+                callback = self.callbacks.pop(group, None)
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Upload completion callback failed for {group}: {e}")
+    
+    def _upload_with_retry(self, batch: List[Dict[str, Any]]) -> int:
+        for attempt in range(self.retries + 1):
+            try:
+                self.store.upsert_batch(batch)
+                return len(batch)
+            except Exception as e:
+                if attempt == self.retries:
+                    return self.store.insert_batch(batch, error=e)
+                with self.lock:
+                    self.retried += 1
+                time.sleep(self.backoff * (2 ** attempt))
+        return 0
+    
+    def close(self) -> int:
+        """Wait for every queued batch; returns the number of records stored."""
+        self.executor.shutdown(wait=True)
+        if self.failed_groups:
+            logger.warning(f"Upload pipeline: {len(self.failed_groups)} group(s) had failed rows "
+                           f"and were not marked loaded")
+        logger.info(f"Upload pipeline: {self.batches} batches, {self.retried} retries, "
+                    f"{self.inserted} records stored")
+        return self.inserted
+
+
+# Same metrics as the v_* views in SUPABASE_DDL, computed from the local mirror's
+# call_records for the days between :since and :until
+MIRROR_REPORTS = {
+    'daily_summary': """
+        SELECT call_date,
+               COUNT(*) AS total_calls,
+               SUM(direction = 'Outbound') AS outbound,
+               SUM(direction = 'Inbound') AS inbound,
+               SUM(direction = 'Internal') AS internal,
+               SUM(status = 'Answered') AS answered,
+               SUM(status = 'Unanswered') AS unanswered,
+               SUM(talking_seconds) / 60 AS total_talk_minutes,
+               ROUND(SUM(cost), 4) AS total_cost
+        FROM call_records
+        WHERE call_date BETWEEN :since AND :until
+        GROUP BY call_date
+        ORDER BY call_date DESC""",
+    'inbound_by_employee': """
+        SELECT call_date, extension, employee_name,
+               COUNT(*) AS total_calls,
+               SUM(status = 'Answered') AS answered,
+               SUM(status = 'Unanswered') AS missed,
+               SUM(talking_seconds) AS total_talk_seconds,
+               ROUND(AVG(CASE WHEN status = 'Answered' THEN talking_seconds END), 1) AS avg_talk_seconds,
+               ROUND(AVG(ringing_seconds), 1) AS avg_ring_seconds
+        FROM call_records
+        WHERE call_date BETWEEN :since AND :until
+          AND direction = 'Inbound'
+          AND extension IS NOT NULL AND extension <> ''
+          AND extension NOT IN ('801', '807', '808', '809')
+        GROUP BY call_date, extension, employee_name
+        ORDER BY call_date DESC, extension""",
+    'outbound_by_salesperson': """
+        SELECT call_date, extension, employee_name, phone_number,
+               COUNT(*) AS total_calls,
+               SUM(status = 'Answered') AS answered,
+               SUM(status = 'Unanswered') AS unanswered,
+               ROUND(100.0 * SUM(status = 'Answered') / COUNT(*), 1) AS connect_rate,
+               SUM(talking_seconds) AS total_talk_seconds,
+               ROUND(AVG(CASE WHEN status = 'Answered' THEN talking_seconds END), 1) AS avg_talk_seconds
+        FROM call_records
+        WHERE call_date BETWEEN :since AND :until
+          AND direction = 'Outbound'
+        GROUP BY call_date, extension, employee_name, phone_number
+        ORDER BY call_date DESC, extension, total_calls DESC""",
+    'repeat_callers': """
+        SELECT phone_number,
+               MIN(call_date) AS first_call,
+               MAX(call_date) AS last_call,
+               COUNT(*) AS total_calls,
+               COUNT(DISTINCT call_date) AS days_called,
+               SUM(talking_seconds) AS total_talk_seconds
+        FROM call_records
+        WHERE call_date BETWEEN :since AND :until
+          AND direction = 'Inbound'
+          AND LENGTH(phone_number) = 10
+        GROUP BY phone_number
+        HAVING COUNT(*) > 1
+        ORDER BY total_calls DESC, phone_number""",
+    'salesperson_daily': """
+        SELECT call_date, extension, employee_name,
+               SUM(direction = 'Outbound') AS outbound_calls,
+               SUM(direction = 'Outbound' AND status = 'Answered') AS outbound_connected,
+               SUM(direction = 'Inbound') AS inbound_calls,
+               SUM(direction = 'Inbound' AND status = 'Answered') AS inbound_answered,
+               SUM(talking_seconds) AS total_talk_seconds,
+               ROUND(SUM(talking_seconds) / 60.0, 1) AS total_talk_minutes
+        FROM call_records
+        WHERE call_date BETWEEN :since AND :until
+          AND extension BETWEEN '100' AND '199'
+        GROUP BY call_date, extension, employee_name
+        ORDER BY call_date DESC, employee_name""",
+}
+
+
+class LocalCallMirror:
+    """
+    Local SQLite copy of call_records, written from the same records the
+    processor parses and uploads, for --report / --query without Supabase
+    round-trips. Rows are keyed by (call_date, record_key()) in a clustered
+    WITHOUT ROWID table, so a date-range report only reads the days it covers
+    and re-loading a day replaces its rows like the Supabase upsert does.
+    """
+    
+    COLUMNS = PostgresCopyLoader.COLUMNS
+    
+    def __init__(self, path: str = LOCAL_MIRROR_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.written = 0
+        columns = ',\n'.join(f"    {c} {self._column_type(c)}" for c in self.COLUMNS)
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS call_records (\n    record_key TEXT NOT NULL,\n{columns},\n"
+                f"    PRIMARY KEY (call_date, record_key)\n) WITHOUT ROWID"
+            )
+    
+    @staticmethod
+    def _column_type(column: str) -> str:
+        if column.endswith('_seconds'):
+            return 'INTEGER'
+        if column == 'cost':
+            return 'REAL'
+        return 'TEXT NOT NULL' if column == 'call_date' else 'TEXT'
+    
+    def write(self, records: Iterable[Any]) -> int:
+        """Insert or replace records (dicts or CallRecord objects) in one transaction."""
+        rows = [(record_key(r), *(r[c] for c in self.COLUMNS)) for r in records_as_dicts(list(records))]
+        if not rows:
+            return 0
+        placeholders = ', '.join('?' * (len(self.COLUMNS) + 1))
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO call_records (record_key, {', '.join(self.COLUMNS)}) "
+                f"VALUES ({placeholders})", rows
+            )
+        self.written += len(rows)
+        return len(rows)
+    
+    def tee(self, records: Iterable[Any], chunk_rows: int = UPSERT_BATCH_SIZE) -> Iterator[Any]:
+        """Pass records through unchanged, writing them to the mirror in chunks as they go by."""
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_rows:
+                self.write(chunk)
+                chunk = []
+            yield record
+        self.write(chunk)
+    
+    def query(self, sql: str, params: Any = ()) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Run sql against the mirror; returns (column names, rows)."""
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description or ()]
+            return columns, cursor.fetchall()
+    
+    def report(self, name: str, since: date = None, until: date = None) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """One of MIRROR_REPORTS over call dates since..until (inclusive; open-ended when None)."""
+        return self.query(MIRROR_REPORTS[name], {
+            'since': since.isoformat() if since else '0000-00-00',
+            'until': until.isoformat() if until else '9999-99-99'
+        })
+    
+    def close(self):
+        self.conn.close()
+
+
+def print_table(columns: List[str], rows: List[Tuple[Any, ...]], limit: int = None):
+    """Print query results as an aligned text table (at most limit rows)."""
+    shown = rows[:limit] if limit else rows
+    cells = [[('' if v is None else f"{v:,.2f}" if isinstance(v, float) else str(v)) for v in row]
+             for row in shown]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in cells:
+        print('  '.join(v.rjust(w) if v[:1].isdigit() or v[:1] == '-' else v.ljust(w)
+                        for v, w in zip(row, widths)))
+    if len(shown) < len(rows):
+        print(f"... {len(rows) - len(shown):,} more rows")
+
+
+def parse_imap_list(data: bytes) -> List[Any]:
+    """
+    Parse an IMAP parenthesized list (e.g. a BODYSTRUCTURE response) into nested
+    Python lists. Strings and atoms become str, NIL becomes None; {n} literals
+    are read inline.
+    """
+    stack: List[List[Any]] = [[]]
+    pos = 0
+    while pos < len(data):
+        c = data[pos:pos + 1]
+        if c in (b' ', b'\r', b'\n'):
+            pos += 1
+        elif c == b'(':
+            stack.append([])
+            pos += 1
+        elif c == b')':
+            if len(stack) > 1:
+                done = stack.pop()
+                stack[-1].append(done)
+            pos += 1
+        elif c == b'"':
+            pos += 1
+            value = bytearray()
+            while pos < len(data) and data[pos:pos + 1] != b'"':
+                if data[pos:pos + 1] == b'\\':
+                    pos += 1
+                value += data[pos:pos + 1]
+                pos += 1
+            stack[-1].append(value.decode('utf-8', errors='replace'))
+            pos += 1
+        elif c == b'{':
+            end = data.index(b'}', pos)
+            length = int(data[pos + 1:end])
+            start = data.index(b'\n', end) + 1
+            stack[-1].append(data[start:start + length].decode('utf-8', errors='replace'))
+            pos = start + length
+        else:
+            end = pos
+            while end < len(data) and data[end:end + 1] not in (b' ', b'(', b')', b'\r', b'\n'):
+                end += 1
+            atom = data[pos:end].decode('ascii', errors='replace')
+            stack[-1].append(None if atom.upper() == 'NIL' else atom)
+            pos = end
+    return stack[0]
+
+
+def _imap_response_bytes(msg_data: List[Any]) -> bytes:
+    """Re-join imaplib's split FETCH response (literals arrive as tuples) into one buffer."""
+    joined = bytearray()
+    for part in msg_data:
+        if isinstance(part, tuple):
+            joined += part[0] + b'\r\n' + part[1]
+        elif part:
+            joined += part
+    return bytes(joined)
+
+
+class IMAPSectionReader(io.RawIOBase):
+    """
+    Decoded bytes of one MIME part, fetched on demand as partial
+    BODY[section]<offset.length> chunks and decoded incrementally, so the
+    attachment never sits in memory whole. Handles base64, quoted-printable
+    and identity transfer encodings.
+    """
+    
+    def __init__(self, fetch: Callable[[bytes, str], Tuple[str, List[Any]]], email_id: bytes, section: str,
+                 encoding: str, size: int, chunk_size: int = ATTACHMENT_CHUNK_BYTES):
+        super().__init__()
+        self.fetch = fetch  # conn.fetch, or UID FETCH in incremental sync mode
+        self.email_id = email_id
+        self.section = section
+        self.encoding = (encoding or '7bit').lower()
+        self.size = size
+        self.chunk_size = max(4096, chunk_size)
+        self.offset = 0
+        self.wire_bytes = 0
+        self.pending = b''  # Encoded bytes not yet decodable (partial base64 quantum / QP line)
+        self.decoded = bytearray()
+        self.eof = False
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, b) -> int:
+        while not self.decoded and not self.eof:
+            self._fetch_next()
+        n = min(len(b), len(self.decoded))
+        b[:n] = self.decoded[:n]
+        del self.decoded[:n]
+        return n
+    
+    def _fetch_next(self):
+        raw = b''
+        if self.size <= 0 or self.offset < self.size:
+            typ, msg_data = self.fetch(
+                self.email_id, f'(BODY[{self.section}]<{self.offset}.{self.chunk_size}>)'
+            )
+            if typ != 'OK':
+                raise imaplib.IMAP4.error(f"Partial fetch of section {self.section} returned {typ}")
+            raw = next((part[1] for part in msg_data if isinstance(part, tuple)), b'')
+            self.offset += len(raw)
+            self.wire_bytes += len(raw)
+        if not raw:
+            self.decoded += self._decode(b'', final=True)
+            self.eof = True
+            return
+        self.decoded += self._decode(raw)
+    
+    def _decode(self, raw: bytes, final: bool = False) -> bytes:
+        if self.encoding == 'base64':
+            self.pending += raw.translate(None, b' \t\r\n')
+            usable = len(self.pending) if final else len(self.pending) - len(self.pending) % 4
+            out, self.pending = self.pending[:usable], self.pending[usable:]
+            return binascii.a2b_base64(out) if out else b''
+        if self.encoding == 'quoted-printable':
+            self.pending += raw
+            cut = len(self.pending) if final else self.pending.rfind(b'\n') + 1
+            out, self.pending = self.pending[:cut], self.pending[cut:]
+            return binascii.a2b_qp(out) if out else b''
+        return raw
+
+
+class AttachmentCache:
+    """
+    On-disk cache of downloaded CSV attachments. Blobs are gzip files named by
+    the SHA-256 of their content (identical attachments are stored once);
+    index.json maps each email's Message-ID to its blob. Entries older than
+    max_days are dropped and the least recently used are evicted once the
+    blobs exceed max_mb. The index is written when entries are stored or
+    evicted; access times from cache hits are written once by flush().
+    """
+    
+    INDEX_FILE = 'index.json'
+    
+    def __init__(self, cache_dir: str, max_mb: int = ATTACHMENT_CACHE_MAX_MB,
+                 max_days: int = ATTACHMENT_CACHE_MAX_DAYS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age = max_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.lock = threading.RLock()  # IMAP fetch pool threads share one cache
+        self.dirty = False  # In-memory index differs from index.json
+        self.index: Dict[str, Dict[str, Any]] = {}
+        index_path = self.cache_dir / self.INDEX_FILE
+        if index_path.exists():
+            try:
+                self.index = json.loads(index_path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Attachment cache index unreadable, starting empty: {e}")
+        self.evict()
+    
+    def _blob_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.csv.gz"
+    
+    def _save_index(self):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.cache_dir / self.INDEX_FILE)
+        self.dirty = False
+    
+    def flush(self):
+        """Write the index if anything (such as a hit's access time) changed since it was saved."""
+        with self.lock:
+            if self.dirty:
+                self._save_index()
+    
+    def open(self, message_id: str) -> Optional[TextIO]:
+        """Text stream over a cached attachment, or None on a miss."""
+        with self.lock:
+            entry = self.index.get(message_id)
+            if entry and self._blob_path(entry['sha256']).exists():
+                self.hits += 1
+                entry['last_used'] = time.time()
+                self.dirty = True
+                return gzip.open(self._blob_path(entry['sha256']), 'rt', encoding='utf-8', newline=None)
+            self.misses += 1
+            return None
+    
+    def put(self, message_id: str, csv_content: str):
+        """Cache a fully downloaded attachment."""
+        for _ in self.tee(message_id, [csv_content]):
+            pass
+    
+    def tee(self, message_id: str, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Pass text through while compressing it into the cache, so a streamed
+        download is cached without being held in memory. The entry is only
+        committed once the stream has been read to the end.
+        """
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        committed = False
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8', newline='') as out:
+                for chunk in chunks:
+                    digest.update(chunk.encode('utf-8'))
+                    out.write(chunk)
+                    yield chunk
+            with self.lock:
+                blob = self._blob_path(digest.hexdigest())
+                if blob.exists():
+                    os.remove(tmp)
+                else:
+                    os.replace(tmp, blob)
+                now = time.time()
+                self.index[message_id] = {'sha256': digest.hexdigest(), 'stored_at': now, 'last_used': now}
+                self.stored += 1
+                self.dirty = True
+                committed = True
+                self.evict()
+        finally:
+            if not committed and os.path.exists(tmp):
+                os.remove(tmp)
+    
+    def evict(self):
+        """Apply the age and size limits, then drop blobs no entry refers to."""
+        with self.lock:
+            self._evict()
+    
+    def _evict(self):
+        now = time.time()
+        expired = [k for k, e in self.index.items() if now - e['stored_at'] > self.max_age]
+        for key in expired:
+            del self.index[key]
+        self.evicted += len(expired)
+        changed = bool(expired)
+        
+        blobs = {p.name[:-len('.csv.gz')]: p for p in self.cache_dir.glob('*.csv.gz')}
+        referenced = {e['sha256'] for e in self.index.values()}
+        for digest in set(blobs) - referenced:
+            blobs.pop(digest).unlink()
+        
+        sizes = {digest: path.stat().st_size for digest, path in blobs.items()}
+        total = sum(sizes.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            del self.index[key]
+            self.evicted += 1
+            changed = True
+            digest = entry['sha256']
+            if digest in blobs and digest not in {e['sha256'] for e in self.index.values()}:
+                total -= sizes[digest]
+                blobs.pop(digest).unlink()
+        if changed or self.dirty:
+            self._save_index()
+    
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = f" ({100 * self.hits / lookups:.1f}% hit rate)" if lookups else ""
+        return (f"{self.hits} hits, {self.misses} misses{rate}, {self.stored} stored, "
+                f"{self.evicted} evicted, {len(self.index)} entries")
+
+
+class MailboxSyncState:
+    """
+    Persisted incremental-sync state for the INBOX: the UIDVALIDITY it was
+    built under, the highest UID already scanned, and every report email
+    found so far (UID -> date and Message-ID).
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.uidvalidity: Optional[int] = None
+        self.last_uid = 0
+        self.since: Optional[date] = None
+        self.reports: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+                self.uidvalidity = state['uidvalidity']
+                self.last_uid = state['last_uid']
+                self.since = date.fromisoformat(state['since'])
+                self.reports = state['reports']
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Mailbox sync state unreadable, rescanning: {e}")
+    
+    def usable(self, uidvalidity: int, since_date: date) -> bool:
+        """True if UIDs recorded earlier still identify the same messages and cover since_date."""
+        return self.uidvalidity == uidvalidity and self.since is not None and self.since <= since_date
+    
+    def reset(self, uidvalidity: int, since_date: date):
+        self.uidvalidity = uidvalidity
+        self.last_uid = 0
+        self.since = since_date
+        self.reports = {}
+    
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({
+                'uidvalidity': self.uidvalidity,
+                'last_uid': self.last_uid,
+                'since': self.since.isoformat(),
+                'reports': self.reports,
+            }, f)
+        os.replace(tmp, self.path)
+
+
+class ReportCoverageIndex:
+    """
+    Actual call_date range of each report email's attachment, keyed by
+    Message-ID and learned the first time the attachment is parsed. Reports
+    not seen yet are assumed to cover the REPORT_WINDOW_DAYS before their date.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.reports: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.reports = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Report coverage index unreadable, starting empty: {e}")
+    
+    def window(self, message_id: Optional[str], email_date: date) -> Tuple[date, date, float]:
+        """
+        (first, last, rows) of a report: learned when known, else the assumed
+        window with rows estimated from the learned reports' rows per day.
+        """
+        entry = self.reports.get(message_id) if message_id else None
+        if entry:
+            return date.fromisoformat(entry['first']), date.fromisoformat(entry['last']), entry['rows']
+        return email_date - timedelta(days=REPORT_WINDOW_DAYS), email_date, (REPORT_WINDOW_DAYS + 1) * self.rows_per_day()
+    
+    def learned(self, message_id: Optional[str]) -> bool:
+        """True if the report's call_date range is known from parsing it."""
+        return bool(message_id) and message_id in self.reports
+    
+    def rows_per_day(self) -> float:
+        days = sum((date.fromisoformat(e['last']) - date.fromisoformat(e['first'])).days + 1
+                   for e in self.reports.values())
+        return sum(e['rows'] for e in self.reports.values()) / days if days else 1.0
+    
+    def learn(self, message_id: Optional[str], call_dates: Iterable[date], rows: int):
+        """Record the call_date range and row count of a parsed attachment."""
+        call_dates = list(call_dates)
+        if not message_id or not call_dates:
+            return
+        entry = {'first': min(call_dates).isoformat(), 'last': max(call_dates).isoformat(), 'rows': rows}
+        if self.reports.get(message_id) != entry:
+            self.reports[message_id] = entry
+            self.save()
+    
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.reports, f)
+        os.replace(tmp, self.path)
+
+
+def cover_dates(intervals: List[Tuple[date, date, float, Any]],
+                missing: Iterable[date]) -> Tuple[List[Any], List[date]]:
+    """
+    Cheapest set of (first, last, cost, item) intervals covering the missing
+    dates (fewer intervals on equal cost). Dates are swept in order; best[k]
+    is the cheapest cover of the first k+1 dates, and some chosen interval
+    must contain date k, so best[k] = min over intervals [a..b] containing k
+    of cost + best[a-1]. Those candidates sit in a heap keyed by that total,
+    which makes the sweep O(dates + intervals log (dates + intervals)).
+    Returns the chosen items and the dates no interval covers.
+    """
+    dates = sorted(set(missing))
+    reachable = []  # (a, b): indexes of the first and last date an interval covers
+    for first, last, cost, item in intervals:
+        a = bisect.bisect_left(dates, first)
+        b = bisect.bisect_right(dates, last) - 1
+        if a <= b:
+            reachable.append((a, b, cost, item))
+    reachable.sort(key=lambda iv: iv[0])
+    
+    # Union of the index ranges, marked run by run so each date is visited once
+    coverable = [False] * len(dates)
+    reach = -1
+    for a, b, _, _ in reachable:
+        for k in range(max(a, reach + 1), b + 1):
+            coverable[k] = True
+        reach = max(reach, b)
+    uncovered = [d for k, d in enumerate(dates) if not coverable[k]]
+    
+    best: Dict[int, Tuple[float, int]] = {-1: (0, 0)}
+    choice: Dict[int, int] = {}
+    heap: List[Tuple[float, int, int, int]] = []
+    i = 0
+    for k in range(len(dates)):
+        if not coverable[k]:
+            best[k] = best[k - 1]
+            continue
+        while i < len(reachable) and reachable[i][0] <= k:
+            a, b, cost, _ = reachable[i]
+            prior_cost, prior_count = best[a - 1]
+            heapq.heappush(heap, (prior_cost + cost, prior_count + 1, b, i))
+            i += 1
+        while heap[0][2] < k:
+            heapq.heappop(heap)
+        total, count, _, index = heap[0]
+        best[k] = (total, count)
+        choice[k] = index
+    
+    chosen = []
+    k = len(dates) - 1
+    while k >= 0:
+        if k not in choice:
+            k -= 1
+            continue
+        a, _, _, item = reachable[choice[k]]
+        chosen.append(item)
+        k = a - 1
+    chosen.reverse()
+    return chosen, uncovered
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based; -1 = last) given weekday (Mon=0) of a month."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    """Fixed-date holiday as observed: Saturday -> Friday, Sunday -> Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+HOLIDAY_RULES: Dict[str, Callable[[int], date]] = {
+    'new_year': lambda y: _observed(date(y, 1, 1)),
+    'mlk_day': lambda y: _nth_weekday(y, 1, 0, 3),
+    'presidents_day': lambda y: _nth_weekday(y, 2, 0, 3),
+    'good_friday': lambda y: _easter(y) - timedelta(days=2),
+    'memorial_day': lambda y: _nth_weekday(y, 5, 0, -1),
+    'juneteenth': lambda y: _observed(date(y, 6, 19)),
+    'independence_day': lambda y: _observed(date(y, 7, 4)),
+    'labor_day': lambda y: _nth_weekday(y, 9, 0, 1),
+    'columbus_day': lambda y: _nth_weekday(y, 10, 0, 2),
+    'veterans_day': lambda y: _observed(date(y, 11, 11)),
+    'thanksgiving': lambda y: _nth_weekday(y, 11, 3, 4),
+    'day_after_thanksgiving': lambda y: _nth_weekday(y, 11, 3, 4) + timedelta(days=1),
+    'christmas_eve': lambda y: _observed(date(y, 12, 24)),
+    'christmas': lambda y: _observed(date(y, 12, 25)),
+}
+
+
+class BusinessCalendar:
+    """
+    Days the office takes calls: weekdays, minus holidays from named
+    HOLIDAY_RULES and a holiday file. The file lists one YYYY-MM-DD per line
+    (# comments allowed); a leading "+" marks a day open even if a rule
+    closes it.
+    """
+    
+    def __init__(self, holiday_file: Optional[str] = HOLIDAY_FILE, rules: Iterable[str] = None):
+        if rules is None:
+            rules = [r.strip() for r in BUSINESS_HOLIDAYS.split(',') if r.strip()]
+        unknown = [r for r in rules if r not in HOLIDAY_RULES]
+        if unknown:
+            raise ValueError(f"Unknown holiday rule(s): {', '.join(unknown)} "
+                             f"(known: {', '.join(HOLIDAY_RULES)})")
+        self.rules = list(rules)
+        self.closed: Set[date] = set()
+        self.opened: Set[date] = set()
+        self._years: Dict[int, Set[date]] = {}
+        if holiday_file and os.path.exists(holiday_file):
+            with open(holiday_file) as f:
+                for line in f:
+                    line = line.split('#', 1)[0].strip()
+                    if not line:
+                        continue
+                    try:
+                        if line.startswith('+'):
+                            self.opened.add(date.fromisoformat(line[1:].strip()))
+                        else:
+                            self.closed.add(date.fromisoformat(line))
+                    except ValueError:
+                        logger.warning(f"Ignoring bad line in {holiday_file}: {line!r}")
+    
+    def holidays(self, year: int) -> Set[date]:
+        """Closed weekdays of one year."""
+        if year not in self._years:
+            # Next year's rules too: 1 January on a Saturday is observed on 31 December
+            days = {HOLIDAY_RULES[rule](y) for rule in self.rules for y in (year, year + 1)}
+            days |= {d for d in self.closed if d.year == year}
+            self._years[year] = {d for d in days - self.opened if d.year == year and d.weekday() < 5}
+        return self._years[year]
+    
+    def is_business_day(self, d: date) -> bool:
+        return d.weekday() < 5 and d not in self.holidays(d.year)
+    
+    def closed_days(self, first: date, last: date) -> List[date]:
+        """Holidays falling on weekdays in [first, last]."""
+        return sorted(d for year in range(first.year, last.year + 1)
+                      for d in self.holidays(year) if first <= d <= last)
+    
+    def business_days(self, first: date, last: date) -> Iterator[date]:
+        current = first
+        while current <= last:
+            if self.is_business_day(current):
+                yield current
+            current += timedelta(days=1)
+    
+    def count_business_days(self, first: date, last: date) -> int:
+        """Business days in [first, last], without walking the range."""
+        if last < first:
+            return 0
+        weeks, rest = divmod((last - first).days + 1, 7)
+        weekdays = weeks * 5 + sum(1 for i in range(rest) if (first.weekday() + i) % 7 < 5)
+        closed = sum(1 for year in range(first.year, last.year + 1)
+                     for d in self.holidays(year) if first <= d <= last)
+        return weekdays - closed
+
+
+class DateRanges:
+    """
+    A set of dates kept as sorted, merged, inclusive (first, last) ranges, so
+    years of consecutive loaded days are a handful of entries and membership
+    and gap queries are binary searches.
+    """
+    
+    def __init__(self, ranges: Iterable[Tuple[date, date]] = ()):
+        self.firsts: List[date] = []
+        self.lasts: List[date] = []
+        for first, last in ranges:
+            self.add(first, last)
+    
+    def add(self, first: date, last: date = None):
+        """Add the dates first..last (or just first), merging adjacent and overlapping ranges."""
+        last = last or first
+        one_day = timedelta(days=1)
+        lo = bisect.bisect_left(self.lasts, first - one_day)
+        hi = bisect.bisect_right(self.firsts, last + one_day)
+        if lo < hi:
+            first = min(first, self.firsts[lo])
+            last = max(last, self.lasts[hi - 1])
+        self.firsts[lo:hi] = [first]
+        self.lasts[lo:hi] = [last]
+    
+    def discard(self, d: date):
+        """Remove one date, splitting the range that holds it."""
+        i = bisect.bisect_right(self.firsts, d) - 1
+        if i < 0 or self.lasts[i] < d:
+            return
+        first, last = self.firsts[i], self.lasts[i]
+        pieces = [(a, b) for a, b in ((first, d - timedelta(days=1)), (d + timedelta(days=1), last)) if a <= b]
+        self.firsts[i:i + 1] = [a for a, _ in pieces]
+        self.lasts[i:i + 1] = [b for _, b in pieces]
+    
+    def __contains__(self, d: date) -> bool:
+        i = bisect.bisect_right(self.firsts, d) - 1
+        return i >= 0 and self.lasts[i] >= d
+    
+    def __iter__(self) -> Iterator[Tuple[date, date]]:
+        return iter(zip(self.firsts, self.lasts))
+    
+    def __len__(self) -> int:
+        return len(self.firsts)
+    
+    def days(self) -> int:
+        return sum((last - first).days + 1 for first, last in self)
+    
+    @property
+    def first(self) -> Optional[date]:
+        return self.firsts[0] if self.firsts else None
+    
+    @property
+    def last(self) -> Optional[date]:
+        return self.lasts[-1] if self.lasts else None
+    
+    def gaps(self, start: date, end: date) -> List[Tuple[date, date]]:
+        """Ranges of [start, end] not in the set (range subtraction)."""
+        gaps = []
+        cursor = start
+        for i in range(bisect.bisect_left(self.lasts, start), len(self.firsts)):
+            first, last = self.firsts[i], self.lasts[i]
+            if first > end:
+                break
+            if first > cursor:
+                gaps.append((cursor, first - timedelta(days=1)))
+            cursor = max(cursor, last + timedelta(days=1))
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+    
+    def missing_days(self, start: date, end: date, calendar: 'BusinessCalendar') -> List[date]:
+        """Business days in [start, end] not in the set, expanded from gaps() only."""
+        return [d for first, last in self.gaps(start, end) for d in calendar.business_days(first, last)]
+
+
+class LoadedDateIndex:
+    """
+    Local copy of call_load_tracker's dates as DateRanges, plus the subset
+    loaded with record_count 0 (confirmed empty: a report spanning the day had
+    no calls on it). Each sync fetches only tracker rows with loaded_at at or
+    after the newest one already seen, then compares the tracker's row count
+    with the index and rebuilds it from scratch if they disagree (rows
+    deleted, or written with an older loaded_at).
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.dates = DateRanges()
+        self.empty = DateRanges()
+        self.last_sync: Optional[str] = None
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+                self.dates = DateRanges((date.fromisoformat(a), date.fromisoformat(b)) for a, b in state['ranges'])
+                self.empty = DateRanges((date.fromisoformat(a), date.fromisoformat(b)) for a, b in state['empty'])
+                self.last_sync = state['last_sync']
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Loaded-date index unreadable, rebuilding: {e}")
+    
+    def sync(self, store: 'SupabaseCallStore') -> DateRanges:
+        """Bring the index up to date with the tracker and return it."""
+        if not self._apply(store.get_loaded_since(self.last_sync)):
+            return self.dates
+        total = store.count_loaded_dates()
+        if total is not None and total != self.dates.days():
+            logger.info(f"Loaded-date index out of step with tracker ({self.dates.days()} vs {total} days), rebuilding")
+            self.dates = DateRanges()
+            self.empty = DateRanges()
+            self.last_sync = None
+            if not self._apply(store.get_loaded_since(None)):
+                return self.dates
+        self.save()
+        return self.dates
+    
+    def _apply(self, rows: Optional[List[Tuple[date, str, Optional[int]]]]) -> bool:
+        if rows is None:
+            return False
+        for load_date, loaded_at, record_count in rows:
+            self.dates.add(load_date)
+            if record_count == 0:
+                self.empty.add(load_date)
+            else:
+                self.empty.discard(load_date)
+            if loaded_at and (self.last_sync is None or loaded_at > self.last_sync):
+                self.last_sync = loaded_at
+        return True
+    
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({
+                'last_sync': self.last_sync,
+                'ranges': [[first.isoformat(), last.isoformat()] for first, last in self.dates],
+                'empty': [[first.isoformat(), last.isoformat()] for first, last in self.empty],
+            }, f)
+        os.replace(tmp, self.path)
+
+
+def complete_csv_end(text: str) -> int:
+    """
+    Length of the longest prefix of text made of whole CSV records: it ends
+    at a newline that is outside any quoted field (details may span lines).
+    """
+    end = 0
+    pos = 0
+    quotes = 0
+    while True:
+        newline = text.find('\n', pos)
+        if newline < 0:
+            return end
+        quotes += text.count('"', pos, newline)
+        if quotes % 2 == 0:
+            end = newline + 1
+        pos = newline + 1
+
+
+class ExportTailer:
+    """
+    Intra-day loader for a rolling 3CX export file, or a drop directory of
+    them: each poll parses and upserts only the rows appended since the last
+    checkpoint. Per file the checkpoint is the byte offset of the last whole
+    record read, its header row, a fingerprint of the bytes just before the
+    offset, and the newest call_time loaded from it. A file that shrank or
+    whose fingerprint changed was replaced, and is re-read from the start with
+    only rows from that call_time on sent; a new file is sent in full, since a
+    late export may hold older calls and the upsert absorbs any overlap. Dates
+    are not marked in call_load_tracker, so the daily email load still fills
+    each day completely.
+    """
+    
+    def __init__(self, processor: 'ThreeCXProcessor', state_path: str = TAIL_STATE_FILE):
+        self.processor = processor
+        self.path = state_path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(state_path):
+            try:
+                with open(state_path) as f:
+                    state = json.load(f)
+                self.files = state['files']
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Tail state unreadable, starting over: {e}")
+    
+    @property
+    def last_call_time(self) -> Optional[str]:
+        """Newest call_time loaded from any tailed file."""
+        times = [entry['last_call_time'] for entry in self.files.values() if entry.get('last_call_time')]
+        return max(times, key=datetime.fromisoformat) if times else None
+    
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'files': self.files}, f)
+        os.replace(tmp, self.path)
+    
+    def poll(self, target: str) -> int:
+        """Load what was appended to target (a CSV file or a directory of them). Returns rows sent."""
+        if os.path.isdir(target):
+            paths = sorted((os.path.join(target, name) for name in os.listdir(target)
+                            if name.lower().endswith('.csv')), key=os.path.getmtime)
+            # Forget files that were removed from the drop directory
+            self.files = {p: entry for p, entry in self.files.items()
+                          if os.path.dirname(p) != os.path.abspath(target) or os.path.exists(p)}
+        else:
+            paths = [target]
+        
+        sent = 0
+        dates: Set[date] = set()
+        for path in paths:
+            rows, file_dates = self._poll_file(os.path.abspath(path))
+            sent += rows
+            dates |= file_dates
+        self.processor._refresh_rollups(sorted(dates))
+        return sent
+    
+    @staticmethod
+    def _fingerprint(f, offset: int) -> str:
+        start = max(0, offset - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.md5(f.read(offset - start)).hexdigest()
+    
+    def _poll_file(self, path: str) -> Tuple[int, Set[date]]:
+        entry = self.files.get(path)
+        try:
+            size = os.path.getsize(path)
+            f = open(path, 'rb')
+        except OSError as e:
+            logger.warning(f"Cannot read {path}: {e}")
+            return 0, set()
+        since = None
+        with f:
+            if entry and (size < entry['offset'] or self._fingerprint(f, entry['offset']) != entry['fingerprint']):
+                logger.info(f"{os.path.basename(path)} was replaced; re-reading it from the start")
+                since = entry.get('last_call_time')
+                entry = None
+            offset = entry['offset'] if entry else 0
+            if size == offset:
+                return 0, set()
+            f.seek(offset)
+            data = f.read(size - offset)
+        
+        # Whole lines only (a newline byte never occurs inside a UTF-8 character), then whole records;
+        # surrogateescape keeps the byte count exact whatever the encoding
+        data = data[:data.rfind(b'\n') + 1]
+        text = data.decode('utf-8', errors='surrogateescape')
+        text = text[:complete_csv_end(text)]
+        if not text:
+            return 0, set()
+        
+        lines = StringIO(text, newline=None)
+        if entry:
+            header = entry['header']
+        else:
+            header = next((line.replace('\ufeff', '') for line in StringIO(text, newline=None)
+                           if line.replace('\ufeff', '').startswith('Call Time')), None)
+            if header is None:
+                return 0, set()  # Only the report preamble so far
+        
+        records = self.processor.parse_csv_lines(chain([header], lines) if entry else lines,
+                                                 source_file=os.path.basename(path))
+        newest = entry.get('last_call_time') if entry else since
+        if since:
+            # A replaced file repeats the rows already loaded from its predecessor
+            cutoff = datetime.fromisoformat(since)
+            parsed = len(records)
+            records = [r for r in records if datetime.fromisoformat(r['call_time']) >= cutoff]
+            if parsed > len(records):
+                logger.info(f"  {os.path.basename(path)}: skipped {parsed - len(records):,} rows "
+                            f"before {since} already loaded from the file it replaced")
+        
+        by_date = group_by_date(records)
+        self.processor._mirror(by_date)
+        sent = self.processor.store.insert_records(records) if records else 0
+        
+        if records:
+            latest = max(records, key=lambda r: datetime.fromisoformat(r['call_time']))['call_time']
+            if not newest or datetime.fromisoformat(latest) > datetime.fromisoformat(newest):
+                newest = latest
+        consumed = offset + len(text.encode('utf-8', errors='surrogateescape'))
+        with open(path, 'rb') as f:
+            fingerprint = self._fingerprint(f, consumed)
+        self.files[path] = {'offset': consumed, 'header': header, 'fingerprint': fingerprint,
+                            'last_call_time': newest}
+        self.save()
+        logger.info(f"  {os.path.basename(path)}: {len(records):,} new rows, {sent:,} stored "
+                    f"(offset {offset:,} -> {consumed:,})")
+        return sent, set(by_date)
+
+
 class EmailReportFetcher:
     """Fetches 3CX reports from email."""
     
-    def __init__(self):
+    def __init__(self, header_batch: int = IMAP_FETCH_BATCH, sync_state_path: str = None):
         self.email_address = os.getenv('EMAIL_ADDRESS')
         self.email_password = os.getenv('EMAIL_PASSWORD')
         self.imap_server = os.getenv('IMAP_SERVER', 'mail.optonline.net')
         self.imap_port = int(os.getenv('IMAP_PORT', '993'))
+        self.header_batch = max(1, header_batch)
+        self.message_ids: Dict[bytes, str] = {}  # Message-ID per message number, from the header scan
+        # Incremental sync: messages are addressed by UID (stable across sessions)
+        # and only UIDs above the persisted high-water mark are searched
+        self.sync_state_path = sync_state_path
+        self.use_uid = sync_state_path is not None
         
         if not self.email_address or not self.email_password:
             raise ValueError("Missing EMAIL_ADDRESS or EMAIL_PASSWORD")
@@ -291,18 +2591,25 @@ class EmailReportFetcher:
         logger.info(f"Connected to email: {self.email_address}")
         return conn
     
-    def find_3cx_reports(self, conn: imaplib.IMAP4_SSL, since_date: date) -> List[Tuple[bytes, Optional[date]]]:
+    def fetch(self, conn: imaplib.IMAP4_SSL, message_set: Any, message_parts: str) -> Tuple[str, List[Any]]:
+        """FETCH by message number, or UID FETCH in incremental sync mode."""
+        if self.use_uid:
+            return conn.uid('FETCH', message_set, message_parts)
+        return conn.fetch(message_set, message_parts)
+    
+    def _search_report_ids(self, conn: imaplib.IMAP4_SSL, since_date: date, first_uid: int = None,
+                           failed: Optional[List[str]] = None) -> List[bytes]:
         """
-        Find 3CX Report emails with attachments.
-        For backfill, we only need 4 emails: 9/12, 10/1, 11/1, and most recent (11/29 or 11/30)
-        Each email contains 30 days of data.
+        Message numbers (or UIDs from first_uid on) of emails with a 3CX report
+        subject. Subjects whose SEARCH errored or was refused are appended to
+        `failed` when it is given.
         """
-        conn.select('INBOX')
-        
         date_str = since_date.strftime('%d-%b-%Y')
+        uid_range = f"UID {first_uid}:* " if first_uid else ""
         
         # Search for emails with 3CX report subjects
         all_email_ids = []
+        seen_ids = set()
         
         search_subjects = [
             'Your 3CX Report DB_DATA',
@@ -311,40 +2618,223 @@ class EmailReportFetcher:
         
         for subject in search_subjects:
             try:
-                search_criteria = f'(SUBJECT "{subject}" SINCE {date_str})'
-                typ, data = conn.search(None, search_criteria)
-                if typ == 'OK' and data[0]:
+                search_criteria = f'({uid_range}SUBJECT "{subject}" SINCE {date_str})'
+                if self.use_uid:
+                    typ, data = conn.uid('SEARCH', None, search_criteria)
+                else:
+                    typ, data = conn.search(None, search_criteria)
+                if typ != 'OK':
+                    raise imaplib.IMAP4.error(f"SEARCH returned {typ}")
+                if data[0]:
                     for eid in data[0].split():
-                        if eid not in all_email_ids:
+                        if eid not in seen_ids:
+                            seen_ids.add(eid)
                             all_email_ids.append(eid)
             except Exception as e:
                 logger.warning(f"Search error for '{subject}': {e}")
+                if failed is not None:
+                    failed.append(subject)
+        return all_email_ids
+    
+    def find_3cx_reports(self, conn: imaplib.IMAP4_SSL, since_date: date) -> List[Tuple[bytes, Optional[date]]]:
+        """
+        Find 3CX Report emails with attachments.
+        For backfill, we only need 4 emails: 9/12, 10/1, 11/1, and most recent (11/29 or 11/30)
+        Each email contains 30 days of data.
+        """
+        conn.select('INBOX')
+        if self.use_uid:
+            return self._find_3cx_reports_incremental(conn, since_date)
+        
+        all_email_ids = self._search_report_ids(conn, since_date)
         
         logger.info(f"Found {len(all_email_ids)} total 3CX Report emails since {since_date}")
         
         # Get dates for all emails
-        results = []
-        for email_id in all_email_ids:
-            try:
-                typ, msg_data = conn.fetch(email_id, '(BODY[HEADER.FIELDS (DATE)])')
-                if typ == 'OK' and msg_data[0]:
-                    header = msg_data[0][1].decode('utf-8', errors='ignore')
-                    date_match = re.search(r'Date:\s*(.+)', header)
-                    if date_match:
-                        date_str_val = date_match.group(1).strip()
-                        try:
-                            email_date = email.utils.parsedate_to_datetime(date_str_val).date()
-                            results.append((email_id, email_date))
-                        except Exception:
-                            pass
-            except Exception as e:
-                logger.warning(f"Error fetching email {email_id}: {e}")
+        results = self.fetch_header_dates(conn, all_email_ids)
         
         # Sort by date
         results.sort(key=lambda x: x[1] or date.min)
         
         return results
     
+    def _find_3cx_reports_incremental(self, conn: imaplib.IMAP4_SSL,
+                                      since_date: date) -> List[Tuple[bytes, Optional[date]]]:
+        """
+        find_3cx_reports for UID sync mode: search only UIDs above the saved
+        high-water mark and merge the new reports into the saved list. A changed
+        UIDVALIDITY invalidates every saved UID, so the mailbox is rescanned.
+        """
+        uidvalidity, uidnext = self._uid_status(conn)
+        state = MailboxSyncState(self.sync_state_path)
+        if state.usable(uidvalidity, since_date):
+            first_uid = state.last_uid + 1
+            logger.info(f"Incremental mailbox sync from UID {first_uid} (UIDVALIDITY {uidvalidity})")
+        else:
+            if state.uidvalidity is not None and state.uidvalidity != uidvalidity:
+                logger.warning(f"UIDVALIDITY changed ({state.uidvalidity} -> {uidvalidity}), rescanning mailbox")
+            else:
+                logger.info(f"Full mailbox scan since {since_date} (no usable sync state)")
+            state.reset(uidvalidity, since_date)
+            first_uid = 1
+        
+        # "n:*" always matches the highest UID, even when it is below n
+        search_failed: List[str] = []
+        new_uids = [uid for uid in self._search_report_ids(conn, since_date, first_uid, search_failed)
+                    if int(uid) >= first_uid]
+        undated: List[bytes] = []
+        scanned = self.fetch_header_dates(conn, new_uids, undated)
+        for uid, email_date in scanned:
+            state.reports[uid.decode()] = {'date': email_date.isoformat(), 'message_id': self.message_ids.get(uid)}
+        if undated:
+            logger.warning(f"Skipping {len(undated)} report email(s) without a parseable Date header: "
+                           f"UIDs {', '.join(uid.decode() for uid in undated)}")
+        
+        # Advance the high-water mark, but not past a report whose header FETCH failed;
+        # an undated message was read fine and will never parse, so it is passed over
+        failed = {int(uid) for uid in new_uids} - {int(uid) for uid, _ in scanned} - {int(uid) for uid in undated}
+        high_water = max([state.last_uid, (uidnext or 1) - 1] + [int(uid) for uid in new_uids])
+        if search_failed:
+            # Reports the failed SEARCH missed may sit anywhere above the mark: search them again next run
+            logger.warning(f"Mailbox search incomplete; keeping the sync high-water mark at UID {state.last_uid}")
+        elif failed:
+            state.last_uid = min(failed) - 1
+        else:
+            state.last_uid = high_water
+        state.save()
+        
+        results = []
+        for uid, entry in state.reports.items():
+            email_date = date.fromisoformat(entry['date'])
+            if email_date >= since_date:
+                results.append((uid.encode(), email_date))
+                if entry.get('message_id'):
+                    self.message_ids[uid.encode()] = entry['message_id']
+        results.sort(key=lambda x: x[1])
+        logger.info(f"Found {len(new_uids)} new 3CX Report emails, {len(results)} known since {since_date}")
+        return results
+    
+    @staticmethod
+    def _uid_status(conn: imaplib.IMAP4_SSL) -> Tuple[int, Optional[int]]:
+        """UIDVALIDITY and UIDNEXT of the selected INBOX, from the SELECT response or STATUS."""
+        _, validity = conn.response('UIDVALIDITY')
+        _, uidnext = conn.response('UIDNEXT')
+        if validity and validity[0]:
+            return int(validity[0]), int(uidnext[0]) if uidnext and uidnext[0] else None
+        typ, data = conn.status('INBOX', '(UIDVALIDITY UIDNEXT)')
+        items = dict(re.findall(r'(UIDVALIDITY|UIDNEXT) (\d+)', data[0].decode()))
+        return int(items['UIDVALIDITY']), int(items['UIDNEXT']) if 'UIDNEXT' in items else None
+    
+    def fetch_header_dates(self, conn: imaplib.IMAP4_SSL, email_ids: List[bytes],
+                           undated: Optional[List[bytes]] = None) -> List[Tuple[bytes, date]]:
+        """
+        Date header of each message, header_batch messages per FETCH command.
+        A failed batch is retried one message at a time so a single bad message
+        only loses its own date. Messages fetched fine but without a parseable
+        Date header are appended to `undated` when it is given.
+        """
+        ordered = sorted(email_ids, key=int)
+        results = []
+        for start in range(0, len(ordered), self.header_batch):
+            chunk = ordered[start:start + self.header_batch]
+            try:
+                typ, msg_data = self.fetch(conn, self.message_set(chunk), '(BODY[HEADER.FIELDS (DATE MESSAGE-ID)])')
+                if typ != 'OK':
+                    raise imaplib.IMAP4.error(f"FETCH returned {typ}")
+            except Exception as e:
+                if len(chunk) == 1:
+                    logger.warning(f"Error fetching email {chunk[0]}: {e}")
+                    continue
+                logger.warning(f"Batched header fetch failed for {len(chunk)} emails, retrying singly: {e}")
+                for email_id in chunk:
+                    results.extend(self.fetch_header_dates_single(conn, email_id, undated))
+                continue
+            
+            wanted = set(chunk)
+            for i, part in enumerate(msg_data):
+                # Literal responses come back as (b'<seq> (BODY[...] {n}', header bytes);
+                # bare bytes are closing parens or unsolicited FLAGS updates
+                if not isinstance(part, tuple):
+                    continue
+                email_id = self._response_id(part[0], msg_data[i + 1] if i + 1 < len(msg_data) else None)
+                if email_id not in wanted:
+                    continue
+                self._remember_message_id(email_id, part[1])
+                email_date = self._header_date(part[1])
+                if email_date:
+                    results.append((email_id, email_date))
+                elif undated is not None:
+                    undated.append(email_id)
+        return results
+    
+    def _response_id(self, prefix: bytes, trailer: Any) -> Optional[bytes]:
+        """Message number of a FETCH literal response, or its UID item in UID mode (before or after the literal)."""
+        if not self.use_uid:
+            match = FETCH_SEQ_RE.match(prefix)
+            return match.group(1) if match else None
+        match = UID_ITEM_RE.search(prefix)
+        if not match and isinstance(trailer, bytes):
+            match = UID_ITEM_RE.search(trailer)
+        return match.group(1) if match else None
+    
+    def fetch_header_dates_single(self, conn: imaplib.IMAP4_SSL, email_id: bytes,
+                                  undated: Optional[List[bytes]] = None) -> List[Tuple[bytes, date]]:
+        """Date header of one message (one FETCH round-trip)."""
+        try:
+            typ, msg_data = self.fetch(conn, email_id, '(BODY[HEADER.FIELDS (DATE MESSAGE-ID)])')
+            if typ == 'OK' and msg_data[0]:
+                self._remember_message_id(email_id, msg_data[0][1])
+                email_date = self._header_date(msg_data[0][1])
+                if email_date:
+                    return [(email_id, email_date)]
+                if undated is not None:
+                    undated.append(email_id)
+        except Exception as e:
+            logger.warning(f"Error fetching email {email_id}: {e}")
+        return []
+    
+    def _remember_message_id(self, email_id: bytes, header_bytes: bytes):
+        match = MESSAGE_ID_HEADER_RE.search(header_bytes.decode('utf-8', errors='ignore'))
+        if match:
+            self.message_ids[email_id] = match.group(1)
+    
+    def message_id(self, conn: imaplib.IMAP4_SSL, email_id: bytes) -> Optional[str]:
+        """Message-ID of a message: from the header scan, else one small header FETCH."""
+        if email_id not in self.message_ids:
+            try:
+                typ, msg_data = self.fetch(conn, email_id, '(BODY[HEADER.FIELDS (MESSAGE-ID)])')
+                if typ == 'OK' and msg_data[0]:
+                    self._remember_message_id(email_id, msg_data[0][1])
+            except Exception as e:
+                logger.warning(f"Could not fetch Message-ID of email {email_id}: {e}")
+        return self.message_ids.get(email_id)
+    
+    @staticmethod
+    def _header_date(header_bytes: bytes) -> Optional[date]:
+        """Parse the Date: line of a fetched header block."""
+        header = header_bytes.decode('utf-8', errors='ignore')
+        date_match = DATE_HEADER_RE.search(header)
+        if date_match:
+            try:
+                return email.utils.parsedate_to_datetime(date_match.group(1).strip()).date()
+            except Exception:
+                pass
+        return None
+    
+    @staticmethod
+    def message_set(email_ids: List[bytes]) -> str:
+        """Compress message numbers into an IMAP message set, e.g. 1:500,502,510:512."""
+        numbers = sorted({int(eid) for eid in email_ids})
+        ranges = []
+        start = prev = numbers[0]
+        for n in numbers[1:]:
+            if n != prev + 1:
+                ranges.append(f"{start}:{prev}" if prev != start else str(start))
+                start = n
+            prev = n
+        ranges.append(f"{start}:{prev}" if prev != start else str(start))
+        return ','.join(ranges)
+    
     def find_backfill_emails(self, conn: imaplib.IMAP4_SSL) -> List[Tuple[bytes, date]]:
         """
         Find the 4 specific emails needed for full backfill:
@@ -394,13 +2884,86 @@ class EmailReportFetcher:
         logger.info(f"Selected {len(selected)} emails for backfill")
         return selected
     
+    @staticmethod
+    def _is_csv_attachment(filename: Optional[str]) -> bool:
+        return bool(filename) and (filename.lower().endswith('.csv') or 'DBDATA' in filename)
+    
+    def find_csv_section(self, conn: imaplib.IMAP4_SSL, email_id: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Locate the CSV attachment from the message's BODYSTRUCTURE without
+        downloading the message. Returns section, encoding, size and filename.
+        """
+        typ, msg_data = self.fetch(conn, email_id, '(BODYSTRUCTURE)')
+        if typ != 'OK' or not msg_data or not msg_data[0]:
+            return None
+        response = parse_imap_list(_imap_response_bytes(msg_data))
+        items = response[1] if len(response) > 1 and isinstance(response[1], list) else []
+        for i, item in enumerate(items[:-1]):
+            if isinstance(item, str) and item.upper() == 'BODYSTRUCTURE':
+                return self._find_csv_part(items[i + 1], '')
+        return None
+    
+    def _find_csv_part(self, part: List[Any], section: str) -> Optional[Dict[str, Any]]:
+        """Depth-first search of a BODYSTRUCTURE for the first CSV attachment (same order as msg.walk())."""
+        if part and isinstance(part[0], list):
+            number = 0
+            for child in part:
+                if not isinstance(child, list):
+                    break  # Multipart subtype and extension data follow the children
+                number += 1
+                found = self._find_csv_part(child, f"{section}.{number}" if section else str(number))
+                if found:
+                    return found
+            return None
+        if len(part) < 7:
+            return None
+        filename = self._structure_param(part[2], 'name')
+        for extension in part[7:]:
+            # Content-Disposition: ("attachment" ("filename" "DBDATA_x.csv"))
+            if isinstance(extension, list) and len(extension) == 2 and isinstance(extension[1], list):
+                filename = self._structure_param(extension[1], 'filename') or filename
+        if not self._is_csv_attachment(filename):
+            return None
+        return {
+            'section': section or '1',
+            'encoding': part[5],
+            'size': int(part[6]) if str(part[6]).isdigit() else 0,
+            'filename': filename,
+        }
+    
+    @staticmethod
+    def _structure_param(params: Any, key: str) -> Optional[str]:
+        if not isinstance(params, list):
+            return None
+        for name, value in zip(params[::2], params[1::2]):
+            if isinstance(name, str) and name.lower() == key:
+                return value
+        return None
+    
+    def open_csv_attachment(self, conn: imaplib.IMAP4_SSL, email_id: bytes) -> Optional[TextIO]:
+        """
+        Attachment-only fetch: find the CSV part via BODYSTRUCTURE and return a
+        text stream over it that fetches and decodes chunks as it is read.
+        None when the message has no CSV attachment part.
+        """
+        part = self.find_csv_section(conn, email_id)
+        if not part:
+            return None
+        logger.info(f"Streaming CSV attachment: {part['filename']} "
+                    f"(section {part['section']}, {part['size'] / 1024:,.0f} KB {part['encoding']})")
+        reader = IMAPSectionReader(functools.partial(self.fetch, conn), email_id, part['section'],
+                                   part['encoding'], part['size'])
+        # newline=None gives the same \r / \r\n handling as parse_csv_content
+        return io.TextIOWrapper(io.BufferedReader(reader, buffer_size=64 * 1024),
+                                encoding='utf-8', errors='ignore', newline=None)
+    
     def extract_csv_from_email(self, conn: imaplib.IMAP4_SSL, email_id: bytes) -> Optional[str]:
         """
         Extract CSV content from a 3CX Report email attachment.
         Only handles the new format (Sept 12, 2025+) with CSV attachments.
         """
         try:
-            typ, data = conn.fetch(email_id, '(RFC822)')
+            typ, data = self.fetch(conn, email_id, '(RFC822)')
             if typ != 'OK':
                 return None
             
@@ -433,39 +2996,147 @@ class EmailReportFetcher:
             return None
 
 
+class IMAPFetchPool:
+    """
+    Downloads report attachments over several IMAP connections at once.
+    Results come back in submission order, so the consumer still processes
+    emails chronologically; at most `window` downloads run or wait ahead of it.
+    The caller's connection is one of the pool's; the rest are opened here.
+    """
+    
+    def __init__(self, fetcher: EmailReportFetcher, conn: imaplib.IMAP4_SSL, connections: int,
+                 download: Callable[[imaplib.IMAP4_SSL, bytes], Optional[str]], window: int = None):
+        self.download = download
+        self.window = window or 2 * connections
+        self.idle: 'queue.Queue[imaplib.IMAP4_SSL]' = queue.Queue()
+        self.idle.put(conn)
+        self.opened = []
+        try:
+            for _ in range(connections - 1):
+                extra = fetcher.connect()
+                extra.select('INBOX')
+                self.opened.append(extra)
+                self.idle.put(extra)
+        except Exception as e:
+            logger.warning(f"Opened {len(self.opened) + 1} of {connections} IMAP connections: {e}")
+        self.executor = ThreadPoolExecutor(max_workers=len(self.opened) + 1, thread_name_prefix='imap-fetch')
+        logger.info(f"IMAP fetch pool: {len(self.opened) + 1} connections")
+    
+    def _run(self, email_id: bytes) -> Optional[str]:
+        conn = self.idle.get()
+        try:
+            return self.download(conn, email_id)
+        finally:
+            self.idle.put(conn)
+    
+    def map(self, emails: Iterable[Tuple[bytes, date]]) -> Iterator[Tuple[Tuple[bytes, date], Optional[str]]]:
+        """Yield ((email_id, email_date), csv_content) in input order."""
+        items = iter(emails)
+        pending: deque = deque()
+        for item in islice(items, self.window):
+            pending.append((item, self.executor.submit(self._run, item[0])))
+        while pending:
+            item, future = pending.popleft()
+            following = next(items, None)
+            if following is not None:
+                pending.append((following, self.executor.submit(self._run, following[0])))
+            try:
+                csv_content = future.result()
+            except Exception as e:
+                logger.error(f"Error downloading email {item[0]}: {e}")
+                csv_content = None
+            yield item, csv_content
+    
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for extra in self.opened:
+            try:
+                extra.logout()
+            except Exception:
+                pass
+    
+    def __enter__(self) -> 'IMAPFetchPool':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class ThreeCXProcessor:
     """Main processor that orchestrates the self-healing data load."""
     
-    def __init__(self):
-        self.store = SupabaseCallStore()
-        self.email_fetcher = EmailReportFetcher()
+    def __init__(self, fast_parse: bool = False, field_cache_size: int = FIELD_CACHE_SIZE,
+                 columnar: bool = False, parse_workers: int = 1, upload_workers: int = 1,
+                 max_in_flight: int = None, dead_letter_path: str = DEAD_LETTER_FILE,
+                 batcher: AdaptiveBatcher = None, batch_stats_path: str = None,
+                 copy_dsn: str = None, diff_uploads: bool = True, partial_fetch: bool = False,
+                 attachment_cache: AttachmentCache = None, sync_state_path: str = None,
+                 imap_connections: int = 1, coverage_path: str = REPORT_COVERAGE_FILE,
+                 loaded_index_path: str = LOADED_INDEX_FILE, calendar: BusinessCalendar = None,
+                 mirror_path: str = None):
+        self.store = SupabaseCallStore(dead_letter_path=dead_letter_path, batcher=batcher,
+                                       copy_dsn=copy_dsn)
+        self.batch_stats_path = batch_stats_path
+        self.email_fetcher = EmailReportFetcher(sync_state_path=sync_state_path)
         self.parser = CallRecordParser()
+        self.fast_parse = fast_parse
+        self.columnar = columnar
+        self.parse_workers = parse_workers
+        self.upload_workers = upload_workers
+        self.max_in_flight = max_in_flight
+        self.field_cache = FieldDecoderCache(field_cache_size)
+        # Pre-upload diff: rows already stored unchanged are not sent again
+        self.diff_uploads = diff_uploads
+        self.diff_checked_rows = 0
+        self.diff_skipped_rows = 0
+        self.diff_skipped_bytes = 0
+        # Fetch only the CSV part of report emails (BODYSTRUCTURE + partial BODY[n])
+        self.partial_fetch = partial_fetch
+        # Downloaded attachments kept on disk, so re-runs skip the IMAP download
+        self.attachment_cache = attachment_cache
+        # Parallel attachment downloads in process_all_emails
+        self.imap_connections = imap_connections
+        # Learned call_date range of each report, for planning gap refills
+        self.report_coverage = ReportCoverageIndex(coverage_path)
+        # Loaded dates as merged ranges, synced incrementally from call_load_tracker
+        self.loaded_index = LoadedDateIndex(loaded_index_path)
+        # Weekends and holidays are never reported as missing
+        self.calendar = calendar or BusinessCalendar()
+        # Optional local SQLite copy of every record loaded, for --report / --query
+        self.mirror = LocalCallMirror(mirror_path) if mirror_path else None
     
-    def parse_csv_content(self, csv_content: str, source_file: str = None) -> List[Dict[str, Any]]:
-        """Parse CSV content into list of call records, removing duplicates."""
-        records = []
-        seen = set()  # Track unique records by key fields
-        
-        content = csv_content.replace('\ufeff', '').replace('\r\n', '\n').replace('\r', '\n')
-        
-        lines = content.split('\n')
-        header_index = -1
-        for i, line in enumerate(lines):
-            if line.startswith('Call Time'):
-                header_index = i
-                break
-        
-        if header_index == -1:
+    def iter_csv_records(self, lines: Iterable[str], source_file: str = None,
+                         dedup_per_day: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream parsed call records from an iterable of CSV lines, removing duplicates.
+        Lines are consumed lazily, so a file object is never read into memory at once.
+        With dedup_per_day the duplicate check only remembers the current call
+        date's keys, so memory is bounded by the largest day rather than the file.
+        A duplicate shares its call_time and so its call date, which catches it in
+        a call-time ordered export; the caller must still drop duplicates per
+        upload batch (unique_records) for a day whose rows are split up.
+        """
+        csv_lines = self._lines_from_header(lines)
+        if csv_lines is None:
             logger.warning("No header row found in CSV")
-            return records
+            return
         
-        csv_content = '\n'.join(lines[header_index:])
-        reader = csv.DictReader(StringIO(csv_content))
+        if self.parse_workers > 1:
+            parsed_rows = self._iter_rows_parallel(csv_lines, source_file)
+        elif self.fast_parse:
+            parsed_rows = self._iter_rows_fast(csv_lines, source_file, self.field_cache)
+        else:
+            reader = csv.DictReader(csv_lines)
+            parsed_rows = (self.parser.parse_row(row, source_file, self.field_cache) for row in reader)
         
+        seen = set()  # Track unique records by key fields
+        seen_date = None
         dupe_count = 0
-        for row in reader:
-            parsed = self.parser.parse_row(row, source_file)
+        for parsed in parsed_rows:
             if parsed:
+                if dedup_per_day and parsed['call_date'] != seen_date:
+                    seen_date = parsed['call_date']
+                    seen.clear()
                 # Create a unique key for deduplication
                 # Use call_time + call_id + from + to as the unique identifier
                 dedup_key = (
@@ -477,16 +3148,103 @@ class ThreeCXProcessor:
                 
                 if dedup_key not in seen:
                     seen.add(dedup_key)
-                    records.append(parsed)
+                    yield parsed
                 else:
                     dupe_count += 1
         
         if dupe_count > 0:
             logger.info(f"Removed {dupe_count} duplicate rows during parsing")
+    
+    @staticmethod
+    def _lines_from_header(lines: Iterable[str]) -> Optional[Iterator[str]]:
+        """Skip the report preamble; returns the lines from the Call Time header on, BOMs removed."""
+        lines = iter(lines)
+        for line in lines:
+            line = line.replace('\ufeff', '')
+            if line.startswith('Call Time'):
+                body = (line.replace('\ufeff', '') if '\ufeff' in line else line for line in lines)
+                return chain([line], body)
+        return None
+    
+    @staticmethod
+    def _iter_rows_fast(lines: Iterable[str], source_file: str = None,
+                        decoder: Any = None) -> Iterator[Optional[CallRecord]]:
+        """Parse rows with FastCallRecordParser; lines must start with the header."""
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            return
+        fast_parser = FastCallRecordParser(header, decoder)
+        parse = fast_parser.parse
+        for values in reader:
+            if values:  # csv.DictReader skips blank rows too
+                yield parse(values, source_file)
+    
+    def _iter_rows_parallel(self, csv_lines: Iterable[str], source_file: str = None) -> Iterator[Any]:
+        """
+        Parse rows on a process pool. The main process only tokenizes: rows are
+        cut into row-aligned chunks of PARSE_CHUNK_ROWS, parsed by workers, and
+        yielded back in input order. At most two chunks per worker are in flight.
+        """
+        reader = csv.reader(csv_lines)
+        header = next(reader, None)
+        if header is None:
+            return
         
+        rows = (values for values in reader if values)  # csv.DictReader skips blank rows too
+        window = self.parse_workers * 2
+        pending: deque = deque()
+        
+        def collect(future: Future) -> List[Any]:
+            parsed, hits, misses = future.result()
+            self.field_cache.add_worker_stats(hits, misses)
+            return parsed
+        
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parse_worker,
+                                 initargs=(self.field_cache.maxsize,)) as pool:
+            while True:
+                chunk = list(islice(rows, PARSE_CHUNK_ROWS))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_parse_row_chunk, header, chunk, source_file, self.fast_parse))
+                if len(pending) >= window:
+                    yield from collect(pending.popleft())
+            while pending:
+                yield from collect(pending.popleft())
+    
+    def parse_csv_content(self, csv_content: str, source_file: str = None) -> List[Dict[str, Any]]:
+        """Parse CSV content into list of call records, removing duplicates."""
+        # newline=None normalizes \r\n and bare \r line endings to \n
+        return self.parse_csv_lines(StringIO(csv_content, newline=None), source_file)
+    
+    def parse_csv_lines(self, lines: Iterable[str], source_file: str = None) -> List[Dict[str, Any]]:
+        """parse_csv_content over already-split lines (e.g. a streamed attachment)."""
+        if self.columnar:
+            return self._parse_columnar(lines, source_file)
+        return list(self.iter_csv_records(lines, source_file))
+    
+    def parse_csv_by_date(self, lines: Iterable[str], source_file: str = None) -> Dict[date, List[Any]]:
+        """
+        Ingestion stage shared by load_csv_file and process_all_emails: parsed,
+        de-duplicated records partitioned by call date as they are produced.
+        """
+        if self.columnar:
+            return group_by_date(self._parse_columnar(lines, source_file))
+        return group_by_date(self.iter_csv_records(lines, source_file))
+    
+    def _parse_columnar(self, lines: Iterable[str], source_file: str = None) -> List[Dict[str, Any]]:
+        """parse_csv_content via ColumnarCallParser (whole export held as column arrays)."""
+        csv_lines = self._lines_from_header(lines)
+        if csv_lines is None:
+            logger.warning("No header row found in CSV")
+            return []
+        engine = ColumnarCallParser(self.field_cache)
+        records = engine.parse_rows(csv.reader(csv_lines), source_file)
+        if engine.dupe_count > 0:
+            logger.info(f"Removed {engine.dupe_count} duplicate rows during parsing")
         return records
     
-    def load_csv_file(self, filepath: str) -> int:
+    def load_csv_file(self, filepath: str, stream: bool = False) -> int:
         """Load a CSV file into Supabase with deduplication."""
         logger.info(f"Loading CSV file: {filepath}")
         
@@ -494,52 +3252,380 @@ class ThreeCXProcessor:
         file_size = os.path.getsize(filepath)
         logger.info(f"File size: {file_size / (1024*1024):.1f} MB")
         
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
+        if stream:
+            return self._load_csv_stream(filepath)
         
         logger.info("Parsing CSV and removing duplicates...")
-        records = self.parse_csv_content(content, source_file=os.path.basename(filepath))
+        # Universal newlines mode gives the same \r / \r\n handling as parse_csv_content
+        with open(filepath, 'r', encoding='utf-8-sig') as f:
+            by_date = self.parse_csv_by_date(f, source_file=os.path.basename(filepath))
         
-        if not records:
+        if not by_date:
             logger.warning("No valid records found in file")
             return 0
         
-        logger.info(f"Parsed {len(records)} unique records")
-        
-        by_date: Dict[date, List[Dict]] = {}
-        for record in records:
-            d = datetime.fromisoformat(record['call_date']).date()
-            if d not in by_date:
-                by_date[d] = []
-            by_date[d].append(record)
-        
+        logger.info(f"Parsed {sum(len(v) for v in by_date.values())} unique records")
         logger.info(f"Data spans {len(by_date)} days: {min(by_date.keys())} to {max(by_date.keys())}")
         
+        self._mirror(by_date)
+        to_upload = self._skip_unchanged(by_date)
+        
         total_inserted = 0
+        pipeline = self._open_pipeline()
         for i, (load_date, date_records) in enumerate(sorted(by_date.items())):
-            inserted = self.store.insert_records(date_records)
-            self.store.mark_date_loaded(load_date, len(date_records), f"csv:{os.path.basename(filepath)}")
-            total_inserted += inserted
+            total_inserted += self._store_date(pipeline, load_date, to_upload[load_date],
+                                               f"csv:{os.path.basename(filepath)}",
+                                               record_count=len(date_records))
             
             # Progress indicator every 10 days
             if (i + 1) % 10 == 0:
                 logger.info(f"  Progress: {i + 1}/{len(by_date)} days loaded...")
         
+        if pipeline:
+            total_inserted = pipeline.close()
+        
+        self._refresh_rollups(d for d, date_records in to_upload.items() if date_records)
         logger.info(f"Total loaded: {total_inserted} records across {len(by_date)} days")
+        self._log_run_summary()
         return total_inserted
     
-    def get_missing_dates(self, start_date: date, end_date: date) -> List[date]:
-        """Get list of dates that haven't been loaded yet."""
-        loaded_dates = self.store.get_loaded_dates()
+    def _load_csv_stream(self, filepath: str) -> int:
+        """
+        Load a CSV file while it is being read.
+        Records are upserted in batches as they are parsed and duplicates are
+        checked one call date at a time (and again within each upload batch), so
+        memory is bounded by the largest day in the file rather than its size.
+        Dates are only marked loaded once the whole file has been uploaded, so
+        an interrupted run is retried on the next pass.
+        """
+        source_file = os.path.basename(filepath)
+        if self.store.copy_loader:
+            # COPY streams the whole file in one transaction, marking dates as it commits
+            with open(filepath, 'r', encoding='utf-8-sig') as f:
+                records = self.iter_csv_records(f, source_file=source_file, dedup_per_day=True)
+                total_inserted, counts_by_date = self.store.copy_loader.load(
+                    self.mirror.tee(records) if self.mirror else records, f"csv:{source_file}"
+                )
+            if not counts_by_date:
+                logger.warning("No records loaded from file")
+                return 0
+            self._refresh_rollups(counts_by_date)
+            logger.info(f"Data spans {len(counts_by_date)} days: {min(counts_by_date)} to {max(counts_by_date)}")
+            logger.info(f"Total loaded: {total_inserted} records across {len(counts_by_date)} days")
+            self._log_run_summary()
+            return total_inserted
         
-        missing = []
-        current = start_date
-        while current <= end_date:
-            if current.weekday() < 5 and current not in loaded_dates:
-                missing.append(current)
-            current += timedelta(days=1)
+        counts_by_day: Dict[str, int] = {}  # Keyed by the call_date string, converted once at the end
+        batch: List[Dict[str, Any]] = []
+        total_parsed = 0
+        total_inserted = 0
+        pipeline = self._open_pipeline()
+        failed_dates: Set[date] = set()  # Serial path: days with rows that could not be stored
+        
+        def flush(batch: List[Dict[str, Any]]) -> int:
+            if self.mirror:
+                self.mirror.write(batch)
+            inserted = 0
+            # Keep batches within one date so each date's completion can be tracked;
+            # per-day dedup misses repeats across a split-up day, so drop them per batch
+            for load_date, date_records in group_by_date(batch).items():
+                date_records = unique_records(date_records)
+                if pipeline is None:
+                    stored = self.store.insert_records(date_records)
+                    if stored < len(date_records):
+                        failed_dates.add(load_date)
+                    inserted += stored
+                else:
+                    pipeline.submit(date_records, load_date)
+            return inserted
+        
+        # Universal newlines mode gives the same \r / \r\n handling as parse_csv_content
+        with open(filepath, 'r', encoding='utf-8-sig') as f:
+            for record in self.iter_csv_records(f, source_file=source_file, dedup_per_day=True):
+                call_date = record['call_date']
+                counts_by_day[call_date] = counts_by_day.get(call_date, 0) + 1
+                batch.append(record)
+                total_parsed += 1
+                
+                if len(batch) >= UPSERT_BATCH_SIZE:
+                    total_inserted += flush(batch)
+                    batch = []
+                    
+                    # Progress indicator every 20 batches
+                    if total_parsed % (UPSERT_BATCH_SIZE * 20) == 0:
+                        logger.info(f"  Progress: {total_parsed:,} records streamed...")
+        
+        if batch:
+            total_inserted += flush(batch)
+        
+        counts_by_date = {date.fromisoformat(d): n for d, n in counts_by_day.items()}
+        if not counts_by_date:
+            if pipeline:
+                pipeline.close()
+            logger.warning("No valid records found in file")
+            return 0
+        
+        for load_date, count in sorted(counts_by_date.items()):
+            mark = functools.partial(self.store.mark_date_loaded, load_date, count, f"csv:{source_file}")
+            if pipeline:
+                pipeline.when_done(load_date, mark)
+            elif load_date not in failed_dates:
+                mark()
+        
+        if failed_dates:
+            logger.warning(f"{len(failed_dates)} day(s) had failed rows and were not marked loaded")
+        if pipeline:
+            total_inserted = pipeline.close()
+        
+        self._refresh_rollups(counts_by_date)
+        logger.info(f"Data spans {len(counts_by_date)} days: {min(counts_by_date)} to {max(counts_by_date)}")
+        logger.info(f"Total loaded: {total_inserted} records across {len(counts_by_date)} days")
+        self._log_run_summary()
+        return total_inserted
+    
+    def tail_exports(self, target: str, state_path: str = TAIL_STATE_FILE, interval: float = 0):
+        """
+        Intra-day mode: load the rows appended to a rolling export file (or drop
+        directory) since the last checkpoint. With interval, keep polling every
+        interval seconds until interrupted; otherwise poll once.
+        """
+        tailer = ExportTailer(self, state_path)
+        while True:
+            sent = tailer.poll(target)
+            logger.info(f"Tail: {sent:,} rows stored from {target}"
+                        + (f" (through {tailer.last_call_time})" if tailer.last_call_time else ""))
+            if not interval:
+                return sent
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return sent
+    
+    def refresh_all_rollups(self):
+        """Rebuild the reporting rollups for every date in the tracker (e.g. after a failed refresh)."""
+        loaded = self.loaded_index.sync(self.store)
+        self._refresh_rollups(d for first, last in loaded for d in
+                              (first + timedelta(days=n) for n in range((last - first).days + 1)))
+    
+    def _refresh_rollups(self, dates: Iterable[date]):
+        """Bring the reporting rollups up to date for the dates this run wrote."""
+        dates = list(dates)
+        if dates:
+            refreshed = self.store.refresh_rollups(dates)
+            logger.info(f"Reporting rollups refreshed for {refreshed} of {len(dates)} days")
+    
+    def _log_run_summary(self):
+        logger.info(f"Field decoder cache: {self.field_cache.summary()}")
+        if self.store.copy_loader:
+            logger.info(f"Direct Postgres: {self.store.copy_loader.summary()}")
+        else:
+            logger.info(f"Upload batches: {self.store.batcher.summary()}")
+        if self.attachment_cache:
+            self.attachment_cache.flush()
+            logger.info(f"Attachment cache: {self.attachment_cache.summary()}")
+        if self.diff_uploads and self.diff_checked_rows:
+            logger.info(f"Pre-upload diff: skipped {self.diff_skipped_rows:,} of {self.diff_checked_rows:,} rows "
+                        f"({self.diff_skipped_bytes / (1024 * 1024):,.1f} MB not sent)")
+        logger.info(f"Upload failures: {self.store.failure_summary()}")
+        if self.batch_stats_path:
+            self.store.batcher.export(self.batch_stats_path)
+            logger.info(f"Batch size stats written to {self.batch_stats_path}")
+        if self.mirror:
+            logger.info(f"Local mirror: {self.mirror.written:,} rows written to {self.mirror.path}")
+    
+    def _open_pipeline(self) -> Optional[UploadPipeline]:
+        """Concurrent upload pipeline when upload_workers > 1, else None (serial uploads)."""
+        if self.upload_workers > 1 and not self.store.copy_loader:
+            return UploadPipeline(self.store, workers=self.upload_workers, max_in_flight=self.max_in_flight)
+        return None
+    
+    def _iter_email_days(self, conn: imaplib.IMAP4_SSL, emails: List[Tuple[bytes, date]]
+                         ) -> Iterator[Tuple[bytes, date, Optional[Dict[date, List[Any]]]]]:
+        """
+        (email_id, email_date, records by call date) for each email, in the given order.
+        With imap_connections > 1 the attachments download in parallel through
+        an IMAPFetchPool while earlier emails are parsed and uploaded here.
+        """
+        if self.imap_connections <= 1 or len(emails) <= 1:
+            for email_id, email_date in emails:
+                yield email_id, email_date, self._read_email_days(conn, email_id, f"email:{email_date}")
+            return
+        
+        with IMAPFetchPool(self.email_fetcher, conn, self.imap_connections, self._download_csv) as pool:
+            for (email_id, email_date), csv_content in pool.map(emails):
+                by_date = None
+                if csv_content:
+                    by_date = self.parse_csv_by_date(StringIO(csv_content, newline=None), f"email:{email_date}")
+                yield email_id, email_date, by_date
+    
+    def _download_csv(self, conn: imaplib.IMAP4_SSL, email_id: bytes) -> Optional[str]:
+        """
+        CSV text of one report email's attachment: from the attachment cache,
+        else downloaded (attachment-only or full message) and cached. Runs on
+        IMAPFetchPool threads, each with its own connection.
+        """
+        cache_key = self.email_fetcher.message_id(conn, email_id) if self.attachment_cache else None
+        if cache_key:
+            stream = self.attachment_cache.open(cache_key)
+            if stream is not None:
+                try:
+                    with stream:
+                        return stream.read()
+                except (OSError, EOFError) as e:
+                    logger.warning(f"  Cached attachment unreadable, downloading again: {e}")
+        
+        csv_content = None
+        if self.partial_fetch:
+            try:
+                stream = self.email_fetcher.open_csv_attachment(conn, email_id)
+                if stream is not None:
+                    with stream:
+                        csv_content = stream.read()
+            except Exception as e:
+                logger.warning(f"  Attachment-only fetch failed, fetching full message: {e}")
+        if csv_content is None:
+            csv_content = self.email_fetcher.extract_csv_from_email(conn, email_id)
+        if csv_content and cache_key:
+            self.attachment_cache.put(cache_key, csv_content)
+        return csv_content
+    
+    def _read_email_days(self, conn: imaplib.IMAP4_SSL, email_id: bytes,
+                         source_file: str) -> Optional[Dict[date, List[Any]]]:
+        """
+        Parsed records of one report email's CSV attachment, by call date: from the attachment
+        cache when it has the email, else downloaded (attachment-only or full
+        message) and cached. None when the email has no CSV attachment.
+        """
+        cache_key = self.email_fetcher.message_id(conn, email_id) if self.attachment_cache else None
+        if cache_key:
+            stream = self.attachment_cache.open(cache_key)
+            if stream is not None:
+                try:
+                    with stream:
+                        logger.info(f"  Using cached attachment for {cache_key}")
+                        return self.parse_csv_by_date(stream, source_file)
+                except (OSError, EOFError) as e:
+                    logger.warning(f"  Cached attachment unreadable, downloading again: {e}")
+        
+        if self.partial_fetch:
+            by_date = self._parse_attachment_stream(conn, email_id, source_file, cache_key)
+            if by_date is not None:
+                return by_date
+        
+        csv_content = self.email_fetcher.extract_csv_from_email(conn, email_id)
+        if not csv_content:
+            return None
+        if cache_key:
+            self.attachment_cache.put(cache_key, csv_content)
+        return self.parse_csv_by_date(StringIO(csv_content, newline=None), source_file)
+    
+    def _parse_attachment_stream(self, conn: imaplib.IMAP4_SSL, email_id: bytes,
+                                 source_file: str, cache_key: str = None) -> Optional[Dict[date, List[Any]]]:
+        """
+        Parse an email's CSV attachment while it downloads (partial_fetch mode),
+        caching it on the way through when cache_key is given.
+        None means the caller should fall back to the full RFC822 fetch.
+        """
+        try:
+            stream = self.email_fetcher.open_csv_attachment(conn, email_id)
+            if stream is None:
+                logger.info("  No CSV part in BODYSTRUCTURE, fetching full message")
+                return None
+            with stream:
+                lines = self.attachment_cache.tee(cache_key, stream) if cache_key else stream
+                try:
+                    return self.parse_csv_by_date(lines, source_file)
+                finally:
+                    if cache_key:
+                        lines.close()
+        except Exception as e:
+            logger.warning(f"  Attachment-only fetch failed, fetching full message: {e}")
+            return None
+    
+    def _store_date(self, pipeline: Optional[UploadPipeline], load_date: date,
+                    date_records: List[Any], source: str, record_count: int = None) -> int:
+        """
+        Upload one day's records and mark the date loaded once every record is
+        stored (a day with dead-lettered rows stays unmarked so gap detection
+        retries it). With a pipeline the upload is queued and the date is marked
+        once all its batches succeed; returns the number of records queued
+        instead of stored. record_count is the day's total for the tracker when
+        date_records is only the changed rows.
+        """
+        if record_count is None:
+            record_count = len(date_records)
+        if not date_records:
+            # Everything for this day is already stored unchanged
+            self.store.mark_date_loaded(load_date, record_count, source)
+            return 0
+        if self.store.copy_loader:
+            inserted, _ = self.store.copy_loader.load(date_records, source, counts={load_date: record_count})
+            return inserted
+        if pipeline is None:
+            inserted = self.store.insert_records(date_records)
+            if inserted == len(date_records):
+                self.store.mark_date_loaded(load_date, record_count, source)
+            else:
+                logger.warning(f"  {load_date}: {len(date_records) - inserted} rows failed; not marked loaded")
+            return inserted
+        pipeline.submit(date_records, load_date)
+        pipeline.when_done(load_date, functools.partial(
+            self.store.mark_date_loaded, load_date, record_count, source))
+        return len(date_records)
+    
+    def _mirror(self, by_date: Dict[date, List[Any]]):
+        """Copy parsed days to the local mirror (all rows, before the pre-upload diff drops any)."""
+        if self.mirror and by_date:
+            self.mirror.write(chain.from_iterable(by_date.values()))
+    
+    def _skip_unchanged(self, by_date: Dict[date, List[Any]]) -> Dict[date, List[Any]]:
+        """
+        Pre-upload diff: drop records whose key and content already match a
+        stored row, using one bulk hash lookup for all the given dates.
+        Returns the records still to upload, grouped the same way.
+        """
+        if not self.diff_uploads or not by_date:
+            return by_date
+        existing = self.store.get_record_hashes(by_date.keys())
+        if not existing:
+            return by_date
         
-        return missing
+        changed: Dict[date, List[Any]] = {}
+        skipped_rows = 0
+        skipped_bytes = 0
+        for d, date_records in by_date.items():
+            keep = []
+            for record in records_as_dicts(date_records):
+                if existing.get(record_key(record)) == record_hash(record):
+                    skipped_rows += 1
+                    skipped_bytes += len(json.dumps(record))
+                else:
+                    keep.append(record)
+            changed[d] = keep
+            self.diff_checked_rows += len(date_records)
+        
+        self.diff_skipped_rows += skipped_rows
+        self.diff_skipped_bytes += skipped_bytes
+        logger.info(f"  Diff: {skipped_rows:,} unchanged rows skipped ({skipped_bytes / 1024:,.0f} KB), "
+                    f"{sum(len(v) for v in changed.values()):,} new or changed")
+        return changed
+    
+    def _mark_confirmed_empty(self, by_date: Dict[date, List[Any]], all_dates_loaded: Set[date],
+                              already_loaded: DateRanges, source: str):
+        """
+        Business days strictly inside a report's call_date span with no calls in
+        it (closures) are tracked with record_count 0, so gap detection stops
+        asking for them. Holidays are skipped as gap detection does, and days
+        the tracker already has are left alone.
+        """
+        first, last = min(by_date), max(by_date)
+        empty = [d for d in (first + timedelta(days=n) for n in range(1, (last - first).days))
+                 if self.calendar.is_business_day(d) and d not in by_date and d not in all_dates_loaded and d not in already_loaded]
+        for d in empty:
+            self.store.mark_date_loaded(d, 0, source)
+            all_dates_loaded.add(d)
+        if empty:
+            logger.info(f"  Confirmed {len(empty)} business day(s) with no calls: {', '.join(map(str, empty))}")
     
     def process_all_emails(self, conn: imaplib.IMAP4_SSL, emails_to_process: List[Tuple[bytes, date]]) -> int:
         """Process specified 3CX report emails and load all data."""
@@ -552,44 +3638,49 @@ class ThreeCXProcessor:
         
         total_inserted = 0
         all_dates_loaded = set()
+        written_dates = set()  # Dates with rows sent, whose rollups need refreshing
+        already_loaded = self.loaded_index.sync(self.store)
+        pipeline = self._open_pipeline()
         
-        for i, (email_id, email_date) in enumerate(emails_to_process):
+        for i, (email_id, email_date, by_date) in enumerate(self._iter_email_days(conn, emails_to_process)):
             logger.info(f"Processing email {i+1}/{len(emails_to_process)} dated {email_date}...")
             
-            csv_content = self.email_fetcher.extract_csv_from_email(conn, email_id)
-            if not csv_content:
+            if by_date is None:
                 logger.warning(f"  No CSV found in email dated {email_date}")
                 continue
             
-            records = self.parse_csv_content(csv_content, source_file=f"email:{email_date}")
-            
-            if not records:
+            if not by_date:
                 logger.warning(f"  No valid records in email dated {email_date}")
                 continue
             
-            # Group by date
-            by_date: Dict[date, List[Dict]] = {}
-            for record in records:
-                d = datetime.fromisoformat(record['call_date']).date()
-                if d not in by_date:
-                    by_date[d] = []
-                by_date[d].append(record)
+            self.report_coverage.learn(self.email_fetcher.message_ids.get(email_id), by_date.keys(),
+                                       sum(len(date_records) for date_records in by_date.values()))
+            self._mark_confirmed_empty(by_date, all_dates_loaded, already_loaded, f"email:{email_date}")
             
             # Load each date's records (skip if already loaded from earlier email)
+            owned = {d: date_records for d, date_records in by_date.items() if d not in all_dates_loaded}
+            self._mirror(owned)
+            to_upload = self._skip_unchanged(owned)
             email_inserted = 0
             new_dates = 0
-            for d, date_records in sorted(by_date.items()):
-                if d not in all_dates_loaded:
-                    inserted = self.store.insert_records(date_records)
-                    self.store.mark_date_loaded(d, len(date_records), f"email:{email_date}")
-                    all_dates_loaded.add(d)
-                    email_inserted += inserted
-                    new_dates += 1
+            for d, date_records in sorted(owned.items()):
+                inserted = self._store_date(pipeline, d, to_upload[d], f"email:{email_date}",
+                                            record_count=len(date_records))
+                all_dates_loaded.add(d)
+                if to_upload[d]:
+                    written_dates.add(d)
+                email_inserted += inserted
+                new_dates += 1
             
             total_inserted += email_inserted
             logger.info(f"  Loaded {email_inserted} records, {new_dates} new days (skipped {len(by_date) - new_dates} overlapping days)")
         
+        if pipeline:
+            total_inserted = pipeline.close()
+        
+        self._refresh_rollups(written_dates)
         logger.info(f"Backfill complete: {total_inserted} total records, {len(all_dates_loaded)} unique days")
+        self._log_run_summary()
         return total_inserted
     
     def run_backfill(self, start_date: date = None):
@@ -618,26 +3709,27 @@ class ThreeCXProcessor:
             except:
                 pass
     
-    def run(self):
+    def run(self, conn: imaplib.IMAP4_SSL = None):
         """
         Fully automatic self-healing run.
         1. Check Supabase for what dates are already loaded
         2. Determine what's missing
         3. Fetch only the emails needed to fill gaps
+        conn is an open IMAP connection to reuse (left open); by default one
+        is opened for the run and logged out at the end.
         """
         logger.info("=" * 60)
         logger.info("3CX Data Loader - Automatic Run")
         logger.info("=" * 60)
         
         # Step 1: Check what we have in Supabase
-        loaded_dates = self.store.get_loaded_dates()
+        loaded = self.loaded_index.sync(self.store)
         today = datetime.now(TZ).date()
         yesterday = today - timedelta(days=1)
         
-        if loaded_dates:
-            min_loaded = min(loaded_dates)
-            max_loaded = max(loaded_dates)
-            logger.info(f"Supabase has data: {min_loaded} to {max_loaded} ({len(loaded_dates)} days)")
+        if loaded:
+            logger.info(f"Supabase has data: {loaded.first} to {loaded.last} "
+                        f"({loaded.days()} days in {len(loaded)} ranges)")
         else:
             logger.info("Supabase is empty - will do full backfill")
         
@@ -645,13 +3737,8 @@ class ThreeCXProcessor:
         # We want data from Aug 13, 2025 (30 days before first email on 9/12) through yesterday
         earliest_needed = date(2025, 8, 13)
         
-        # Find missing weekdays
-        missing_dates = []
-        current = earliest_needed
-        while current <= yesterday:
-            if current.weekday() < 5 and current not in loaded_dates:  # Weekdays only
-                missing_dates.append(current)
-            current += timedelta(days=1)
+        # Missing business days: the gaps left after subtracting the loaded ranges
+        missing_dates = loaded.missing_days(earliest_needed, yesterday, self.calendar)
         
         if not missing_dates:
             logger.info("All data is up to date! Nothing to load.")
@@ -663,7 +3750,9 @@ class ThreeCXProcessor:
         
         # Step 3: Determine which emails we need
         # Each email has 30 days of data, so we pick strategically
-        conn = self.email_fetcher.connect()
+        own_conn = conn is None
+        if own_conn:
+            conn = self.email_fetcher.connect()
         try:
             all_reports = self.email_fetcher.find_3cx_reports(conn, BACKFILL_START_DATE)
             
@@ -690,46 +3779,55 @@ class ThreeCXProcessor:
             logger.info("=" * 60)
             
         finally:
-            try:
-                conn.logout()
-            except:
-                pass
+            if own_conn:
+                try:
+                    conn.logout()
+                except:
+                    pass
     
     def _select_emails_for_dates(self, all_reports: List[Tuple[bytes, date]], missing_dates: List[date]) -> List[Tuple[bytes, date]]:
         """
-        Select the minimum emails needed to cover missing dates.
-        Each email covers ~30 days before its date.
+        Select the emails that cover the missing dates with the fewest rows to
+        download and parse, using the learned call_date range of reports already
+        parsed. Dates those cannot cover fall back to the newest-first heuristic
+        over the unparsed reports, each assumed to hold the ~30 days before its
+        date: the cover would trust that guess and pick cheap reports that may
+        not hold the days at all.
         """
-        missing_set = set(missing_dates)
-        selected = []
-        covered = set()
-        
-        # Sort reports by date descending (newest first)
-        sorted_reports = sorted(all_reports, key=lambda x: x[1] or date.min, reverse=True)
-        
-        # Greedily select emails that cover the most uncovered missing dates
-        for email_id, email_date in sorted_reports:
+        windows = {}
+        intervals = []
+        unlearned = []
+        for email_id, email_date in all_reports:
             if not email_date:
                 continue
-            
-            # This email covers approximately email_date - 30 days to email_date
-            email_covers_start = email_date - timedelta(days=30)
-            email_covers_end = email_date
-            
-            # What missing dates would this email cover?
-            would_cover = set()
-            for d in missing_set:
-                if email_covers_start <= d <= email_covers_end and d not in covered:
-                    would_cover.add(d)
-            
+            message_id = self.email_fetcher.message_ids.get(email_id)
+            first, last, rows = self.report_coverage.window(message_id, email_date)
+            windows[email_id] = (first, last)
+            if self.report_coverage.learned(message_id):
+                intervals.append((first, last, rows, (email_id, email_date)))
+            else:
+                unlearned.append((email_id, email_date))
+        
+        selected, remaining = cover_dates(intervals, missing_dates)
+        
+        remaining = set(remaining)
+        for email_id, email_date in sorted(unlearned, key=lambda x: x[1], reverse=True):
+            if not remaining:
+                break
+            first, last = windows[email_id]
+            would_cover = {d for d in remaining if first <= d <= last}
             if would_cover:
                 selected.append((email_id, email_date))
-                covered.update(would_cover)
-                logger.info(f"  Email {email_date}: covers {len(would_cover)} missing days")
-                
-                # Check if we've covered everything
-                if covered >= missing_set:
-                    break
+                remaining -= would_cover
+        uncovered = sorted(remaining)
+        
+        for email_id, email_date in selected:
+            first, last = windows[email_id]
+            covers = sum(1 for d in missing_dates if first <= d <= last)
+            logger.info(f"  Email {email_date}: covers {first} to {last} ({covers} missing days)")
+        if uncovered:
+            logger.warning(f"  No report covers {len(uncovered)} missing days "
+                           f"({uncovered[0]} to {uncovered[-1]})")
         
         # Sort selected emails chronologically for processing
         selected.sort(key=lambda x: x[1])
@@ -737,31 +3835,33 @@ class ThreeCXProcessor:
         return selected
     
     def show_status(self):
-        """Show current data coverage status."""
-        stats = self.store.get_date_stats()
-        loaded_dates = self.store.get_loaded_dates()
+        """Show current data coverage status (one call_data_status() RPC when available)."""
+        today = datetime.now(TZ).date()
+        month_ago = today - timedelta(days=30)
+        closed = self.calendar.closed_days(date(today.year - STATUS_HOLIDAY_YEARS, 1, 1), today)
+        status = self.store.get_status(end=today, closed=closed)
+        if status is None:
+            status = self._local_status(today)
         
         print("\n" + "=" * 60)
         print("3CX DATA COVERAGE STATUS")
         print("=" * 60)
         
-        if stats:
-            print(f"Date Range:     {stats.get('min_date')} to {stats.get('max_date')}")
-            print(f"Total Records:  {stats.get('total_records', 0):,}")
-            print(f"Days Loaded:    {stats.get('days_loaded', 0)}")
+        print(f"Date Range:     {status.get('min_date')} to {status.get('max_date')}")
+        print(f"Total Records:  {status.get('total_records', 0):,}")
+        print(f"Days Loaded:    {status.get('days_loaded', 0)}")
         
-        if loaded_dates:
-            min_loaded = min(loaded_dates)
-            max_loaded = max(loaded_dates)
-            expected_days = (max_loaded - min_loaded).days + 1
-            expected_weekdays = sum(1 for i in range(expected_days) 
-                                    if (min_loaded + timedelta(days=i)).weekday() < 5)
-            coverage = (len(loaded_dates) / expected_weekdays * 100) if expected_weekdays > 0 else 0
-            print(f"Coverage:       {coverage:.1f}% (weekdays only)")
+        first_loaded, last_loaded = status['first_loaded'], status['last_loaded']
+        if first_loaded:
+            print(f"Empty Days:     {status.get('empty_days', 0)} (confirmed no calls)")
+            expected_days = self.calendar.count_business_days(first_loaded, last_loaded)
+            missing_days = sum(self.calendar.count_business_days(max(first, first_loaded), min(last, last_loaded))
+                               for first, last, _ in status['missing'])
+            coverage = ((expected_days - missing_days) / expected_days * 100) if expected_days > 0 else 0
+            print(f"Coverage:       {coverage:.1f}% (business days only)")
         
-        today = datetime.now(TZ).date()
-        month_ago = today - timedelta(days=30)
-        missing = self.get_missing_dates(month_ago, today)
+        missing = [d for first, last, _ in status['missing']
+                   for d in self.calendar.business_days(max(first, month_ago), min(last, today))]
         
         if missing:
             print(f"\nMissing dates (last 30 days): {len(missing)}")
@@ -773,6 +3873,120 @@ class ThreeCXProcessor:
             print("\nNo missing dates in the last 30 days!")
         
         print("=" * 60 + "\n")
+    
+    def _local_status(self, today: date) -> Dict[str, Any]:
+        """show_status data without the RPC: separate stats queries plus the loaded-date index."""
+        status = self.store.get_date_stats(use_rpc=False) or {}
+        loaded = self.loaded_index.sync(self.store)
+        runs = [(first, last, self.calendar.count_business_days(first, last))
+                for first, last in loaded.gaps(loaded.first or today, today)]
+        status.update({
+            'empty_days': self.loaded_index.empty.days(),
+            'first_loaded': loaded.first,
+            'last_loaded': loaded.last,
+            'missing': [run for run in runs if run[2]],
+        })
+        return status
+
+
+class LoaderDaemon:
+    """
+    Long-running loader around one ThreeCXProcessor, so the Supabase client
+    (and its pooled HTTPS connection) and the IMAP login are set up once
+    instead of on every invocation. Every mail_interval seconds the mailbox
+    is checked with a NOOP on the warm IMAP connection; when the server
+    reports a changed message count, the usual gap-filling run() is made over
+    that connection. A CSV drop folder is polled every watch_interval seconds
+    through ExportTailer. SIGTERM and SIGINT stop the loop once the current
+    step has finished; connections are then closed.
+    """
+    
+    def __init__(self, processor: 'ThreeCXProcessor', watch_dir: str = None,
+                 tail_state_path: str = TAIL_STATE_FILE, mail_interval: float = DAEMON_MAIL_INTERVAL,
+                 watch_interval: float = DAEMON_WATCH_INTERVAL):
+        self.processor = processor
+        self.watch_dir = watch_dir
+        self.tailer = ExportTailer(processor, tail_state_path) if watch_dir else None
+        self.mail_interval = mail_interval
+        self.watch_interval = watch_interval
+        self.stopping = threading.Event()
+        self.conn: Optional[imaplib.IMAP4_SSL] = None
+        self.message_count: Optional[int] = None  # INBOX size after the last run()
+        self.failures = 0
+    
+    def stop(self, signum: int = None, frame: Any = None):
+        if signum is not None:
+            logger.info(f"Received {signal.Signals(signum).name}; stopping after the current step")
+        self.stopping.set()
+    
+    def run(self):
+        """Serve until stop() (or SIGTERM / SIGINT)."""
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.stop)
+        logger.info(f"Daemon started: mailbox every {self.mail_interval:g}s"
+                    + (f", {self.watch_dir} every {self.watch_interval:g}s" if self.watch_dir else ""))
+        next_mail = next_watch = time.monotonic()
+        try:
+            while not self.stopping.is_set():
+                now = time.monotonic()
+                if self.mail_interval and now >= next_mail:
+                    next_mail = now + (self.mail_interval if self._step(self._check_mail) else self._backoff())
+                if self.tailer and now >= next_watch and not self.stopping.is_set():
+                    next_watch = now + (self.watch_interval
+                                        if self._step(self.tailer.poll, self.watch_dir) else self._backoff())
+                due = [t for t, on in ((next_mail, self.mail_interval), (next_watch, self.tailer)) if on]
+                if not due:
+                    break
+                self.stopping.wait(max(0.0, min(due) - time.monotonic()))
+        finally:
+            self.close()
+    
+    def _step(self, fn: Callable, *args) -> bool:
+        try:
+            fn(*args)
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Daemon step {fn.__name__} failed ({self.failures} in a row): {e}")
+            self._drop_imap()
+            return False
+        self.failures = 0
+        return True
+    
+    def _backoff(self) -> float:
+        return min(DAEMON_MAX_BACKOFF, 2.0 ** self.failures)
+    
+    def _check_mail(self):
+        if self.conn is None:
+            self.conn = self.processor.email_fetcher.connect()
+            self.message_count = None
+        elif self.message_count is not None:
+            self.conn.noop()  # Also keeps the connection from idling out
+            _, data = self.conn.response('EXISTS')
+            if data[-1] is None or int(data[-1]) == self.message_count:
+                return
+            logger.info(f"Mailbox changed ({self.message_count} -> {int(data[-1])} messages)")
+        self.processor.run(self.conn)
+        _, data = self.conn.select('INBOX')
+        self.conn.response('EXISTS')  # Baseline for the next NOOP, not a change
+        self.message_count = int(data[0])
+    
+    def _drop_imap(self):
+        if self.conn is not None:
+            try:
+                self.conn.logout()
+            except Exception:
+                pass
+        self.conn = None
+    
+    def close(self):
+        self._drop_imap()
+        if self.processor.store.copy_loader:
+            self.processor.store.copy_loader.close()
+        if self.processor.mirror:
+            self.processor.mirror.close()
+        if self.processor.attachment_cache:
+            self.processor.attachment_cache.flush()
+        logger.info("Daemon stopped")
 
 
 SUPABASE_DDL = """
@@ -781,9 +3995,14 @@ SUPABASE_DDL = """
 -- Run this in Supabase SQL Editor (https://supabase.com/dashboard)
 -- ============================================================================
 
--- Main call records table
+-- Main call records table, partitioned by month of call_date (one partition per
+-- month, named call_records_yYYYYmMM and created by ensure_call_records_partitions()).
+-- The partition key has to be part of every unique key; call_date follows from
+-- call_time, so unique_call identifies the same calls as before.
+-- Installs created with the earlier single-table layout keep working unchanged;
+-- convert them with the script printed by --show-partition-migration.
 CREATE TABLE IF NOT EXISTS call_records (
-    id BIGSERIAL PRIMARY KEY,
+    id BIGSERIAL,
     call_time TIMESTAMPTZ NOT NULL,
     call_id VARCHAR(64),
     call_date DATE NOT NULL,
@@ -801,8 +4020,12 @@ CREATE TABLE IF NOT EXISTS call_records (
     call_activity_details TEXT,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     source_file VARCHAR(255),
-    CONSTRAINT unique_call UNIQUE (call_time, call_id, from_field, to_field)
-);
+    PRIMARY KEY (id, call_date),
+    CONSTRAINT unique_call UNIQUE (call_time, call_id, from_field, to_field, call_date)
+) PARTITION BY RANGE (call_date);
+
+-- "Linked" number as sent by the loader: the same normalized 10-digit number as phone_number
+ALTER TABLE call_records ADD COLUMN IF NOT EXISTS linked VARCHAR(20);
 
 CREATE INDEX IF NOT EXISTS idx_call_records_date ON call_records(call_date);
 CREATE INDEX IF NOT EXISTS idx_call_records_direction ON call_records(direction);
@@ -811,6 +4034,55 @@ CREATE INDEX IF NOT EXISTS idx_call_records_phone ON call_records(phone_number);
 CREATE INDEX IF NOT EXISTS idx_call_records_status ON call_records(status);
 CREATE INDEX IF NOT EXISTS idx_call_records_employee ON call_records(employee_name);
 
+-- Create the monthly partitions covering p_from .. p_to that do not exist yet.
+-- The loader calls this before writing a month. Returns the number created,
+-- or -1 if call_records is an unpartitioned table.
+CREATE OR REPLACE FUNCTION ensure_call_records_partitions(p_from DATE, p_to DATE)
+RETURNS INT
+LANGUAGE plpgsql
+-- Creating a partition needs ownership of call_records, which the API role lacks
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+    m DATE := date_trunc('month', p_from)::date;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'call_records'::regclass) THEN
+        RETURN -1;
+    END IF;
+    WHILE m <= p_to LOOP
+        part := format('call_records_y%sm%s', to_char(m, 'YYYY'), to_char(m, 'MM'));
+        IF to_regclass(part) IS NULL THEN
+            BEGIN
+                EXECUTE format('CREATE TABLE %I PARTITION OF call_records FOR VALUES FROM (%L) TO (%L)',
+                               part, m, (m + interval '1 month')::date);
+                created := created + 1;
+            EXCEPTION WHEN duplicate_table THEN
+                NULL;  -- Created by a concurrent loader
+            END;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END
+$$;
+
+-- Runs with the owner's rights, so only the loader's service role may call it
+REVOKE EXECUTE ON FUNCTION ensure_call_records_partitions(DATE, DATE) FROM PUBLIC;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        GRANT EXECUTE ON FUNCTION ensure_call_records_partitions(DATE, DATE) TO service_role;
+    END IF;
+END
+$$;
+
+-- Partitions for this month and the next two on a fresh install
+SELECT ensure_call_records_partitions(CURRENT_DATE, (CURRENT_DATE + interval '2 months')::date)
+WHERE EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'call_records'::regclass);
+
 -- Tracker table for self-healing
 CREATE TABLE IF NOT EXISTS call_load_tracker (
     load_date DATE PRIMARY KEY,
@@ -819,11 +4091,151 @@ CREATE TABLE IF NOT EXISTS call_load_tracker (
     loaded_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Incremental sync of the loader's local loaded-date index (loaded_at > last sync)
+CREATE INDEX IF NOT EXISTS idx_call_load_tracker_loaded_at ON call_load_tracker(loaded_at);
+
+-- Key -> content hash of stored rows for the given dates (pre-upload diff).
+-- Must match record_key() / record_hash() in the loader.
+CREATE OR REPLACE FUNCTION call_record_hashes(p_dates DATE[])
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    SELECT COALESCE(jsonb_object_agg(k, h), '{}'::jsonb)
+    FROM (
+        SELECT
+            to_char(call_time AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS') || '|' ||
+                COALESCE(call_id, '') || '|' || COALESCE(from_field, '') || '|' || COALESCE(to_field, '') AS k,
+            left(md5(
+                to_char(call_date, 'YYYY-MM-DD') || '|' || COALESCE(direction, '') || '|' ||
+                COALESCE(status, '') || '|' || COALESCE(extension, '') || '|' ||
+                COALESCE(employee_name, '') || '|' || COALESCE(phone_number, '') || '|' ||
+                COALESCE(linked, '') || '|' || COALESCE(caller_id_raw, '') || '|' ||
+                COALESCE(ringing_seconds::text, '') || '|' || COALESCE(talking_seconds::text, '') || '|' ||
+                COALESCE(cost::text, '') || '|' || COALESCE(call_activity_details, '')
+            ), 16) AS h
+        FROM call_records
+        WHERE call_date = ANY(p_dates)
+    ) t
+$$;
+
+-- ============================================================================
+-- REPORTING ROLLUPS
+-- Per-day aggregates the loader keeps current: after each load it calls
+-- refresh_call_rollups() for the dates it wrote, so the views below read
+-- O(days) rollup rows instead of re-aggregating every call.
+-- ============================================================================
+
+-- Calls per day, extension, employee and direction ('' = no extension / name)
+CREATE TABLE IF NOT EXISTS call_rollup_extension_daily (
+    call_date DATE NOT NULL,
+    extension VARCHAR(10) NOT NULL DEFAULT '',
+    employee_name VARCHAR(100) NOT NULL DEFAULT '',
+    direction VARCHAR(20) NOT NULL,
+    total_calls INT NOT NULL,
+    answered INT NOT NULL,
+    unanswered INT NOT NULL,
+    talking_seconds BIGINT NOT NULL,
+    answered_talking_seconds BIGINT NOT NULL,
+    ringing_seconds BIGINT NOT NULL,
+    cost DECIMAL(14,4) NOT NULL,
+    PRIMARY KEY (call_date, extension, employee_name, direction)
+);
+
+-- Inbound calls per caller and day (10-digit numbers only)
+CREATE TABLE IF NOT EXISTS call_rollup_phone_daily (
+    phone_number VARCHAR(20) NOT NULL,
+    call_date DATE NOT NULL,
+    inbound_calls INT NOT NULL,
+    talking_seconds BIGINT NOT NULL,
+    PRIMARY KEY (phone_number, call_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_rollup_phone_daily_date ON call_rollup_phone_daily(call_date);
+
+-- Recompute both rollups for the given dates from call_records
+CREATE OR REPLACE FUNCTION refresh_call_rollups(p_dates DATE[])
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n INT;
+BEGIN
+    DELETE FROM call_rollup_extension_daily WHERE call_date = ANY(p_dates);
+    INSERT INTO call_rollup_extension_daily
+    SELECT
+        call_date, COALESCE(extension, ''), COALESCE(employee_name, ''), direction,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'Answered'),
+        COUNT(*) FILTER (WHERE status = 'Unanswered'),
+        COALESCE(SUM(talking_seconds), 0),
+        COALESCE(SUM(talking_seconds) FILTER (WHERE status = 'Answered'), 0),
+        COALESCE(SUM(ringing_seconds), 0),
+        COALESCE(SUM(cost), 0)
+    FROM call_records
+    WHERE call_date = ANY(p_dates)
+    GROUP BY 1, 2, 3, 4;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    
+    DELETE FROM call_rollup_phone_daily WHERE call_date = ANY(p_dates);
+    INSERT INTO call_rollup_phone_daily
+    SELECT phone_number, call_date, COUNT(*), COALESCE(SUM(talking_seconds), 0)
+    FROM call_records
+    WHERE call_date = ANY(p_dates)
+      AND direction = 'Inbound'
+      AND phone_number IS NOT NULL
+      AND LENGTH(phone_number) = 10
+    GROUP BY 1, 2;
+    RETURN n;
+END
+$$;
+
+-- One-time fill for data loaded before the rollups existed
+SELECT refresh_call_rollups(ARRAY(SELECT DISTINCT call_date FROM call_records))
+WHERE NOT EXISTS (SELECT 1 FROM call_rollup_extension_daily);
+
+-- Everything --status shows in one call: date range and size of the data, tracker
+-- counts, and the runs of business days missing from the tracker between p_start
+-- (default: first tracked day) and p_end. Weekends and p_closed_dates are skipped;
+-- total_records sums the per-day rollup, which every load refreshes for the dates it
+-- wrote, so it equals count(*) on call_records without scanning it.
+CREATE OR REPLACE FUNCTION call_data_status(p_start DATE DEFAULT NULL, p_end DATE DEFAULT CURRENT_DATE,
+                                            p_closed_dates DATE[] DEFAULT '{}')
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    WITH business AS (
+        SELECT g::date AS d, row_number() OVER (ORDER BY g) AS n
+        FROM generate_series(
+            COALESCE(p_start, (SELECT min(load_date) FROM call_load_tracker), p_end), p_end, interval '1 day'
+        ) AS g
+        WHERE extract(isodow FROM g) < 6 AND NOT g::date = ANY(p_closed_dates)
+    ),
+    missing AS (
+        SELECT d, n - row_number() OVER (ORDER BY d) AS run
+        FROM business b
+        WHERE NOT EXISTS (SELECT 1 FROM call_load_tracker t WHERE t.load_date = b.d)
+    )
+    SELECT jsonb_build_object(
+        'min_date', (SELECT min(call_date) FROM call_records),
+        'max_date', (SELECT max(call_date) FROM call_records),
+        'total_records', (SELECT COALESCE(sum(total_calls), 0) FROM call_rollup_extension_daily),
+        'days_loaded', (SELECT count(*) FROM call_load_tracker),
+        'empty_days', (SELECT count(*) FROM call_load_tracker WHERE record_count = 0),
+        'first_loaded', (SELECT min(load_date) FROM call_load_tracker),
+        'last_loaded', (SELECT max(load_date) FROM call_load_tracker),
+        'missing', COALESCE((
+            SELECT jsonb_agg(jsonb_build_array(first, last, days) ORDER BY first)
+            FROM (SELECT min(d) AS first, max(d) AS last, count(*) AS days FROM missing GROUP BY run) r
+        ), '[]'::jsonb)
+    )
+$$;
+
 -- ============================================================================
 -- REPORTING VIEWS
 -- ============================================================================
 
--- Outbound calls by salesperson
+-- Outbound calls by salesperson (per number called, so read from call_records;
+-- filter on call_date to use idx_call_records_date)
 CREATE OR REPLACE VIEW v_outbound_by_salesperson AS
 SELECT 
     call_date,
@@ -844,17 +4256,17 @@ GROUP BY call_date, extension, employee_name, phone_number;
 CREATE OR REPLACE VIEW v_inbound_by_employee AS
 SELECT 
     call_date,
-    extension,
-    employee_name,
-    COUNT(*) as total_calls,
-    SUM(CASE WHEN status = 'Answered' THEN 1 ELSE 0 END) as answered,
-    SUM(CASE WHEN status = 'Unanswered' THEN 1 ELSE 0 END) as missed,
-    SUM(talking_seconds) as total_talk_seconds,
-    AVG(talking_seconds) FILTER (WHERE status = 'Answered') as avg_talk_seconds,
-    AVG(ringing_seconds) as avg_ring_seconds
-FROM call_records
+    NULLIF(extension, '')::VARCHAR(10) as extension,
+    NULLIF(employee_name, '')::VARCHAR(100) as employee_name,
+    SUM(total_calls) as total_calls,
+    SUM(answered) as answered,
+    SUM(unanswered) as missed,
+    SUM(talking_seconds)::BIGINT as total_talk_seconds,
+    SUM(answered_talking_seconds) / NULLIF(SUM(answered), 0) as avg_talk_seconds,
+    SUM(ringing_seconds) / NULLIF(SUM(total_calls), 0) as avg_ring_seconds
+FROM call_rollup_extension_daily
 WHERE direction = 'Inbound'
-  AND extension IS NOT NULL
+  AND extension <> ''
   AND extension NOT IN ('801', '807', '808', '809')
 GROUP BY call_date, extension, employee_name;
 
@@ -862,15 +4274,15 @@ GROUP BY call_date, extension, employee_name;
 CREATE OR REPLACE VIEW v_daily_summary AS
 SELECT 
     call_date,
-    COUNT(*) as total_calls,
-    SUM(CASE WHEN direction = 'Outbound' THEN 1 ELSE 0 END) as outbound,
-    SUM(CASE WHEN direction = 'Inbound' THEN 1 ELSE 0 END) as inbound,
-    SUM(CASE WHEN direction = 'Internal' THEN 1 ELSE 0 END) as internal,
-    SUM(CASE WHEN status = 'Answered' THEN 1 ELSE 0 END) as answered,
-    SUM(CASE WHEN status = 'Unanswered' THEN 1 ELSE 0 END) as unanswered,
-    SUM(talking_seconds) / 60 as total_talk_minutes,
+    SUM(total_calls) as total_calls,
+    COALESCE(SUM(total_calls) FILTER (WHERE direction = 'Outbound'), 0) as outbound,
+    COALESCE(SUM(total_calls) FILTER (WHERE direction = 'Inbound'), 0) as inbound,
+    COALESCE(SUM(total_calls) FILTER (WHERE direction = 'Internal'), 0) as internal,
+    SUM(answered) as answered,
+    SUM(unanswered) as unanswered,
+    SUM(talking_seconds)::BIGINT / 60 as total_talk_minutes,
     SUM(cost) as total_cost
-FROM call_records
+FROM call_rollup_extension_daily
 GROUP BY call_date
 ORDER BY call_date DESC;
 
@@ -880,37 +4292,85 @@ SELECT
     phone_number,
     MIN(call_date) as first_call,
     MAX(call_date) as last_call,
-    COUNT(*) as total_calls,
-    COUNT(DISTINCT call_date) as days_called,
-    SUM(talking_seconds) as total_talk_seconds
-FROM call_records
-WHERE direction = 'Inbound'
-  AND phone_number IS NOT NULL
-  AND LENGTH(phone_number) = 10
+    SUM(inbound_calls) as total_calls,
+    COUNT(*) as days_called,
+    SUM(talking_seconds)::BIGINT as total_talk_seconds
+FROM call_rollup_phone_daily
 GROUP BY phone_number
-HAVING COUNT(*) > 1
+HAVING SUM(inbound_calls) > 1
 ORDER BY total_calls DESC;
 
 -- Salesperson daily metrics (for dashboard)
 CREATE OR REPLACE VIEW v_salesperson_daily AS
 SELECT 
     call_date,
-    extension,
-    employee_name,
-    SUM(CASE WHEN direction = 'Outbound' THEN 1 ELSE 0 END) as outbound_calls,
-    SUM(CASE WHEN direction = 'Outbound' AND status = 'Answered' THEN 1 ELSE 0 END) as outbound_connected,
-    SUM(CASE WHEN direction = 'Inbound' THEN 1 ELSE 0 END) as inbound_calls,
-    SUM(CASE WHEN direction = 'Inbound' AND status = 'Answered' THEN 1 ELSE 0 END) as inbound_answered,
-    SUM(talking_seconds) as total_talk_seconds,
+    extension::VARCHAR(10) as extension,
+    NULLIF(employee_name, '')::VARCHAR(100) as employee_name,
+    COALESCE(SUM(total_calls) FILTER (WHERE direction = 'Outbound'), 0) as outbound_calls,
+    COALESCE(SUM(answered) FILTER (WHERE direction = 'Outbound'), 0) as outbound_connected,
+    COALESCE(SUM(total_calls) FILTER (WHERE direction = 'Inbound'), 0) as inbound_calls,
+    COALESCE(SUM(answered) FILTER (WHERE direction = 'Inbound'), 0) as inbound_answered,
+    SUM(talking_seconds)::BIGINT as total_talk_seconds,
     ROUND(SUM(talking_seconds) / 60.0, 1) as total_talk_minutes
-FROM call_records
-WHERE extension IS NOT NULL
-  AND extension BETWEEN '100' AND '199'
+FROM call_rollup_extension_daily
+WHERE extension BETWEEN '100' AND '199'
 GROUP BY call_date, extension, employee_name
 ORDER BY call_date DESC, employee_name;
 """
 
 
+# Converts an install created with the single-table call_records to the
+# month-partitioned layout in one transaction: the old table is renamed, an
+# identical partitioned table takes its name, partitions are created for every
+# month of data and the rows are copied across. Writers and readers are blocked
+# until it commits. Printed by --show-partition-migration followed by
+# SUPABASE_DDL and PARTITION_MIGRATION_FINISH, so the indexes, functions and
+# views are recreated on the new table before the copy and inside the same transaction.
+PARTITION_MIGRATION_START = """
+-- ============================================================================
+-- MIGRATE call_records TO MONTHLY PARTITIONS
+-- Run once, as a whole, in the Supabase SQL Editor. Stop the loader first.
+-- ============================================================================
+
+BEGIN;
+
+LOCK TABLE call_records IN ACCESS EXCLUSIVE MODE;
+
+-- Move the existing table out of the way (its constraint and index names too)
+DROP VIEW IF EXISTS v_outbound_by_salesperson;
+ALTER TABLE call_records RENAME TO call_records_unpartitioned;
+ALTER TABLE call_records_unpartitioned RENAME CONSTRAINT call_records_pkey TO call_records_unpartitioned_pkey;
+ALTER TABLE call_records_unpartitioned RENAME CONSTRAINT unique_call TO call_records_unpartitioned_unique_call;
+DROP INDEX IF EXISTS idx_call_records_date, idx_call_records_direction, idx_call_records_extension,
+    idx_call_records_phone, idx_call_records_status, idx_call_records_employee;
+
+-- Same columns, defaults and id sequence, partitioned by month
+CREATE TABLE call_records (LIKE call_records_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    PARTITION BY RANGE (call_date);
+ALTER TABLE call_records
+    ADD PRIMARY KEY (id, call_date),
+    ADD CONSTRAINT unique_call UNIQUE (call_time, call_id, from_field, to_field, call_date);
+ALTER SEQUENCE call_records_id_seq OWNED BY call_records.id;
+"""
+
+PARTITION_MIGRATION_FINISH = """
+-- Copy the data into partitions covering every month it spans
+SELECT ensure_call_records_partitions(
+    LEAST(COALESCE((SELECT min(call_date) FROM call_records_unpartitioned), CURRENT_DATE), CURRENT_DATE),
+    GREATEST(COALESCE((SELECT max(call_date) FROM call_records_unpartitioned), CURRENT_DATE), CURRENT_DATE)
+);
+INSERT INTO call_records SELECT * FROM call_records_unpartitioned;
+SELECT refresh_call_rollups(ARRAY(SELECT DISTINCT call_date FROM call_records))
+WHERE NOT EXISTS (SELECT 1 FROM call_rollup_extension_daily);
+
+DROP TABLE call_records_unpartitioned;
+
+COMMIT;
+
+ANALYZE call_records;
+"""
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="3CX Call Data Processor - Automatic Self-Healing Loader"
@@ -919,17 +4379,144 @@ def main():
                         help='Show data coverage status only (no loading)')
     parser.add_argument('--show-ddl', action='store_true',
                         help='Print Supabase DDL and exit')
+    parser.add_argument('--show-partition-migration', action='store_true',
+                        help='Print the SQL that converts call_records to monthly partitions and exit')
+    parser.add_argument('--refresh-rollups', action='store_true',
+                        help='Recompute the reporting rollups for every loaded date and exit')
+    parser.add_argument('--load-csv', metavar='FILE',
+                        help='Load a manual 3CX CSV export')
+    parser.add_argument('--stream', action='store_true',
+                        help='With --load-csv: read and upload the file incrementally (flat memory)')
+    parser.add_argument('--fast-parse', action='store_true',
+                        help='Use the high-throughput column-index parser')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Use the columnar parse engine for bulk loads (pandas if installed)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parse CSV rows on this many processes (default: %(default)s, serial)')
+    parser.add_argument('--upload-workers', type=int, default=1,
+                        help='Concurrent upsert requests to Supabase (default: %(default)s, serial)')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='With --upload-workers: max batches queued or uploading (default: 2 per worker)')
+    parser.add_argument('--dead-letter-file', default=DEAD_LETTER_FILE,
+                        help='JSONL file for rows Supabase rejects (default: %(default)s)')
+    parser.add_argument('--adaptive-batching', action='store_true',
+                        help='Size upsert batches by payload bytes and observed latency')
+    parser.add_argument('--batch-bytes', type=int, default=BATCH_BYTE_BUDGET,
+                        help='With --adaptive-batching: payload budget per request (default: %(default)s)')
+    parser.add_argument('--batch-latency', type=float, default=BATCH_TARGET_LATENCY,
+                        help='With --adaptive-batching: target seconds per request (default: %(default)s)')
+    parser.add_argument('--batch-stats', metavar='FILE',
+                        help='Write chosen batch sizes and throughput as JSON after loading')
+    parser.add_argument('--field-cache-size', type=int, default=FIELD_CACHE_SIZE,
+                        help='LRU entries per From/To field decoder (0 disables; default: %(default)s)')
+    parser.add_argument('--partial-fetch', action='store_true',
+                        help='Download only the CSV attachment of report emails (BODYSTRUCTURE + BODY[n])')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help='Keep downloaded CSV attachments here (gzip) and reuse them on later runs')
+    parser.add_argument('--cache-max-mb', type=int, default=ATTACHMENT_CACHE_MAX_MB,
+                        help='With --cache-dir: evict least recently used beyond this size (default: %(default)s)')
+    parser.add_argument('--cache-max-days', type=int, default=ATTACHMENT_CACHE_MAX_DAYS,
+                        help='With --cache-dir: drop entries older than this (default: %(default)s)')
+    parser.add_argument('--incremental-sync', action='store_true',
+                        help='Only search mail newer than the last run (UID high-water mark in --sync-state)')
+    parser.add_argument('--sync-state', default=MAILBOX_SYNC_FILE,
+                        help='With --incremental-sync: state file (default: %(default)s)')
+    parser.add_argument('--imap-connections', type=int, default=1,
+                        help='Download report attachments over this many IMAP connections (default: %(default)s)')
+    parser.add_argument('--holidays', metavar='FILE', default=HOLIDAY_FILE,
+                        help='Holiday list for gap detection, one YYYY-MM-DD per line (default: %(default)s)')
+    parser.add_argument('--holiday-rules', default=BUSINESS_HOLIDAYS,
+                        help=f"Comma-separated built-in holidays (default: %(default)s; known: {', '.join(HOLIDAY_RULES)})")
+    parser.add_argument('--no-diff', action='store_true',
+                        help='Upload every parsed row instead of skipping rows already stored unchanged')
+    parser.add_argument('--copy', action='store_true',
+                        help='Bulk load over a direct Postgres connection (COPY + merge) instead of REST')
+    parser.add_argument('--pg-dsn', default=SUPABASE_DB_URL,
+                        help='With --copy: Postgres connection string (default: $SUPABASE_DB_URL)')
+    parser.add_argument('--tail', metavar='PATH',
+                        help='Intra-day mode: upsert rows appended to a rolling export file or drop directory')
+    parser.add_argument('--tail-state', default=TAIL_STATE_FILE,
+                        help='With --tail: checkpoint file (default: %(default)s)')
+    parser.add_argument('--tail-interval', type=float, default=0,
+                        help='With --tail: poll every this many seconds (default: poll once and exit)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running with warm connections: load new report emails and --watch-dir files as they arrive')
+    parser.add_argument('--watch-dir', metavar='DIR',
+                        help='With --daemon: CSV drop folder loaded like --tail (checkpoints in --tail-state)')
+    parser.add_argument('--mail-interval', type=float, default=DAEMON_MAIL_INTERVAL,
+                        help='With --daemon: seconds between mailbox checks (0 = no mail; default: %(default)s)')
+    parser.add_argument('--watch-interval', type=float, default=DAEMON_WATCH_INTERVAL,
+                        help='With --daemon: seconds between drop folder polls (default: %(default)s)')
+    parser.add_argument('--mirror', nargs='?', const=LOCAL_MIRROR_FILE, metavar='FILE',
+                        help=f'Also write loaded records to a local SQLite mirror (default file: {LOCAL_MIRROR_FILE})')
+    parser.add_argument('--report', choices=sorted(MIRROR_REPORTS),
+                        help='Print a v_* view metric computed from the local mirror and exit')
+    parser.add_argument('--query', metavar='SQL',
+                        help='Run SQL against the local mirror (table call_records) and exit')
+    parser.add_argument('--since', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help='With --report: first call date (default: all)')
+    parser.add_argument('--until', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help='With --report: last call date (default: all)')
+    parser.add_argument('--limit', type=int, default=100,
+                        help='With --report / --query: rows to print (0 = all; default: %(default)s)')
     
     args = parser.parse_args()
     
     if args.show_ddl:
         print(SUPABASE_DDL)
         return
+    if args.show_partition_migration:
+        print(PARTITION_MIGRATION_START + SUPABASE_DDL + PARTITION_MIGRATION_FINISH)
+        return
+    if args.report or args.query:
+        # Answered from the local mirror alone; no Supabase or email credentials needed
+        path = args.mirror or LOCAL_MIRROR_FILE
+        if not os.path.exists(path):
+            parser.error(f"no local mirror at {path} (load with --mirror first)")
+        mirror = LocalCallMirror(path)
+        started = time.perf_counter()
+        try:
+            if args.report:
+                columns, rows = mirror.report(args.report, args.since, args.until)
+            else:
+                columns, rows = mirror.query(args.query)
+        except sqlite3.Error as e:
+            parser.error(f"query failed: {e}")
+        elapsed = time.perf_counter() - started
+        mirror.close()
+        print_table(columns, rows, args.limit)
+        print(f"{len(rows):,} rows in {elapsed * 1000:.1f} ms")
+        return
     
-    processor = ThreeCXProcessor()
+    processor = ThreeCXProcessor(fast_parse=args.fast_parse, field_cache_size=args.field_cache_size,
+                                 columnar=args.columnar, parse_workers=args.workers,
+                                 upload_workers=args.upload_workers, max_in_flight=args.max_in_flight,
+                                 dead_letter_path=args.dead_letter_file,
+                                 batcher=AdaptiveBatcher(adaptive=args.adaptive_batching,
+                                                         byte_budget=args.batch_bytes,
+                                                         target_latency=args.batch_latency),
+                                 batch_stats_path=args.batch_stats,
+                                 copy_dsn=(args.pg_dsn or '') if args.copy else None,
+                                 diff_uploads=not args.no_diff, partial_fetch=args.partial_fetch,
+                                 attachment_cache=AttachmentCache(args.cache_dir, args.cache_max_mb,
+                                                                  args.cache_max_days) if args.cache_dir else None,
+                                 sync_state_path=args.sync_state if args.incremental_sync else None,
+                                 imap_connections=args.imap_connections,
+                                 calendar=BusinessCalendar(args.holidays, [r.strip() for r in args.holiday_rules.split(',')
+                                                                           if r.strip()]),
+                                 mirror_path=args.mirror)
     
     if args.status:
         processor.show_status()
+    elif args.refresh_rollups:
+        processor.refresh_all_rollups()
+    elif args.load_csv:
+        processor.load_csv_file(args.load_csv, stream=args.stream)
+    elif args.tail:
+        processor.tail_exports(args.tail, args.tail_state, args.tail_interval)
+    elif args.daemon:
+        LoaderDaemon(processor, watch_dir=args.watch_dir, tail_state_path=args.tail_state,
+                     mail_interval=args.mail_interval, watch_interval=args.watch_interval).run()
     else:
         # Automatic run - checks what's needed and loads it
         processor.run()
@@ -0,0 +1,1133 @@
+#!/usr/bin/env python3
+"""
+3CX Call Data Processor - Offline Benchmarks
+
+Synthetic workloads for the loader in phone_email.py. Nothing here touches
+Supabase or the real mailbox.
+
+Usage:
+    python phone_email_bench.py parse --rows 1000000     # parse_row vs fast parser
+    python phone_email_bench.py columnar --rows 500000   # parse_row vs columnar engine
+    python phone_email_bench.py parity --rows 200000     # columnar == parse_row check at scale (tests/ runs it small)
+    python phone_email_bench.py upload --rows 50000 --latency 0.05  # serial vs pipelined upserts
+    python phone_email_bench.py upload --workers 1 --adaptive --max-bytes 400000 --row-cost 0.0002
+    python phone_email_bench.py copy --dsn postgresql://postgres@localhost/bench  # COPY vs REST-style upserts
+    python phone_email_bench.py partition --dsn postgresql://postgres@localhost/bench  # single vs monthly partitions
+    python phone_email_bench.py imap-scan --messages 365 --latency 0.03  # per-message vs batched header scan
+    python phone_email_bench.py imap-fetch --rows 100000  # RFC822 vs attachment-only fetch (wire bytes, RSS)
+    python phone_email_bench.py imap-sync --messages 365  # full rescan vs UID incremental daily run
+    python phone_email_bench.py imap-sync-check  # high-water mark passes undated report emails
+    python phone_email_bench.py imap-backfill --reports 8 --connections 1,4  # serial vs pooled IMAP downloads
+    python phone_email_bench.py plan --days 365 --missing 40  # gap-refill email selection
+
+The copy benchmark needs a scratch Postgres database (it creates the schema
+from SUPABASE_DDL and truncates call_records / call_load_tracker).
+"""
+
+import os
+import re
+import csv
+import json
+import time
+import random
+import imaplib
+import resource
+import multiprocessing
+import logging
+import argparse
+import statistics
+import tempfile
+import threading
+import socketserver
+import email.policy
+import email.utils
+from email.message import EmailMessage
+from io import StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import psycopg2
+except ImportError:  # Only the Postgres benchmarks need it
+    psycopg2 = None
+
+import phone_email
+from phone_email import (
+    CallRecordParser, FastCallRecordParser, FieldDecoderCache, ColumnarCallParser,
+    ThreeCXProcessor, AdaptiveBatcher, PostgresCopyLoader, EmailReportFetcher, SUPABASE_DDL,
+    UPSERT_BATCH_SIZE, CALL_RECORDS_CONFLICT, PARTITIONED_CONFLICT, PARTITION_MIGRATION_START,
+    PARTITION_MIGRATION_FINISH
+)
+
+CSV_HEADER = [
+    'Call Time', 'Call ID', 'From', 'To', 'Direction', 'Status',
+    'Ringing', 'Talking', 'Cost', 'Call Activity Details'
+]
+
+EMPLOYEES = [
+    'Orlando, Julissa (117)', 'Rivera, Marco (104)', 'Chen, Amy (121)',
+    'Kowalski, Dan (109)', 'Patel, Nisha (133)', 'Warehouse (205)',
+    'Front Desk (800)'
+]
+
+
+def write_synthetic_export(path: str, rows: int, seed: int = 42, messy: bool = False,
+                           seconds_apart: int = 7) -> None:
+    """
+    Write a 3CX-style export with realistic repetition of From/To values,
+    one call every seconds_apart seconds from 2025-09-01.
+    messy=True mixes in the awkward cases: duplicate rows, odd call time
+    formats, unknown directions, bad costs, multi-line details and ragged rows.
+    """
+    rnd = random.Random(seed)
+    customers = [f"{rnd.randint(200, 989)}{rnd.randint(2000000, 9999999)}" for _ in range(5000)]
+    start = datetime(2025, 9, 1, 8, 0, 0)
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write("3CX Report DB_DATA\r\n\r\n")
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for i in range(rows):
+            call_time = start + timedelta(seconds=i * seconds_apart)
+            employee = rnd.choice(EMPLOYEES)
+            customer = rnd.choice(customers)
+            direction = rnd.choice(('Outbound', 'Inbound', 'Inbound', 'Internal'))
+            if direction == 'Outbound':
+                from_field, to_field = employee, f"+1{customer}"
+            elif direction == 'Inbound':
+                from_field, to_field = f"Caller ({customer})", employee
+            else:
+                from_field, to_field = employee, rnd.choice(EMPLOYEES)
+            row = [
+                call_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                str(100000 + i),
+                from_field,
+                to_field,
+                direction,
+                rnd.choice(('Answered', 'Answered', 'Unanswered')),
+                f"00:00:{rnd.randint(0, 40):02d}",
+                f"00:{rnd.randint(0, 30):02d}:{rnd.randint(0, 59):02d}",
+                rnd.choice(('0', '0.0150', '')),
+                f"Ringing {employee} -> Answered",
+            ]
+            if messy:
+                row[0] = rnd.choice((
+                    row[0], row[0], row[0].replace('Z', '+00:00'), row[0].replace('Z', '-05:00'),
+                    row[0].replace('T', ' '), row[0].replace('Z', '.250Z'), row[0][:-1],
+                    '2025-13-01T10:00:00Z', 'not a time', ''
+                ))
+                row[4] = rnd.choice((direction, direction, direction, ' Inbound ', 'Unknown'))
+                row[6] = rnd.choice((row[6], '', '1:2', 'xx:00:01'))
+                row[8] = rnd.choice((row[8], 'n/a', ' 1.5 '))
+                row[9] = rnd.choice((row[9], '', 'line one\nline two, "quoted"'))
+                if rnd.random() < 0.01:
+                    row = row[:rnd.randint(1, 9)]
+            writer.writerow(row)
+            if messy and rnd.random() < 0.05:
+                writer.writerow(row)
+        writer.writerow(['Totals'])
+
+
+def _time_it(fn: Callable[[], int]) -> Tuple[int, float]:
+    started = time.perf_counter()
+    count = fn()
+    return count, time.perf_counter() - started
+
+
+def bench_parse(rows: int) -> None:
+    """Compare rows/sec of CallRecordParser.parse_row and FastCallRecordParser."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'DBDATA_bench.csv')
+        print(f"Generating {rows:,} synthetic rows...")
+        write_synthetic_export(path, rows)
+
+        def baseline() -> int:
+            count = 0
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                for _ in range(2):
+                    next(f)
+                for row in csv.DictReader(f):
+                    if CallRecordParser.parse_row(row, 'bench.csv'):
+                        count += 1
+            return count
+
+        def fast(decoder=None) -> int:
+            count = 0
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                for _ in range(2):
+                    next(f)
+                reader = csv.reader(f)
+                parse = FastCallRecordParser(next(reader), decoder).parse
+                for values in reader:
+                    if values and parse(values, 'bench.csv'):
+                        count += 1
+            return count
+
+        field_cache = FieldDecoderCache()
+        base_count, base_secs = _time_it(baseline)
+        fast_count, fast_secs = _time_it(fast)
+        cached_count, cached_secs = _time_it(lambda: fast(field_cache))
+
+    print(f"parse_row:            {base_count:,} records in {base_secs:.2f}s "
+          f"({base_count / base_secs:,.0f} rows/sec)")
+    print(f"FastCallRecordParser: {fast_count:,} records in {fast_secs:.2f}s "
+          f"({fast_count / fast_secs:,.0f} rows/sec)")
+    print(f"  + field cache:      {cached_count:,} records in {cached_secs:.2f}s "
+          f"({cached_count / cached_secs:,.0f} rows/sec)")
+    print(f"Speedup:              {base_secs / fast_secs:.2f}x ({base_secs / cached_secs:.2f}x with cache)")
+    print(f"Field cache:          {field_cache.summary()}")
+
+
+def reference_records(text: str, source_file: str) -> List[Dict[str, Any]]:
+    """The row-at-a-time path: csv.DictReader + CallRecordParser.parse_row + dedup."""
+    lines = ThreeCXProcessor._lines_from_header(StringIO(text, newline=None))
+    records = []
+    seen = set()
+    for row in csv.DictReader(lines):
+        parsed = CallRecordParser.parse_row(row, source_file)
+        if parsed:
+            key = (parsed['call_time'], parsed['call_id'], parsed['from_field'], parsed['to_field'])
+            if key not in seen:
+                seen.add(key)
+                records.append(parsed)
+    return records
+
+
+def columnar_records(text: str, source_file: str, use_pandas: bool,
+                     decoder: Any = None) -> List[Dict[str, Any]]:
+    lines = ThreeCXProcessor._lines_from_header(StringIO(text, newline=None))
+    engine = ColumnarCallParser(decoder, use_pandas=use_pandas)
+    return engine.parse_rows(csv.reader(lines), source_file)
+
+
+def _engines() -> List[Tuple[str, bool]]:
+    engines = [('stdlib', False)]
+    if phone_email.pd is not None:
+        engines.insert(0, ('pandas', True))
+    return engines
+
+
+def bench_columnar(rows: int) -> None:
+    """Compare the row-at-a-time path with the columnar engine on one export."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'DBDATA_bench.csv')
+        print(f"Generating {rows:,} synthetic rows...")
+        write_synthetic_export(path, rows)
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+
+    count, base_secs = _time_it(lambda: len(reference_records(text, 'bench.csv')))
+    print(f"parse_row:          {count:,} records in {base_secs:.2f}s ({count / base_secs:,.0f} rows/sec)")
+    for name, use_pandas in _engines():
+        count, secs = _time_it(lambda: len(columnar_records(text, 'bench.csv', use_pandas)))
+        print(f"columnar ({name}): {count:,} records in {secs:.2f}s "
+              f"({count / secs:,.0f} rows/sec, {base_secs / secs:.2f}x)")
+
+
+def check_parity(rows: int) -> bool:
+    """Columnar output must serialize byte-for-byte like parse_row's, on clean and messy exports."""
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for messy in (False, True):
+            for seed in (1, 2, 3):
+                path = os.path.join(tmp, f'DBDATA_{seed}.csv')
+                write_synthetic_export(path, rows, seed=seed, messy=messy)
+                with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                    text = f.read()
+                expected = json.dumps(reference_records(text, 'parity.csv'))
+                for name, use_pandas in _engines():
+                    for decoder in (None, FieldDecoderCache(64)):
+                        actual = json.dumps(columnar_records(text, 'parity.csv', use_pandas, decoder))
+                        match = actual == expected
+                        ok = ok and match
+                        label = f"{'messy' if messy else 'clean'} seed={seed} {name}"
+                        label += ' +cache' if decoder else ''
+                        print(f"{'OK  ' if match else 'FAIL'} {label}")
+    print("Parity: " + ("all engines identical to parse_row" if ok else "MISMATCH"))
+    return ok
+
+
+class PostgrestStandIn:
+    """
+    Local stand-in for Supabase's PostgREST endpoint.
+    Accepts upserts/selects under /rest/v1/, sleeps `latency` seconds per
+    request (plus `row_cost` per row written) to mimic the network round-trip
+    and counts the rows received. Bodies over `max_bytes` get a 413.
+    """
+
+    def __init__(self, latency: float = 0.05, row_cost: float = 0.0, max_bytes: int = 0):
+        self.latency = latency
+        self.row_cost = row_cost
+        self.max_bytes = max_bytes
+        self.requests = 0
+        self.rows = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self, status: int, body: bytes = b'[]'):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if stand_in.max_bytes and len(body) > stand_in.max_bytes:
+                    with stand_in.lock:
+                        stand_in.requests += 1
+                    return self._reply(413, b'{"message": "Payload Too Large"}')
+                payload = json.loads(body or b'[]')
+                rows = len(payload) if isinstance(payload, list) else 1
+                time.sleep(stand_in.latency + stand_in.row_cost * rows)
+                with stand_in.lock:
+                    stand_in.requests += 1
+                    stand_in.rows += rows
+                self._reply(201)
+
+            def do_GET(self):
+                time.sleep(stand_in.latency)
+                with stand_in.lock:
+                    stand_in.requests += 1
+                self._reply(200)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.rows = 0
+
+    def close(self):
+        self.server.shutdown()
+
+
+def _point_at_stand_in(url: str) -> None:
+    """Environment for constructing ThreeCXProcessor against local stand-ins."""
+    os.environ['SUPABASE_URL'] = url
+    os.environ['SUPABASE_SERVICE_ROLE_KEY'] = 'bench-service-role-key'
+    os.environ.setdefault('EMAIL_ADDRESS', 'bench@example.com')
+    os.environ.setdefault('EMAIL_PASSWORD', 'bench')
+
+
+def bench_upload(rows: int, latency: float, worker_counts: List[int], adaptive: bool = False,
+                 row_cost: float = 0.0, max_bytes: int = 0, target_latency: float = 0.5) -> None:
+    """Serial insert_records vs UploadPipeline against the PostgREST stand-in."""
+    stand_in = PostgrestStandIn(latency, row_cost=row_cost, max_bytes=max_bytes)
+    _point_at_stand_in(stand_in.url)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'DBDATA_bench.csv')
+            write_synthetic_export(path, rows)
+            print(f"{rows:,} rows, {latency * 1000:.0f} ms injected latency per request")
+            baseline = None
+            for workers in worker_counts:
+                stand_in.reset()
+                batcher = AdaptiveBatcher(adaptive=adaptive, target_latency=target_latency)
+                processor = ThreeCXProcessor(upload_workers=workers, batcher=batcher)
+                count, secs = _time_it(lambda: processor.load_csv_file(path))
+                baseline = baseline or secs
+                label = 'serial' if workers <= 1 else f"{workers} workers"
+                print(f"{label:>11}: {count:,} records, {stand_in.requests} requests in {secs:.2f}s "
+                      f"({count / secs:,.0f} rows/sec, {baseline / secs:.2f}x)")
+                print(f"{'':>11}  batches: {batcher.summary()}")
+    finally:
+        stand_in.close()
+
+
+def _rest_style_upsert(conn, records: List[Dict[str, Any]], conflict: str = CALL_RECORDS_CONFLICT) -> int:
+    """
+    What PostgREST runs for one upsert request: the JSON batch expanded with
+    json_populate_recordset and merged ON CONFLICT, one statement per batch.
+    """
+    columns = ', '.join(PostgresCopyLoader.COLUMNS)
+    key = conflict.replace(',', ', ')
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in PostgresCopyLoader.COLUMNS if c not in key.split(', '))
+    sql = (f"INSERT INTO call_records ({columns}) "
+           f"SELECT {columns} FROM json_populate_recordset(NULL::call_records, %s) "
+           f"ON CONFLICT ({key}) DO UPDATE SET {updates}")
+    merged = 0
+    with conn.cursor() as cur:
+        if conflict == PARTITIONED_CONFLICT:
+            # Like SupabaseCallStore.ensure_partitions() before the first upload
+            days = sorted({r['call_date'] for r in records})
+            cur.execute("SELECT ensure_call_records_partitions(%s, %s)", (days[0], days[-1]))
+            conn.commit()
+        for start in range(0, len(records), UPSERT_BATCH_SIZE):
+            cur.execute(sql, (json.dumps(records[start:start + UPSERT_BATCH_SIZE]),))
+            conn.commit()
+            merged += cur.rowcount
+    return merged
+
+
+def bench_copy(rows: int, dsn: str) -> None:
+    """COPY loader vs REST-style batched upserts on the same Postgres database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'DBDATA_bench.csv')
+        write_synthetic_export(path, rows)
+        with open(path, encoding='utf-8-sig') as f:
+            records = reference_records(f.read(), 'DBDATA_bench.csv')
+
+    conn = psycopg2.connect(dsn)
+    with conn, conn.cursor() as cur:
+        cur.execute(SUPABASE_DDL)
+    loader = PostgresCopyLoader(dsn)
+    conflict = PARTITIONED_CONFLICT if loader.partitioned else CALL_RECORDS_CONFLICT
+
+    def reset():
+        with conn, conn.cursor() as cur:
+            cur.execute("TRUNCATE call_records, call_load_tracker")
+
+    print(f"{len(records):,} unique records")
+    for label, fn in (
+        ('REST-style', lambda: _rest_style_upsert(conn, records, conflict)),
+        ('COPY', lambda: loader.load(records, 'bench:copy')[0]),
+    ):
+        reset()
+        count, secs = _time_it(fn)
+        print(f"{label:>11} insert: {count:,} rows in {secs:.2f}s ({count / secs:,.0f} rows/sec)")
+        # Second pass hits the ON CONFLICT DO UPDATE path for every row
+        count, secs = _time_it(fn)
+        print(f"{label:>11} re-run: {count:,} rows in {secs:.2f}s ({count / secs:,.0f} rows/sec)")
+    loader.close()
+    conn.close()
+
+
+# The call_records layout from before monthly partitioning, built next to a
+# partitioned schema so both run the same SUPABASE_DDL afterwards
+SINGLE_TABLE_SETUP = """
+CREATE TABLE call_records (LIKE {partitioned}.call_records INCLUDING DEFAULTS);
+CREATE SEQUENCE call_records_id_seq OWNED BY call_records.id;
+ALTER TABLE call_records
+    ALTER COLUMN id SET DEFAULT nextval('call_records_id_seq'),
+    ADD CONSTRAINT call_records_pkey PRIMARY KEY (id),
+    ADD CONSTRAINT unique_call UNIQUE (call_time, call_id, from_field, to_field);
+"""
+
+RANGE_QUERIES = (
+    ('calls, 1 day', 1,
+     "SELECT count(*), sum(talking_seconds) FROM call_records WHERE call_date BETWEEN %s AND %s"),
+    ('calls, 1 week', 7,
+     "SELECT count(*), sum(talking_seconds) FROM call_records WHERE call_date BETWEEN %s AND %s"),
+    ('calls, 1 month', 30,
+     "SELECT count(*), sum(talking_seconds) FROM call_records WHERE call_date BETWEEN %s AND %s"),
+    ('calls, 1 quarter', 91,
+     "SELECT count(*), sum(talking_seconds) FROM call_records WHERE call_date BETWEEN %s AND %s"),
+    ('outbound view, 1 week', 7,
+     "SELECT count(*) FROM v_outbound_by_salesperson WHERE call_date BETWEEN %s AND %s"),
+)
+
+
+def _schema_ddl(schema: str) -> str:
+    """SUPABASE_DDL for a scratch schema: its SECURITY DEFINER functions pin search_path to public."""
+    return SUPABASE_DDL.replace('SET search_path = public,', f'SET search_path = {schema},')
+
+
+def _schema_dsn(dsn: str, schema: str) -> str:
+    return psycopg2.extensions.make_dsn(dsn, options=f"-c search_path={schema}")
+
+
+def bench_partition(rows: int, dsn: str, repeats: int) -> None:
+    """
+    Single-table vs month-partitioned call_records on the same data: COPY and
+    REST-style insert throughput, date-range query latency, and the time the
+    migration script takes to convert the loaded single table.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'DBDATA_bench.csv')
+        # About a year of calls, so ranges can be pruned to a few partitions
+        write_synthetic_export(path, rows, seconds_apart=max(1, 365 * 86400 // rows))
+        with open(path, encoding='utf-8-sig') as f:
+            records = reference_records(f.read(), 'DBDATA_bench.csv')
+    last_day = max(date.fromisoformat(r['call_date']) for r in records)
+    recent = [r for r in records if date.fromisoformat(r['call_date']) > last_day - timedelta(days=5)]
+
+    layouts = (('single', 'bench_single'), ('partitioned', 'bench_partitioned'))
+    admin = psycopg2.connect(dsn)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        for _, schema in layouts:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path = bench_partitioned; {_schema_ddl('bench_partitioned')}")
+        cur.execute(f"SET search_path = bench_single; "
+                    f"{SINGLE_TABLE_SETUP.format(partitioned='bench_partitioned')}{_schema_ddl('bench_single')}")
+        cur.execute("RESET search_path")
+
+    results: Dict[str, Dict[str, str]] = {}
+    print(f"{len(records):,} unique records, {records[0]['call_date']} to {last_day}")
+    for label, schema in layouts:
+        column = results[label] = {}
+        loader = PostgresCopyLoader(_schema_dsn(dsn, schema))
+        conn = loader.conn
+        conflict = PARTITIONED_CONFLICT if loader.partitioned else CALL_RECORDS_CONFLICT
+
+        count, secs = _time_it(lambda: loader.load(records, 'bench:partition')[0])
+        column['COPY insert, empty table'] = f"{count / secs:,.0f} rows/s"
+        count, secs = _time_it(lambda: _rest_style_upsert(conn, recent, conflict))
+        column['REST upsert, last 5 days'] = f"{count / secs:,.0f} rows/s"
+        with conn, conn.cursor() as cur:
+            cur.execute("TRUNCATE call_records")
+        count, secs = _time_it(lambda: _rest_style_upsert(conn, records, conflict))
+        column['REST insert, empty table'] = f"{count / secs:,.0f} rows/s"
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE call_records")
+            for name, days, sql in RANGE_QUERIES:
+                end = last_day - timedelta(days=30)
+                params = (end - timedelta(days=days - 1), end)
+                timings = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    cur.execute(sql, params)
+                    cur.fetchall()
+                    timings.append(time.perf_counter() - started)
+                column[name] = f"{statistics.median(timings) * 1000:.2f} ms"
+        loader.close()
+
+    with admin.cursor() as cur:
+        cur.execute("SET search_path = bench_single")
+        _, secs = _time_it(lambda: cur.execute(PARTITION_MIGRATION_START + _schema_ddl('bench_single')
+                                                + PARTITION_MIGRATION_FINISH))
+        cur.execute("RESET search_path")
+    admin.close()
+
+    print(f"{'':<26} {'single table':>16} {'partitioned':>16}")
+    for metric in results['single']:
+        print(f"{metric:<26} {results['single'][metric]:>16} {results['partitioned'][metric]:>16}")
+    print(f"Migrating the single table ({len(records):,} rows) to partitions: {secs:.2f}s")
+
+
+def build_report_mailbox(reports: int, noise: int = 0, rows_per_report: int = 0,
+                         start: date = date(2025, 9, 12), image_bytes: int = 0) -> List[bytes]:
+    """
+    Raw RFC 822 messages for a mailbox of daily 3CX report emails (alternating
+    the two subjects the fetcher searches for), interleaved with `noise`
+    unrelated messages. rows_per_report > 0 attaches a DBDATA CSV export;
+    image_bytes > 0 adds an HTML body with an inline image of that size, like
+    the branded report emails.
+    """
+    rnd = random.Random(7)
+    kinds = ['report'] * reports + ['noise'] * noise
+    rnd.shuffle(kinds)
+    messages = []
+    report_no = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, kind in enumerate(kinds):
+            msg = EmailMessage()
+            msg['From'] = 'reports@3cx.example.com' if kind == 'report' else 'someone@example.com'
+            msg['To'] = 'calls@example.com'
+            if kind == 'report':
+                sent = datetime(start.year, start.month, start.day, 6, 0) + timedelta(days=report_no)
+                msg['Subject'] = ('Your 3CX Report DB_DATA', 'Your 3CX Scheduled Reports')[report_no % 2]
+                report_no += 1
+            else:
+                sent = datetime(start.year, start.month, start.day, 9, 0) + timedelta(hours=rnd.randint(0, 24 * reports))
+                msg['Subject'] = f"Re: order {rnd.randint(1000, 9999)}"
+            msg['Date'] = email.utils.format_datetime(phone_email.TZ.localize(sent))
+            msg['Message-ID'] = f"<bench-{i}@example.com>"
+            msg.set_content("Please find the attached report." if kind == 'report' else "Noise message.")
+            if kind == 'report' and image_bytes:
+                msg.add_alternative('<html><body><img src="cid:logo@bench"><p>Your report</p></body></html>',
+                                    subtype='html')
+                msg.get_payload()[1].add_related(rnd.randbytes(image_bytes), 'image', 'png', cid='<logo@bench>')
+            if kind == 'report' and rows_per_report:
+                path = os.path.join(tmp, 'export.csv')
+                write_synthetic_export(path, rows_per_report, seed=report_no)
+                with open(path, 'rb') as f:
+                    msg.add_attachment(f.read(), maintype='text', subtype='csv',
+                                       filename=f"DBDATA_{sent:%Y%m%d}.csv")
+            messages.append(msg.as_bytes(policy=email.policy.SMTP))
+    return messages
+
+
+class ImapStandIn:
+    """
+    Local IMAP4rev1 stand-in serving a mailbox over plain TCP.
+    Implements the commands the fetcher uses (CAPABILITY, LOGIN, SELECT,
+    STATUS, SEARCH, FETCH, UID SEARCH/FETCH, NOOP, LOGOUT) and sleeps
+    `latency` seconds before completing each command to mimic a remote
+    server's round-trip, plus transfer time at `bandwidth` bytes/sec per
+    connection when set. deliver() appends new mail with the next UID.
+    """
+
+    ITEM_RE = re.compile(r'BODY(?:\.PEEK)?\[[^\]]*\](?:<\d+\.\d+>)?|[A-Z0-9.]+', re.I)
+    SINCE_RE = re.compile(r'SINCE (\d{1,2}-[A-Za-z]{3}-\d{4})', re.I)
+    SUBJECT_RE = re.compile(r'SUBJECT "([^"]*)"', re.I)
+    UID_CRITERION_RE = re.compile(r'\bUID ([\d:*,]+)', re.I)
+
+    def __init__(self, messages: List[bytes], latency: float = 0.02, uidvalidity: int = 1,
+                 bandwidth: float = 0.0):
+        self.messages = list(messages)
+        self.parsed = [email.message_from_bytes(m) for m in self.messages]
+        self.uids = list(range(1, len(self.messages) + 1))
+        self.uidvalidity = uidvalidity
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.commands = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.wfile.write(b'* OK IMAP4rev1 stand-in ready\r\n')
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    tag, command, args = (line.decode().rstrip('\r\n').split(' ', 2) + ['', ''])[:3]
+                    time.sleep(stand_in.latency)
+                    # One write per command, so small replies don't stall on Nagle / delayed ACK
+                    out = []
+                    status = stand_in.dispatch(out.append, command.upper(), args)
+                    out.append(f"{tag} {status}\r\n".encode())
+                    data = b''.join(out)
+                    if stand_in.bandwidth:
+                        time.sleep(len(data) / stand_in.bandwidth)
+                    self.wfile.write(data)
+                    with stand_in.lock:
+                        stand_in.commands += 1
+                        stand_in.bytes_sent += len(data)
+                    if command.upper() == 'LOGOUT':
+                        return
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def connect(self) -> imaplib.IMAP4:
+        conn = imaplib.IMAP4('127.0.0.1', self.port)
+        conn.login('bench', 'bench')
+        return conn
+
+    def reset(self):
+        with self.lock:
+            self.commands = 0
+            self.bytes_sent = 0
+
+    def deliver(self, raw: bytes):
+        with self.lock:
+            self.messages.append(raw)
+            self.parsed.append(email.message_from_bytes(raw))
+            self.uids.append(self.uidnext)
+
+    @property
+    def uidnext(self) -> int:
+        return (self.uids[-1] if self.uids else 0) + 1
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def dispatch(self, send: Callable[[bytes], None], command: str, args: str) -> str:
+        if command == 'CAPABILITY':
+            send(b'* CAPABILITY IMAP4rev1\r\n')
+        elif command == 'SELECT':
+            send(f"* {len(self.messages)} EXISTS\r\n* 0 RECENT\r\n"
+                 f"* OK [UIDVALIDITY {self.uidvalidity}] UIDs valid\r\n"
+                 f"* OK [UIDNEXT {self.uidnext}] Predicted next UID\r\n".encode())
+            return 'OK [READ-WRITE] SELECT completed'
+        elif command == 'STATUS':
+            send(f"* STATUS INBOX (UIDVALIDITY {self.uidvalidity} UIDNEXT {self.uidnext})\r\n".encode())
+        elif command == 'SEARCH':
+            send(('* SEARCH ' + ' '.join(str(n) for n in self.search(args))).rstrip().encode() + b'\r\n')
+        elif command == 'FETCH':
+            message_set, items = args.split(' ', 1)
+            for seq in self.expand(message_set):
+                send(self.fetch_response(seq, items))
+        elif command == 'UID':
+            sub, rest = (args.split(' ', 1) + [''])[:2]
+            sub = sub.upper()
+            if sub == 'SEARCH':
+                uids = [self.uids[seq - 1] for seq in self.search(rest)]
+                send(('* SEARCH ' + ' '.join(str(u) for u in uids)).rstrip().encode() + b'\r\n')
+            elif sub == 'FETCH':
+                uid_set, items = rest.split(' ', 1)
+                for seq in self.expand_uids(uid_set):
+                    send(self.fetch_response(seq, items, with_uid=True))
+            else:
+                return f"BAD unsupported command UID {sub}"
+            return f"OK UID {sub} completed"
+        elif command not in ('LOGIN', 'NOOP', 'LOGOUT'):
+            return f"BAD unsupported command {command}"
+        return f"OK {command} completed"
+
+    def search(self, criteria: str) -> List[int]:
+        subject = self.SUBJECT_RE.search(criteria)
+        since = self.SINCE_RE.search(criteria)
+        since_date = datetime.strptime(since.group(1), '%d-%b-%Y').date() if since else None
+        uid_set = self.UID_CRITERION_RE.search(criteria)
+        allowed = {self.uids[seq - 1] for seq in self.expand_uids(uid_set.group(1))} if uid_set else None
+        matches = []
+        for seq, msg in enumerate(self.parsed, 1):
+            if allowed is not None and self.uids[seq - 1] not in allowed:
+                continue
+            if subject and subject.group(1).lower() not in (msg['Subject'] or '').lower():
+                continue
+            # A real server filters SINCE on INTERNALDATE, so an unparseable Date: header still matches
+            try:
+                sent = email.utils.parsedate_to_datetime(msg['Date']).date()
+            except (TypeError, ValueError):
+                sent = None
+            if since_date and sent and sent < since_date:
+                continue
+            matches.append(seq)
+        return matches
+
+    def expand(self, message_set: str) -> List[int]:
+        seqs = []
+        for part in message_set.split(','):
+            first, _, last = part.partition(':')
+            last = last or first
+            first = len(self.messages) if first == '*' else int(first)
+            last = len(self.messages) if last == '*' else int(last)
+            seqs.extend(range(min(first, last), min(max(first, last), len(self.messages)) + 1))
+        return seqs
+
+    def expand_uids(self, uid_set: str) -> List[int]:
+        """Sequence numbers of the messages in a UID set ("*" is the highest UID, so n:* never comes back empty)."""
+        top = self.uids[-1] if self.uids else 0
+        seqs = []
+        for part in uid_set.split(','):
+            first, _, last = part.partition(':')
+            last = last or first
+            first = top if first == '*' else int(first)
+            last = top if last == '*' else int(last)
+            low, high = min(first, last), max(first, last)
+            seqs.extend(seq for seq, uid in enumerate(self.uids, 1) if low <= uid <= high)
+        return seqs
+
+    def fetch_item(self, seq: int, item: str) -> Tuple[str, Optional[bytes]]:
+        """(response name, literal bytes or None for atoms already in the name)."""
+        raw = self.messages[seq - 1]
+        name = item.upper().replace('BODY.PEEK[', 'BODY[')
+        if name == 'RFC822':
+            return name, raw
+        if name.startswith('BODY[HEADER.FIELDS'):
+            fields = re.search(r'\(([^)]*)\)', item).group(1).split()
+            msg = self.parsed[seq - 1]
+            header = ''.join(f"{f.title()}: {msg[f]}\r\n" for f in fields if msg[f] is not None)
+            return name, (header + '\r\n').encode()
+        if name == 'UID':
+            return f"UID {self.uids[seq - 1]}", None
+        if name == 'RFC822.SIZE':
+            return f"RFC822.SIZE {len(raw)}", None
+        if name == 'BODYSTRUCTURE':
+            return f"BODYSTRUCTURE {self.bodystructure(self.parsed[seq - 1])}", None
+        section = re.match(r'BODY\[([\d.]+)\](?:<(\d+)\.(\d+)>)?$', name)
+        if section:
+            body = self.section_bytes(self.parsed[seq - 1], section.group(1))
+            if section.group(2) is None:
+                return name, body
+            offset, length = int(section.group(2)), int(section.group(3))
+            return f"BODY[{section.group(1)}]<{offset}>", body[offset:offset + length]
+        raise ValueError(f"unsupported FETCH item {item}")
+
+    @staticmethod
+    def section_bytes(msg, section: str) -> bytes:
+        """Transfer-encoded body of a numbered MIME part, as IMAP BODY[section] returns it."""
+        part = msg
+        for number in section.split('.'):
+            if part.is_multipart():
+                part = part.get_payload()[int(number) - 1]
+        return part.get_payload().encode('ascii', errors='surrogateescape')
+
+    @classmethod
+    def bodystructure(cls, part) -> str:
+        def quoted(value: Optional[str]) -> str:
+            return 'NIL' if value is None else '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+        if part.is_multipart():
+            children = ''.join(cls.bodystructure(child) for child in part.get_payload())
+            return f"({children} {quoted(part.get_content_subtype())})"
+        params = part.get_params()[1:] or []
+        param_list = '(' + ' '.join(f"{quoted(k)} {quoted(v)}" for k, v in params) + ')' if params else 'NIL'
+        encoding = part.get('Content-Transfer-Encoding', '7bit').lower()
+        body = cls.section_bytes(part, '1')
+        fields = [quoted(part.get_content_maintype()), quoted(part.get_content_subtype()), param_list,
+                  quoted(part.get('Content-ID')), 'NIL', quoted(encoding), str(len(body))]
+        if part.get_content_maintype() == 'text':
+            fields.append(str(body.count(b'\n')))
+        disposition = part.get_content_disposition()
+        filename = part.get_filename()
+        fields.append('NIL')  # MD5
+        if disposition:
+            disp_params = f"({quoted('filename')} {quoted(filename)})" if filename else 'NIL'
+            fields.append(f"({quoted(disposition)} {disp_params})")
+        else:
+            fields.append('NIL')
+        return '(' + ' '.join(fields) + ' NIL NIL)'
+
+
+    def fetch_response(self, seq: int, items: str, with_uid: bool = False) -> bytes:
+        parts = [f"* {seq} FETCH (".encode()]
+        names = self.ITEM_RE.findall(items.strip('()'))
+        if with_uid and 'UID' not in (n.upper() for n in names):
+            names.insert(0, 'UID')  # UID FETCH responses always carry the UID
+        for i, item in enumerate(names):
+            name, literal = self.fetch_item(seq, item)
+            prefix = b' ' if i else b''
+            if literal is None:
+                parts.append(prefix + name.encode())
+            else:
+                parts.append(prefix + f"{name} {{{len(literal)}}}\r\n".encode() + literal)
+        parts.append(b')\r\n')
+        return b''.join(parts)
+
+
+def bench_imap_scan(messages: int, latency: float, noise: int, batch_sizes: List[int]) -> None:
+    """find_3cx_reports header scan: one FETCH per message vs batched message sets."""
+    stand_in = ImapStandIn(build_report_mailbox(messages, noise=noise), latency=latency)
+    _point_at_stand_in('http://127.0.0.1:9')
+    print(f"{messages:,} report emails + {noise:,} other messages, "
+          f"{latency * 1000:.0f} ms injected latency per command")
+    try:
+        reference = None
+        baseline = None
+        for batch in batch_sizes:
+            fetcher = EmailReportFetcher(header_batch=batch)
+            conn = stand_in.connect()
+            stand_in.reset()
+            started = time.perf_counter()
+            results = fetcher.find_3cx_reports(conn, date(2025, 9, 1))
+            secs = time.perf_counter() - started
+            conn.logout()
+            reference = reference or results
+            baseline = baseline or secs
+            label = 'per-message' if batch <= 1 else f"batch {batch}"
+            print(f"{label:>12}: {len(results):,} emails, {stand_in.commands} commands in {secs:.2f}s "
+                  f"({baseline / secs:.1f}x){'' if results == reference else '  RESULTS DIFFER'}")
+    finally:
+        stand_in.close()
+
+
+def bench_imap_sync(messages: int, noise: int, latency: float) -> None:
+    """Daily run cost: full SEARCH + header scan vs UID incremental sync after one new report."""
+    mailbox = build_report_mailbox(messages + 1, noise=noise)
+    # Hold back the newest report so it can arrive as "today's" email
+    # (reports are dated in mailbox order, so that is the last one)
+    newest = max(i for i, raw in enumerate(mailbox) if b'Subject: Your 3CX' in raw)
+    stand_in = ImapStandIn(mailbox[:newest] + mailbox[newest + 1:], latency=latency)
+    _point_at_stand_in('http://127.0.0.1:9')
+    print(f"{messages:,} report emails + {noise:,} other messages, {latency * 1000:.0f} ms per command")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = os.path.join(tmp, 'sync.json')
+            conn = stand_in.connect()
+            EmailReportFetcher(sync_state_path=state_path).find_3cx_reports(conn, date(2025, 9, 1))
+            conn.logout()
+            stand_in.deliver(mailbox[newest])
+            for label, path in (('full scan', None), ('UID sync', state_path)):
+                conn = stand_in.connect()
+                stand_in.reset()
+                started = time.perf_counter()
+                results = EmailReportFetcher(sync_state_path=path).find_3cx_reports(conn, date(2025, 9, 1))
+                secs = time.perf_counter() - started
+                conn.logout()
+                print(f"{label:>10}: {len(results):,} reports, {stand_in.commands} commands, "
+                      f"{stand_in.bytes_sent / 1024:,.1f} KB from server in {secs:.3f}s")
+    finally:
+        stand_in.close()
+
+
+def check_imap_sync(messages: int) -> bool:
+    """UID sync must move its high-water mark past a report email whose Date header does not parse."""
+    mailbox = build_report_mailbox(messages + 1)
+    undated = re.sub(rb'(?m)^Date: .*$', b'Date: sometime last week', mailbox.pop(), count=1)
+    stand_in = ImapStandIn(mailbox, latency=0)
+    _point_at_stand_in('http://127.0.0.1:9')
+    ok = True
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = os.path.join(tmp, 'sync.json')
+            for label, arrival in (('initial scan', None), ('undated report', undated),
+                                   ('next report', mailbox[0]), ('no new mail', None)):
+                if arrival:
+                    stand_in.deliver(arrival)
+                conn = stand_in.connect()
+                results = EmailReportFetcher(sync_state_path=state_path).find_3cx_reports(conn, date(2025, 9, 1))
+                conn.logout()
+                with open(state_path) as f:
+                    last_uid = json.load(f)['last_uid']
+                match = last_uid == stand_in.uidnext - 1
+                ok = ok and match
+                print(f"{'OK  ' if match else 'FAIL'} {label}: {len(results)} reports, "
+                      f"high-water UID {last_uid} of {stand_in.uidnext - 1}")
+    finally:
+        stand_in.close()
+    print("UID sync: " + ("high-water mark passes undated reports" if ok else "high-water mark STUCK"))
+    return ok
+
+
+def bench_imap_backfill(reports: int, rows: int, latency: float, bandwidth_mb: float,
+                        upload_latency: float, connection_counts: List[int]) -> None:
+    """process_all_emails over one IMAP connection vs an IMAPFetchPool, uploads to the PostgREST stand-in."""
+    print(f"Building {reports} report emails with {rows:,}-row attachments...")
+    imap = ImapStandIn(build_report_mailbox(reports, rows_per_report=rows), latency=latency,
+                       bandwidth=bandwidth_mb * 2 ** 20)
+    rest = PostgrestStandIn(upload_latency)
+    _point_at_stand_in(rest.url)
+    print(f"IMAP: {latency * 1000:.0f} ms per command, {bandwidth_mb:g} MB/s per connection; "
+          f"REST: {upload_latency * 1000:.0f} ms per request")
+    try:
+        baseline = None
+        for connections in connection_counts:
+            rest.reset()
+            processor = ThreeCXProcessor(imap_connections=connections, upload_workers=4, diff_uploads=False,
+                                         coverage_path=os.path.join(tempfile.gettempdir(), 'bench_coverage.json'))
+            conn = imap.connect()
+            emails = processor.email_fetcher.find_3cx_reports(conn, date(2025, 9, 1))
+            count, secs = _time_it(lambda: processor.process_all_emails(conn, emails))
+            conn.logout()
+            baseline = baseline or secs
+            print(f"{connections:>2} connection(s): {count:,} records from {len(emails)} emails, "
+                  f"{rest.rows:,} rows uploaded in {secs:.2f}s ({baseline / secs:.2f}x)")
+    finally:
+        imap.close()
+        rest.close()
+
+
+def _legacy_select(all_reports: List[Tuple[bytes, date]], missing_dates: List[date]) -> List[Tuple[bytes, date]]:
+    """The original planner: newest first, each email assumed to hold the 30 days before it."""
+    missing_set = set(missing_dates)
+    selected = []
+    covered = set()
+    for email_id, email_date in sorted(all_reports, key=lambda x: x[1], reverse=True):
+        would_cover = {d for d in missing_set
+                       if email_date - timedelta(days=30) <= d <= email_date and d not in covered}
+        if would_cover:
+            selected.append((email_id, email_date))
+            covered.update(would_cover)
+            if covered >= missing_set:
+                break
+    return sorted(selected, key=lambda x: x[1])
+
+
+def bench_plan(days: int, missing: int, rows_per_day: int, seed: int = 7) -> None:
+    """
+    Gap-refill planning over a mailbox of daily, weekly and monthly scheduled
+    reports: the 30-day-window heuristic vs the interval cover on learned
+    call_date ranges. Rows parsed stands in for bytes downloaded.
+    """
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    reports = []
+    windows = {}
+    for n in range(days):
+        email_date = start + timedelta(days=n + 1)
+        for kind, span in (('daily', 1), ('weekly', 7), ('monthly', 30)):
+            if kind == 'weekly' and email_date.weekday() != 0 or kind == 'monthly' and email_date.day != 1:
+                continue
+            email_id = str(len(reports) + 1).encode()
+            reports.append((email_id, email_date))
+            windows[email_id] = (email_date - timedelta(days=span), email_date - timedelta(days=1))
+    weekdays = [start + timedelta(days=n) for n in range(days) if (start + timedelta(days=n)).weekday() < 5]
+    missing_dates = sorted(rng.sample(weekdays, min(missing, len(weekdays))))
+    print(f"{len(reports):,} report emails over {days} days, {len(missing_dates)} missing weekdays")
+
+    def report(label: str, plan: Callable[[], List[Tuple[bytes, date]]]) -> None:
+        started = time.perf_counter()
+        selected = plan()
+        secs = time.perf_counter() - started
+        filled = {d for email_id, _ in selected for d in missing_dates
+                  if windows[email_id][0] <= d <= windows[email_id][1]}
+        parsed = sum(((windows[e][1] - windows[e][0]).days + 1) * rows_per_day for e, _ in selected)
+        print(f"{label:>17}: {len(selected):>3} emails, {parsed:>9,} rows parsed, "
+              f"{len(filled)}/{len(missing_dates)} gaps filled, planned in {secs * 1000:.1f} ms")
+
+    _point_at_stand_in('http://127.0.0.1:9')
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = ThreeCXProcessor(coverage_path=os.path.join(tmp, 'coverage.json'))
+        report('30-day heuristic', lambda: _legacy_select(reports, missing_dates))
+        report('cover, unlearned', lambda: processor._select_emails_for_dates(reports, missing_dates))
+        # What process_all_emails records once each report has been parsed
+        for email_id, _ in reports:
+            first, last = windows[email_id]
+            message_id = f"<{email_id.decode()}@bench>"
+            processor.email_fetcher.message_ids[email_id] = message_id
+            processor.report_coverage.reports[message_id] = {
+                'first': first.isoformat(), 'last': last.isoformat(),
+                'rows': ((last - first).days + 1) * rows_per_day}
+        report('cover, learned', lambda: processor._select_emails_for_dates(reports, missing_dates))
+
+
+def _peak_rss_kb() -> int:
+    """
+    Peak resident set of this process in KB. VmHWM where available: ru_maxrss
+    survives exec, so a spawned child would report the parent's peak.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _fetch_reports_child(port: int, partial: bool, reports: int, result) -> None:
+    """Runs in a fresh interpreter so ru_maxrss reflects only this fetch mode."""
+    logging.getLogger('phone_email').setLevel(logging.ERROR)
+    processor = ThreeCXProcessor(partial_fetch=partial)
+    conn = imaplib.IMAP4('127.0.0.1', port)
+    conn.login('bench', 'bench')
+    conn.select('INBOX')
+    baseline_kb = _peak_rss_kb()
+    records = 0
+    started = time.perf_counter()
+    for seq in range(1, reports + 1):
+        email_id = str(seq).encode()
+        if partial:
+            parsed = processor._parse_attachment_stream(conn, email_id, f"email:{seq}")
+        else:
+            csv_content = processor.email_fetcher.extract_csv_from_email(conn, email_id)
+            parsed = processor.parse_csv_by_date(StringIO(csv_content, newline=None), f"email:{seq}")
+        records += sum(len(day) for day in (parsed or {}).values())
+        del parsed
+    secs = time.perf_counter() - started
+    conn.logout()
+    result.put((records, secs, baseline_kb, _peak_rss_kb()))
+
+
+def bench_imap_fetch(rows: int, reports: int, image_bytes: int, latency: float) -> None:
+    """Full RFC822 download vs BODYSTRUCTURE + partial BODY[n] streaming, per report email."""
+    print(f"Building {reports} report emails with {rows:,}-row attachments...")
+    stand_in = ImapStandIn(build_report_mailbox(reports, rows_per_report=rows, image_bytes=image_bytes),
+                           latency=latency)
+    _point_at_stand_in('http://127.0.0.1:9')
+    ctx = multiprocessing.get_context('spawn')
+    try:
+        print(f"Mailbox: {sum(len(m) for m in stand_in.messages) / 2 ** 20:,.1f} MB, "
+              f"{latency * 1000:.0f} ms injected latency per command")
+        for label, partial in (('RFC822', False), ('partial', True)):
+            stand_in.reset()
+            result = ctx.Queue()
+            child = ctx.Process(target=_fetch_reports_child, args=(stand_in.port, partial, reports, result))
+            child.start()
+            records, secs, baseline_kb, peak_kb = result.get()
+            child.join()
+            print(f"{label:>8}: {records:,} records in {secs:.2f}s, {stand_in.commands} commands, "
+                  f"{stand_in.bytes_sent / 2 ** 20:,.1f} MB on the wire, "
+                  f"peak RSS +{(peak_kb - baseline_kb) / 1024:,.1f} MB over baseline")
+    finally:
+        stand_in.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for phone_email.py")
+    sub = parser.add_subparsers(dest='bench', required=True)
+
+    p = sub.add_parser('parse', help='Row parser throughput')
+    p.add_argument('--rows', type=int, default=1_000_000)
+
+    p = sub.add_parser('columnar', help='Columnar engine throughput')
+    p.add_argument('--rows', type=int, default=500_000)
+
+    p = sub.add_parser('parity', help='Check columnar output against parse_row')
+    p.add_argument('--rows', type=int, default=20_000)
+
+    p = sub.add_parser('upload', help='Serial vs concurrent upserts against a PostgREST stand-in')
+    p.add_argument('--rows', type=int, default=50_000)
+    p.add_argument('--latency', type=float, default=0.05, help='Seconds per request')
+    p.add_argument('--workers', default='1,4,8', help='Comma-separated upload worker counts')
+    p.add_argument('--adaptive', action='store_true', help='Use adaptive batch sizing')
+    p.add_argument('--row-cost', type=float, default=0.0, help='Extra seconds per row written')
+    p.add_argument('--max-bytes', type=int, default=0, help='Stand-in returns 413 above this body size')
+    p.add_argument('--target-latency', type=float, default=0.5, help='Adaptive target seconds per request')
+
+    p = sub.add_parser('copy', help='Direct-Postgres COPY loader vs REST-style upserts')
+    p.add_argument('--rows', type=int, default=200_000)
+    p.add_argument('--dsn', default=os.getenv('BENCH_PG_DSN'),
+                   help='Scratch Postgres database (default: $BENCH_PG_DSN)')
+
+    p = sub.add_parser('partition', help='Single-table vs month-partitioned call_records: inserts and range queries')
+    p.add_argument('--rows', type=int, default=300_000, help='Calls, spread over about a year')
+    p.add_argument('--repeats', type=int, default=20, help='Runs per query (median reported)')
+    p.add_argument('--dsn', default=os.getenv('BENCH_PG_DSN'),
+                   help='Scratch Postgres database (default: $BENCH_PG_DSN)')
+
+    p = sub.add_parser('imap-scan', help='Per-message vs batched IMAP header scan')
+    p.add_argument('--messages', type=int, default=365, help='Report emails in the mailbox')
+    p.add_argument('--noise', type=int, default=200, help='Unrelated messages in the mailbox')
+    p.add_argument('--latency', type=float, default=0.03, help='Seconds per IMAP command')
+    p.add_argument('--batches', default='1,100,500', help='Comma-separated header batch sizes')
+
+    p = sub.add_parser('imap-fetch', help='RFC822 vs attachment-only fetch: bytes on wire and peak RSS')
+    p.add_argument('--rows', type=int, default=100_000, help='CSV rows per report attachment')
+    p.add_argument('--reports', type=int, default=3)
+    p.add_argument('--image-bytes', type=int, default=300_000, help='Inline image size in each report email')
+    p.add_argument('--latency', type=float, default=0.01, help='Seconds per IMAP command')
+
+    p = sub.add_parser('imap-sync', help='Full mailbox rescan vs UID incremental sync')
+    p.add_argument('--messages', type=int, default=365, help='Report emails already in the mailbox')
+    p.add_argument('--noise', type=int, default=2000, help='Unrelated messages in the mailbox')
+    p.add_argument('--latency', type=float, default=0.03, help='Seconds per IMAP command')
+
+    p = sub.add_parser('plan', help='30-day heuristic vs interval cover for choosing gap-refill emails')
+    p.add_argument('--days', type=int, default=365, help='Days of scheduled report emails')
+    p.add_argument('--missing', type=int, default=40, help='Missing weekdays to refill')
+    p.add_argument('--rows-per-day', type=int, default=400)
+
+    p = sub.add_parser('imap-sync-check', help='Check the UID high-water mark passes undated report emails')
+    p.add_argument('--messages', type=int, default=30, help='Report emails already in the mailbox')
+
+    p = sub.add_parser('imap-backfill', help='Serial vs pooled IMAP attachment downloads in process_all_emails')
+    p.add_argument('--reports', type=int, default=8)
+    p.add_argument('--rows', type=int, default=20_000, help='CSV rows per report attachment')
+    p.add_argument('--latency', type=float, default=0.05, help='Seconds per IMAP command')
+    p.add_argument('--bandwidth', type=float, default=4.0, help='MB/s per IMAP connection')
+    p.add_argument('--upload-latency', type=float, default=0.05, help='Seconds per REST request')
+    p.add_argument('--connections', default='1,2,4', help='Comma-separated IMAP connection counts')
+
+    args = parser.parse_args()
+    # parse_row warns on every malformed row; keep benchmark output readable
+    logging.getLogger('phone_email').setLevel(logging.ERROR)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    if args.bench == 'parse':
+        bench_parse(args.rows)
+    elif args.bench == 'columnar':
+        bench_columnar(args.rows)
+    elif args.bench == 'parity':
+        raise SystemExit(0 if check_parity(args.rows) else 1)
+    elif args.bench == 'upload':
+        bench_upload(args.rows, args.latency, [int(w) for w in args.workers.split(',')],
+                     adaptive=args.adaptive, row_cost=args.row_cost, max_bytes=args.max_bytes,
+                     target_latency=args.target_latency)
+    elif args.bench == 'copy':
+        if not args.dsn:
+            parser.error("copy needs --dsn or $BENCH_PG_DSN")
+        bench_copy(args.rows, args.dsn)
+    elif args.bench == 'partition':
+        if not args.dsn:
+            parser.error("partition needs --dsn or $BENCH_PG_DSN")
+        bench_partition(args.rows, args.dsn, args.repeats)
+    elif args.bench == 'imap-fetch':
+        bench_imap_fetch(args.rows, args.reports, args.image_bytes, args.latency)
+    elif args.bench == 'imap-backfill':
+        bench_imap_backfill(args.reports, args.rows, args.latency, args.bandwidth, args.upload_latency,
+                            [int(c) for c in args.connections.split(',')])
+    elif args.bench == 'plan':
+        bench_plan(args.days, args.missing, args.rows_per_day)
+    elif args.bench == 'imap-sync':
+        bench_imap_sync(args.messages, args.noise, args.latency)
+    elif args.bench == 'imap-sync-check':
+        raise SystemExit(0 if check_imap_sync(args.messages) else 1)
+    elif args.bench == 'imap-scan':
+        bench_imap_scan(args.messages, args.latency, args.noise, [int(b) for b in args.batches.split(',')])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""Shared fixtures: phone_email.py and the bench helpers live at the repo root."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# ThreeCXProcessor and EmailReportFetcher read these at construction; nothing is contacted
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_SERVICE_ROLE_KEY', 'test')
+os.environ.setdefault('EMAIL_ADDRESS', 'calls@example.com')
+os.environ.setdefault('EMAIL_PASSWORD', 'test')
+
+
+@pytest.fixture
+def export_text(tmp_path):
+    """export_text(rows, seed=..., messy=..., seconds_apart=...) -> a synthetic 3CX export as text."""
+    from phone_email_bench import write_synthetic_export
+
+    def make(rows: int, **kwargs) -> str:
+        path = tmp_path / f"DBDATA_{kwargs.get('seed', 42)}.csv"
+        write_synthetic_export(str(path), rows, **kwargs)
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return f.read()
+    return make
@@ -0,0 +1,60 @@
+"""AttachmentCache: hits must not rewrite index.json; stores, evictions and flush() do."""
+
+import json
+
+import pytest
+
+import phone_email
+from phone_email import AttachmentCache
+
+CSV = "Call Time,Call ID\n2025-09-01T08:00:00Z,1\n"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AttachmentCache(str(tmp_path), max_mb=1, max_days=30)
+
+
+@pytest.fixture
+def saves(cache, monkeypatch):
+    count = []
+    save = cache._save_index
+    monkeypatch.setattr(cache, '_save_index', lambda: count.append(1) or save())
+    return count
+
+
+def read_index(tmp_path):
+    return json.loads((tmp_path / AttachmentCache.INDEX_FILE).read_text())
+
+
+def test_hits_are_not_written_until_flush(tmp_path, cache, saves):
+    cache.put('<a@example.com>', CSV)
+    assert len(saves) == 1
+    stored_at = read_index(tmp_path)['<a@example.com>']['last_used']
+    for _ in range(20):
+        with cache.open('<a@example.com>') as f:
+            assert f.read() == CSV
+    assert len(saves) == 1
+    assert cache.hits == 20
+    cache.flush()
+    assert len(saves) == 2
+    assert read_index(tmp_path)['<a@example.com>']['last_used'] > stored_at
+    cache.flush()
+    assert len(saves) == 2
+
+
+def test_misses_and_clean_evictions_do_not_write(cache, saves):
+    assert cache.open('<missing@example.com>') is None
+    cache.evict()
+    cache.flush()
+    assert saves == []
+
+
+def test_expired_entries_are_written_out(tmp_path, cache, saves, monkeypatch):
+    cache.put('<old@example.com>', CSV)
+    now = phone_email.time.time()
+    monkeypatch.setattr(phone_email.time, 'time', lambda: now + 31 * 86400)
+    cache.evict()
+    assert read_index(tmp_path) == {}
+    assert list(tmp_path.glob('*.csv.gz')) == []
+    assert len(saves) == 2
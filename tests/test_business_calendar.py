@@ -0,0 +1,69 @@
+"""BusinessCalendar: observed holidays, holiday file overrides, and business-day counts."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from phone_email import BusinessCalendar, DateRanges, ThreeCXProcessor
+
+
+def calendar(*rules, holiday_file=None):
+    return BusinessCalendar(holiday_file=holiday_file, rules=list(rules))
+
+
+def test_fixed_holiday_observed_on_nearest_weekday():
+    cal = calendar('independence_day', 'christmas')
+    assert date(2026, 7, 3) in cal.holidays(2026)       # 4 July 2026 is a Saturday
+    assert date(2027, 7, 5) in cal.holidays(2027)       # 4 July 2027 is a Sunday
+    assert date(2025, 7, 4) in cal.holidays(2025)       # Friday, as is
+    assert not cal.is_business_day(date(2022, 12, 26))  # Christmas 2022 is a Sunday
+    assert cal.is_business_day(date(2022, 12, 23))
+
+
+def test_new_year_on_saturday_closes_previous_december():
+    cal = calendar('new_year')
+    assert date(2021, 12, 31) in cal.holidays(2021)
+    assert cal.holidays(2022) == set()
+
+
+def test_floating_holidays():
+    cal = calendar('thanksgiving', 'day_after_thanksgiving', 'memorial_day', 'good_friday')
+    assert cal.holidays(2025) == {date(2025, 11, 27), date(2025, 11, 28), date(2025, 5, 26), date(2025, 4, 18)}
+
+
+def test_holiday_file_closes_and_opens_days(tmp_path):
+    path = tmp_path / 'holidays.txt'
+    path.write_text("# office\n2025-09-02\n+2025-09-01  # open on Labor Day\nnot-a-date\n")
+    cal = calendar('labor_day', holiday_file=str(path))
+    assert cal.is_business_day(date(2025, 9, 1))
+    assert not cal.is_business_day(date(2025, 9, 2))
+    assert cal.closed_days(date(2025, 8, 1), date(2025, 9, 30)) == [date(2025, 9, 2)]
+
+
+def test_unknown_rule_rejected():
+    with pytest.raises(ValueError, match='easter_monday'):
+        calendar('christmas', 'easter_monday')
+
+
+def test_count_business_days_matches_walk():
+    cal = calendar('new_year', 'independence_day', 'thanksgiving', 'christmas_eve', 'christmas')
+    start = date(2021, 12, 20)
+    for length in (0, 1, 6, 7, 13, 400, 1200):
+        end = start + timedelta(days=length)
+        assert cal.count_business_days(start, end) == len(list(cal.business_days(start, end)))
+    assert cal.count_business_days(date(2025, 1, 2), date(2025, 1, 1)) == 0
+
+
+def test_confirmed_empty_skips_holidays_and_weekends(tmp_path):
+    processor = ThreeCXProcessor(loaded_index_path=str(tmp_path / 'index.json'),
+                                 coverage_path=str(tmp_path / 'coverage.json'),
+                                 calendar=calendar('independence_day'))
+    marked = []
+    processor.store.mark_date_loaded = lambda load_date, count, source: marked.append((load_date, count))
+    # Report spanning Wed 1 July to Wed 8 July 2026 with calls on the first and last day only
+    by_date = {date(2026, 7, 1): ['call'], date(2026, 7, 8): ['call']}
+    loaded = set()
+    processor._mark_confirmed_empty(by_date, loaded, DateRanges([(date(2026, 7, 7), date(2026, 7, 7))]), 'email:test')
+    # 3 July is the observed holiday, 4-5 July a weekend, 7 July already tracked
+    assert marked == [(date(2026, 7, 2), 0), (date(2026, 7, 6), 0)]
+    assert loaded == {date(2026, 7, 2), date(2026, 7, 6)}
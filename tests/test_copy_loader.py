@@ -0,0 +1,69 @@
+"""PostgresCopyLoader against a scratch Postgres schema; skipped unless $BENCH_PG_DSN is set."""
+
+import os
+from datetime import date
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+from phone_email import PostgresCopyLoader
+from phone_email_bench import _schema_ddl, _schema_dsn
+
+DSN = os.getenv('BENCH_PG_DSN')
+SCHEMA = 'test_copy_loader'
+
+pytestmark = pytest.mark.skipif(not DSN, reason='needs a scratch Postgres in $BENCH_PG_DSN')
+
+
+@pytest.fixture
+def loader():
+    admin = psycopg2.connect(DSN)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+        cur.execute(f"SET search_path = {SCHEMA}; {_schema_ddl(SCHEMA)}")
+    loader = PostgresCopyLoader(_schema_dsn(DSN, SCHEMA))
+    yield loader
+    loader.close()
+    with admin.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    admin.close()
+
+
+def record(call_time, status, call_id='1001'):
+    return {
+        'call_time': call_time, 'call_id': call_id, 'call_date': '2025-09-03',
+        'direction': 'Inbound', 'status': status, 'extension': '117', 'employee_name': 'Amy',
+        'phone_number': '2125550100', 'linked': '2125550100', 'caller_id_raw': None,
+        'ringing_seconds': 3, 'talking_seconds': 60, 'cost': 0, 'from_field': 'Caller (2125550100)',
+        'to_field': 'Amy (117)', 'call_activity_details': '', 'source_file': 'test.csv',
+    }
+
+
+def fetch(loader, sql):
+    with loader.conn, loader.conn.cursor() as cur:
+        cur.execute(sql)
+        return cur.fetchall()
+
+
+def test_first_copied_duplicate_wins(loader):
+    # The same instant written with two UTC offsets: one key once Postgres normalizes it
+    rows = [record('2025-09-03T14:00:00+00:00', 'Answered'),
+            record('2025-09-03T10:00:00-04:00', 'Unanswered')]
+    merged, counts = loader.load(rows, 'test')
+    assert merged == 1
+    assert counts == {date(2025, 9, 3): 2}
+    assert fetch(loader, "SELECT status FROM call_records") == [('Answered',)]
+
+    loader.load(rows[::-1], 'test')
+    assert fetch(loader, "SELECT status FROM call_records") == [('Unanswered',)]
+
+
+def test_failed_load_raises_and_marks_nothing(loader):
+    bad = record('2025-09-03T14:00:00+00:00', 'Answered')
+    bad['call_date'] = 'not a date'
+    with pytest.raises(psycopg2.Error):
+        loader.load([record('2025-09-03T15:00:00+00:00', 'Answered'), bad], 'test')
+    assert fetch(loader, "SELECT count(*) FROM call_records") == [(0,)]
+    assert fetch(loader, "SELECT count(*) FROM call_load_tracker") == [(0,)]
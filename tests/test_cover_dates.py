@@ -0,0 +1,75 @@
+"""cover_dates: the cheapest set of report windows covering the missing days."""
+
+import itertools
+import random
+from datetime import date, timedelta
+
+from phone_email import REPORT_WINDOW_DAYS, ThreeCXProcessor, cover_dates
+
+
+def d(n):
+    return date(2025, 1, 1) + timedelta(days=n)
+
+
+def brute_force(intervals, missing):
+    """Cheapest (cost, count) over every subset covering all coverable days."""
+    coverable = {m for m in missing if any(a <= m <= b for a, b, _, _ in intervals)}
+    best = None
+    for size in range(len(intervals) + 1):
+        for subset in itertools.combinations(intervals, size):
+            if all(any(a <= m <= b for a, b, _, _ in subset) for m in coverable):
+                cost = (sum(c for _, _, c, _ in subset), size)
+                best = cost if best is None else min(best, cost)
+    return best
+
+
+def test_prefers_cheap_pair_over_expensive_span():
+    intervals = [(d(0), d(29), 100, 'month'), (d(0), d(9), 10, 'early'), (d(20), d(29), 10, 'late')]
+    chosen, uncovered = cover_dates(intervals, [d(2), d(25)])
+    assert chosen == ['early', 'late']
+    assert uncovered == []
+
+
+def test_prefers_fewer_reports_on_equal_cost():
+    intervals = [(d(0), d(9), 10, 'a'), (d(10), d(19), 10, 'b'), (d(0), d(19), 20, 'both')]
+    chosen, _ = cover_dates(intervals, [d(5), d(15)])
+    assert chosen == ['both']
+
+
+def test_reports_uncovered_days():
+    intervals = [(d(0), d(9), 10, 'a'), (d(20), d(29), 10, 'b')]
+    chosen, uncovered = cover_dates(intervals, [d(12), d(3), d(15), d(3)])
+    assert chosen == ['a']
+    assert uncovered == [d(12), d(15)]
+    assert cover_dates([], [d(1)]) == ([], [d(1)])
+    assert cover_dates(intervals, []) == ([], [])
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        intervals = []
+        for i in range(rng.randint(1, 7)):
+            a = rng.randint(0, 40)
+            intervals.append((d(a), d(a + rng.randint(0, 15)), rng.randint(1, 50), i))
+        missing = [d(rng.randint(0, 50)) for _ in range(rng.randint(1, 10))]
+        chosen, uncovered = cover_dates(intervals, missing)
+        by_item = {iv[3]: iv for iv in intervals}
+        picked = [by_item[item] for item in chosen]
+        for m in set(missing) - set(uncovered):
+            assert any(a <= m <= b for a, b, _, _ in picked)
+        for m in uncovered:
+            assert not any(a <= m <= b for a, b, _, _ in intervals)
+        assert (sum(c for _, _, c, _ in picked), len(picked)) == brute_force(intervals, missing)
+
+
+def test_unlearned_reports_fall_back_newest_first(tmp_path):
+    processor = ThreeCXProcessor(loaded_index_path=str(tmp_path / 'index.json'),
+                                 coverage_path=str(tmp_path / 'coverage.json'))
+    fetcher = processor.email_fetcher
+    fetcher.message_ids = {b'1': '<learned@x>', b'2': '<new@x>', b'3': '<newer@x>'}
+    processor.report_coverage.learn('<learned@x>', [d(0), d(9)], 100)
+    reports = [(b'1', d(10)), (b'2', d(40)), (b'3', d(45))]
+    # d(5) is in the learned report; d(20) only in an assumed window, and the newest report's reaches it
+    assert d(45) - timedelta(days=REPORT_WINDOW_DAYS) <= d(20)
+    assert processor._select_emails_for_dates(reports, [d(5), d(20)]) == [(b'1', d(10)), (b'3', d(45))]
@@ -0,0 +1,60 @@
+"""Streaming CSV load: duplicate keys must never reach one upsert batch."""
+
+import pytest
+
+import phone_email
+from phone_email import ThreeCXProcessor, unique_records
+
+
+def key(record):
+    return record['call_time'], record['call_id'], record['from_field'], record['to_field']
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    processor = ThreeCXProcessor(loaded_index_path=str(tmp_path / 'index.json'),
+                                 coverage_path=str(tmp_path / 'coverage.json'))
+    processor.batches = []
+    processor.marked = []
+    monkeypatch.setattr(processor.store, 'insert_records',
+                        lambda records: processor.batches.append(list(records)) or len(records))
+    monkeypatch.setattr(processor.store, 'mark_date_loaded',
+                        lambda load_date, count, source: processor.marked.append(load_date))
+    monkeypatch.setattr(processor, '_refresh_rollups', lambda dates: None)
+    return processor
+
+
+def split_day_export(text):
+    """Move the second day between two halves of the first, repeating a first-half row in the second."""
+    lines = text.splitlines(keepends=True)
+    header = next(i for i, line in enumerate(lines) if line.startswith('Call Time'))
+    body = [line for line in lines[header + 1:] if line.startswith('2025-')]
+    day1 = [line for line in body if line.startswith('2025-09-01')]
+    day2 = [line for line in body if not line.startswith('2025-09-01')]
+    half = len(day1) // 2
+    return ''.join(lines[:header + 1] + day1[:half] + day2 + day1[half:] + [day1[0]])
+
+
+def test_split_day_duplicate_is_dropped_before_upload(tmp_path, export_text, processor, monkeypatch):
+    monkeypatch.setattr(phone_email, 'UPSERT_BATCH_SIZE', 1000)  # Everything in one flush
+    path = tmp_path / 'split.csv'
+    path.write_text(split_day_export(export_text(30, seconds_apart=3600)))
+    processor._load_csv_stream(str(path))
+    for batch in processor.batches:
+        assert len({key(r) for r in batch}) == len(batch)
+    assert sum(len(batch) for batch in processor.batches) == 30
+    assert len(processor.marked) == 2
+
+
+def test_contiguous_duplicates_dropped_per_day(export_text, processor):
+    text = export_text(2000, seed=3, messy=True, seconds_apart=120)
+    whole_file = list(processor.iter_csv_records(text.splitlines(keepends=True)))
+    per_day = list(processor.iter_csv_records(text.splitlines(keepends=True), dedup_per_day=True))
+    assert [key(r) for r in per_day] == [key(r) for r in whole_file]
+
+
+def test_unique_records_keeps_first():
+    first = {'call_time': 't', 'call_id': '1', 'from_field': 'a', 'to_field': 'b', 'status': 'Answered'}
+    other = {'call_time': 't', 'call_id': '2', 'from_field': 'a', 'to_field': 'b', 'status': 'Answered'}
+    repeat = dict(first, status='Unanswered')
+    assert unique_records([first, other, repeat]) == [first, other]
@@ -0,0 +1,59 @@
+"""DateRanges: merged inclusive ranges, and gaps() as range subtraction."""
+
+from datetime import date, timedelta
+
+from phone_email import BusinessCalendar, DateRanges
+
+
+def d(day, month=9):
+    return date(2025, month, day)
+
+
+def test_add_merges_adjacent_and_overlapping():
+    ranges = DateRanges()
+    ranges.add(d(1), d(3))
+    ranges.add(d(10))
+    ranges.add(d(4), d(5))    # Adjacent to 1..3
+    ranges.add(d(2), d(4))    # Inside
+    assert list(ranges) == [(d(1), d(5)), (d(10), d(10))]
+    ranges.add(d(6), d(9))    # Bridges both
+    assert list(ranges) == [(d(1), d(10))]
+    assert ranges.days() == 10
+
+
+def test_discard_splits_range():
+    ranges = DateRanges([(d(1), d(10))])
+    ranges.discard(d(5))
+    ranges.discard(d(1))
+    ranges.discard(d(20))     # Not present
+    assert list(ranges) == [(d(2), d(4)), (d(6), d(10))]
+    assert d(5) not in ranges and d(1) not in ranges
+    assert d(2) in ranges and d(10) in ranges
+
+
+def test_gaps_subtracts_ranges():
+    ranges = DateRanges([(d(3), d(5)), (d(8), d(8)), (d(12), d(20))])
+    assert ranges.gaps(d(1), d(15)) == [(d(1), d(2)), (d(6), d(7)), (d(9), d(11))]
+    assert ranges.gaps(d(4), d(5)) == []
+    assert ranges.gaps(d(19), d(25)) == [(d(21), d(25))]
+    assert DateRanges().gaps(d(1), d(2)) == [(d(1), d(2))]
+
+
+def test_gaps_match_day_by_day_walk():
+    loaded = {d(1) + timedelta(days=i) for i in range(90) if i % 7 not in (2, 3) and i % 11}
+    ranges = DateRanges()
+    for day in loaded:
+        ranges.add(day)
+    start, end = d(1) - timedelta(days=5), d(1) + timedelta(days=100)
+    from_gaps = [first + timedelta(days=i) for first, last in ranges.gaps(start, end)
+                 for i in range((last - first).days + 1)]
+    walked = [start + timedelta(days=i) for i in range((end - start).days + 1)
+              if start + timedelta(days=i) not in loaded]
+    assert from_gaps == walked
+
+
+def test_missing_days_skips_weekends_and_holidays():
+    calendar = BusinessCalendar(holiday_file=None, rules=['labor_day'])
+    ranges = DateRanges([(d(2), d(3))])
+    # 2025-09-01 is Labor Day, the 6th and 7th a weekend
+    assert ranges.missing_days(d(1), d(8), calendar) == [d(4), d(5), d(8)]
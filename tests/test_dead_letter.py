@@ -0,0 +1,82 @@
+"""Failed batches: bisect to the bad rows, dead-letter them, and leave their day unmarked."""
+
+import json
+import math
+from datetime import date
+
+import pytest
+
+from phone_email import SupabaseCallStore, ThreeCXProcessor
+
+
+class PoisonUpserts:
+    """upsert_batch stand-in that rejects any batch holding a poisoned call_id."""
+
+    def __init__(self, poison):
+        self.poison = set(poison)
+        self.calls = 0
+        self.stored = []
+
+    def __call__(self, batch):
+        self.calls += 1
+        if any(r['call_id'] in self.poison for r in batch):
+            raise RuntimeError('invalid input syntax')
+        self.stored.extend(r['call_id'] for r in batch)
+
+
+def rows(n):
+    return [{'call_id': str(i), 'call_time': f'2025-09-01T08:{i % 60:02d}:00', 'call_date': '2025-09-01'}
+            for i in range(n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SupabaseCallStore(dead_letter_path=str(tmp_path / 'dead.jsonl'))
+
+
+def dead_letters(store):
+    with open(store.dead_letter_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_single_bad_row_isolated_in_log2_requests(store):
+    upserts = store.upsert_batch = PoisonUpserts({'37'})
+    assert store.insert_batch(rows(64)) == 63
+    assert sorted(upserts.stored, key=int) == [str(i) for i in range(64) if i != 37]
+    assert store.extra_requests == 2 * math.log2(64)
+    assert upserts.calls == 1 + store.extra_requests
+    assert store.dead_lettered == 1
+    [entry] = dead_letters(store)
+    assert entry['record']['call_id'] == '37'
+    assert entry['error'] == 'invalid input syntax'
+
+
+def test_caller_error_skips_first_attempt(store):
+    upserts = store.upsert_batch = PoisonUpserts({'0', '5'})
+    assert store.insert_batch(rows(8), error=RuntimeError('timeout')) == 6
+    assert upserts.calls == store.extra_requests
+    assert [e['record']['call_id'] for e in dead_letters(store)] == ['0', '5']
+    assert '2 rows dead-lettered' in store.failure_summary()
+
+
+def test_clean_batch_costs_one_request(store):
+    upserts = store.upsert_batch = PoisonUpserts(())
+    assert store.insert_batch(rows(10)) == 10
+    assert upserts.calls == 1
+    assert store.failure_summary() == 'no failed batches'
+
+
+def test_day_with_dead_letters_is_not_marked(tmp_path):
+    processor = ThreeCXProcessor(loaded_index_path=str(tmp_path / 'index.json'),
+                                 coverage_path=str(tmp_path / 'coverage.json'),
+                                 dead_letter_path=str(tmp_path / 'dead.jsonl'))
+    store = processor.store
+    store.ensure_partitions = lambda dates: False
+    marked = []
+    store.mark_date_loaded = lambda load_date, count, source: marked.append((load_date, count))
+    store.upsert_batch = PoisonUpserts({'3'})
+    assert processor._store_date(None, date(2025, 9, 1), rows(20), 'test') == 19
+    assert marked == []
+    store.upsert_batch = PoisonUpserts(())
+    assert processor._store_date(None, date(2025, 9, 2), rows(20), 'test') == 20
+    assert marked == [(date(2025, 9, 2), 20)]
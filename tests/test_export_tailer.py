@@ -0,0 +1,115 @@
+"""ExportTailer: whole records only, each appended row sent once, replaced and late files."""
+
+import os
+from datetime import datetime
+
+import pytest
+
+from phone_email import ExportTailer, ThreeCXProcessor, complete_csv_end
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    processor = ThreeCXProcessor(loaded_index_path=str(tmp_path / 'index.json'),
+                                 coverage_path=str(tmp_path / 'coverage.json'))
+    processor.sent = []
+    monkeypatch.setattr(processor.store, 'insert_records',
+                        lambda records: processor.sent.append([r['call_id'] for r in records]) or len(records))
+    monkeypatch.setattr(processor, '_refresh_rollups', lambda dates: None)
+    return processor
+
+
+@pytest.fixture
+def export(export_text):
+    """(preamble through the header row, data rows) of a clean synthetic export."""
+    lines = export_text(40, seconds_apart=60).splitlines(keepends=True)
+    header = next(i for i, line in enumerate(lines) if line.startswith('Call Time'))
+    return ''.join(lines[:header + 1]), [line for line in lines[header + 1:] if line.startswith('2025-')]
+
+
+def call_ids(rows):
+    return [row.split(',')[1] for row in rows]
+
+
+def test_complete_csv_end():
+    assert complete_csv_end('a,b\nc,d\n') == 8
+    assert complete_csv_end('a,b\nc,d') == 4
+    assert complete_csv_end('a,"x\ny"\n') == 8
+    assert complete_csv_end('a,b\nc,"x\ny') == 4                # Quoted field still open
+    assert complete_csv_end('a,"say ""hi""\nthere"\nc,') == 21  # Doubled quotes inside a field
+    assert complete_csv_end('') == 0
+
+
+def test_appended_rows_sent_once(tmp_path, processor, export):
+    preamble, rows = export
+    path = tmp_path / 'export.csv'
+    path.write_text(preamble + ''.join(rows[:5]))
+    tailer = ExportTailer(processor, str(tmp_path / 'tail.json'))
+    assert tailer.poll(str(path)) == 5
+
+    with open(path, 'a') as f:
+        f.write(''.join(rows[5:8]) + rows[8][:20])            # Half a row, no newline yet
+    assert tailer.poll(str(path)) == 3
+    with open(path, 'a') as f:
+        f.write(rows[8][20:] + rows[9])
+    assert tailer.poll(str(path)) == 2
+    assert tailer.poll(str(path)) == 0                        # Idle: nothing appended
+
+    assert processor.sent == [call_ids(rows[:5]), call_ids(rows[5:8]), call_ids(rows[8:10])]
+    assert tailer.files[str(path)]['offset'] == os.path.getsize(path)
+    assert datetime.fromisoformat(tailer.last_call_time) == datetime.fromisoformat(rows[9].split(',')[0])
+
+
+def test_multiline_record_waits_for_closing_quote(tmp_path, processor, export):
+    preamble, rows = export
+    path = tmp_path / 'export.csv'
+    path.write_text(preamble + rows[0])
+    tailer = ExportTailer(processor, str(tmp_path / 'tail.json'))
+    tailer.poll(str(path))
+    details = rows[1].rstrip('\n').rsplit(',', 1)[0] + ',"Ringing\n'
+    with open(path, 'a') as f:
+        f.write(details)
+    assert tailer.poll(str(path)) == 0
+    with open(path, 'a') as f:
+        f.write('Answered"\n')
+    assert tailer.poll(str(path)) == 1
+    assert processor.sent[-1] == call_ids(rows[1:2])
+
+
+def test_checkpoint_survives_restart(tmp_path, processor, export):
+    preamble, rows = export
+    path = tmp_path / 'export.csv'
+    path.write_text(preamble + ''.join(rows[:10]))
+    ExportTailer(processor, str(tmp_path / 'tail.json')).poll(str(path))
+    with open(path, 'a') as f:
+        f.write(''.join(rows[10:12]))
+    assert ExportTailer(processor, str(tmp_path / 'tail.json')).poll(str(path)) == 2
+    assert processor.sent[-1] == call_ids(rows[10:12])
+
+
+def test_replaced_file_sends_only_rows_from_last_call_time(tmp_path, processor, export):
+    preamble, rows = export
+    path = tmp_path / 'export.csv'
+    path.write_text(preamble + ''.join(rows[:20]))
+    tailer = ExportTailer(processor, str(tmp_path / 'tail.json'))
+    tailer.poll(str(path))
+    # The next export starts a few rows back and is shorter than the old offset
+    path.write_text(preamble + ''.join(rows[17:25]))
+    assert tailer.poll(str(path)) == 6
+    assert processor.sent[-1] == call_ids(rows[19:25])        # From the last loaded call_time on
+
+
+def test_late_file_in_drop_directory_sent_in_full(tmp_path, processor, export):
+    preamble, rows = export
+    drop = tmp_path / 'drop'
+    drop.mkdir()
+    (drop / 'b.csv').write_text(preamble + ''.join(rows[20:30]))
+    tailer = ExportTailer(processor, str(tmp_path / 'tail.json'))
+    assert tailer.poll(str(drop)) == 10
+    # Older calls turn up later in a new file: none of them are cut off by b.csv's last_call_time
+    (drop / 'a.csv').write_text(preamble + ''.join(rows[:20]))
+    assert tailer.poll(str(drop)) == 20
+    assert processor.sent[-1] == call_ids(rows[:20])
+    os.remove(drop / 'a.csv')
+    tailer.poll(str(drop))
+    assert list(tailer.files) == [str(drop / 'b.csv')]
@@ -0,0 +1,76 @@
+"""UID incremental sync: the saved high-water mark must never skip a report."""
+
+import json
+import re
+from datetime import date
+
+import pytest
+
+from phone_email import EmailReportFetcher
+from phone_email_bench import ImapStandIn, build_report_mailbox
+
+SINCE = date(2025, 9, 1)
+
+
+class FlakySearchStandIn(ImapStandIn):
+    """Refuses the next `refuse` UID SEARCH commands with a NO."""
+
+    refuse = 0
+
+    def dispatch(self, send, command, args):
+        if command == 'UID' and args.upper().startswith('SEARCH') and self.refuse:
+            self.refuse -= 1
+            return 'NO [UNAVAILABLE] search temporarily unavailable'
+        return super().dispatch(send, command, args)
+
+
+@pytest.fixture
+def mailbox():
+    return build_report_mailbox(6)
+
+
+def sync(stand_in, state_path):
+    conn = stand_in.connect()
+    try:
+        return EmailReportFetcher(sync_state_path=state_path).find_3cx_reports(conn, SINCE)
+    finally:
+        conn.logout()
+
+
+def last_uid(state_path):
+    with open(state_path) as f:
+        return json.load(f)['last_uid']
+
+
+def test_high_water_mark_passes_undated_report(tmp_path, mailbox):
+    undated = re.sub(rb'(?m)^Date: .*$', b'Date: sometime last week', mailbox.pop(), count=1)
+    stand_in = ImapStandIn(mailbox, latency=0)
+    state_path = str(tmp_path / 'sync.json')
+    try:
+        assert len(sync(stand_in, state_path)) == 5
+        stand_in.deliver(undated)
+        assert len(sync(stand_in, state_path)) == 5
+        assert last_uid(state_path) == 6
+        stand_in.deliver(mailbox[0])
+        assert len(sync(stand_in, state_path)) == 6
+        assert last_uid(state_path) == 7
+    finally:
+        stand_in.close()
+
+
+def test_failed_search_keeps_high_water_mark(tmp_path, mailbox):
+    stand_in = FlakySearchStandIn(mailbox[:4], latency=0)
+    state_path = str(tmp_path / 'sync.json')
+    try:
+        sync(stand_in, state_path)
+        assert last_uid(state_path) == 4
+        for raw in mailbox[4:]:
+            stand_in.deliver(raw)
+        stand_in.refuse = 1  # One of the two subject searches fails
+        sync(stand_in, state_path)
+        assert last_uid(state_path) == 4
+        # The next run searches the same UIDs again and finds both new reports
+        assert len(sync(stand_in, state_path)) == 6
+        assert last_uid(state_path) == 6
+    finally:
+        stand_in.close()
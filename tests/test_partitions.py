@@ -0,0 +1,74 @@
+"""SupabaseCallStore.ensure_partitions: an unknown table layout must never be guessed."""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import phone_email
+from phone_email import SupabaseCallStore
+
+
+class FakeRpcClient:
+    """Answers rpc(...).execute() from a script of results and exceptions, and records upserts."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self.upserts = []
+
+    def rpc(self, name, params):
+        return self
+
+    def execute(self):
+        self.calls += 1
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        return SimpleNamespace(data=step)
+
+    def table(self, name):
+        return SimpleNamespace(upsert=lambda batch, on_conflict: SimpleNamespace(
+            execute=lambda: self.upserts.append(on_conflict)))
+
+
+class MissingFunction(Exception):
+    code = 'PGRST202'
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(phone_email.time, 'sleep', lambda secs: None)
+    return SupabaseCallStore(dead_letter_path=str(tmp_path / 'dead.jsonl'))
+
+
+def test_transient_failure_is_retried(store):
+    store.client = FakeRpcClient(ConnectionError('reset'), 2)
+    assert store.ensure_partitions([date(2025, 9, 3)]) is True
+    assert store.partitioned is True
+    assert store.client.calls == 2
+
+
+def test_persistent_failure_aborts_instead_of_guessing(store):
+    store.client = FakeRpcClient(*[ConnectionError('down')] * (phone_email.PARTITION_RPC_RETRIES + 1))
+    record = {'call_date': '2025-09-03', 'call_time': '2025-09-03T10:00:00+00:00'}
+    with pytest.raises(RuntimeError, match='partitions'):
+        store.insert_records([record])
+    assert store.partitioned is None
+    assert store.client.upserts == []
+    assert store.dead_lettered == 0
+
+
+def test_missing_function_means_unpartitioned(store):
+    store.client = FakeRpcClient(MissingFunction('not found'))
+    assert store.ensure_partitions([date(2025, 9, 3)]) is False
+    store.insert_records([{'call_date': '2025-09-03'}])
+    assert store.client.upserts == [phone_email.CALL_RECORDS_CONFLICT]
+
+
+def test_partitioned_upserts_use_the_partition_key(store):
+    store.client = FakeRpcClient(0)
+    store.insert_records([{'call_date': '2025-09-03'}, {'call_date': '2025-10-01'}])
+    # One request per month, each against the unique key that includes call_date
+    assert store.client.upserts == [phone_email.PARTITIONED_CONFLICT] * 2
+    assert store.client.calls == 1